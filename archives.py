@@ -0,0 +1,158 @@
+"""
+Archives mensuelles de l'historique des tâches complétées.
+
+Seuls le mois en cours et le mois précédent restent dans le stockage « chaud ».
+Les mois plus anciens sont déplacés dans un fichier par mois, compressé en
+JSONL gzip (lisible directement par pandas.read_json(..., lines=True)) :
+
+    data_foyer_archives/2025-03.jsonl.gz
+
+Les missions encore en attente de validation restent dans le stockage chaud
+quel que soit leur mois. lire_historique() combine les deux sources et n'ouvre
+que les archives des mois qui recoupent la période demandée.
+"""
+import gzip
+import json
+import os
+import uuid
+from datetime import date
+from functools import lru_cache
+
+from evenements import cle_ligne, est_archivable, nouvel_evenement
+
+
+def dossier_archives(chemin_donnees):
+    """Dossier des archives d'un foyer (à côté de son fichier de données)."""
+    return os.path.splitext(chemin_donnees)[0] + "_archives"
+
+
+def limite_archivage(aujourd_hui=None):
+    """Premier jour du mois précédent : tout ce qui est plus ancien part en archive."""
+    aujourd_hui = aujourd_hui or date.today()
+    if aujourd_hui.month == 1:
+        return date(aujourd_hui.year - 1, 12, 1).isoformat()
+    return date(aujourd_hui.year, aujourd_hui.month - 1, 1).isoformat()
+
+
+def _chemin_mois(dossier, mois):
+    return os.path.join(dossier, f"{mois}.jsonl.gz")
+
+
+@lru_cache(maxsize=24)
+def _lire_mois(chemin, signature):
+    """Lit une archive mensuelle ; `signature` (mtime, taille) invalide le cache si elle change."""
+    with gzip.open(chemin, "rt", encoding="utf-8") as f:
+        return tuple(json.loads(ligne) for ligne in f if ligne.strip())
+
+
+def lire_mois(dossier, mois):
+    """Retourne les tâches archivées d'un mois (tuple vide s'il n'y a pas d'archive)."""
+    signature = signature_mois(dossier, mois)
+    if signature is None:
+        return ()
+    return _lire_mois(_chemin_mois(dossier, mois), signature)
+
+
+def mois_archives(dossier):
+    """Mois (AAAA-MM) ayant une archive, dans l'ordre chronologique."""
+    try:
+        noms = os.listdir(dossier)
+    except FileNotFoundError:
+        return []
+    return sorted(nom[:7] for nom in noms if nom.endswith(".jsonl.gz") and len(nom) == 16)
+
+
+def signature_mois(dossier, mois):
+    """(mtime, taille) de l'archive d'un mois, None si elle n'existe pas."""
+    try:
+        st = os.stat(_chemin_mois(dossier, mois))
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def parcourir_mois(dossier, mois):
+    """Parcourt les tâches archivées d'un mois ligne à ligne, sans les garder en mémoire ni en cache."""
+    with gzip.open(_chemin_mois(dossier, mois), "rt", encoding="utf-8") as f:
+        for ligne in f:
+            if ligne.strip():
+                yield json.loads(ligne)
+
+
+def _ecrire_mois(dossier, mois, taches):
+    """Fusionne `taches` dans l'archive du mois (sans doublon) et la remplace atomiquement."""
+    existantes = {cle_ligne(t): t for t in lire_mois(dossier, mois)}
+    for tache in taches:
+        existantes.setdefault(cle_ligne(tache), tache)
+    lignes = sorted(existantes.values(), key=lambda t: (t["date"], t["timestamp"]))
+    chemin = _chemin_mois(dossier, mois)
+    # Les sessions Streamlit sont des threads d'un même processus : le pid ne suffit pas
+    tmp = f"{chemin}.{uuid.uuid4().hex}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        for tache in lignes:
+            f.write(json.dumps(tache, ensure_ascii=False, separators=(",", ":")) + "\n")
+    os.replace(tmp, chemin)
+
+
+def archiver(stockage, limite=None):
+    """
+    Déplace les mois antérieurs à `limite` du stockage chaud vers les archives.
+    Les fichiers d'archive sont écrits avant l'événement qui retire les lignes :
+    un arrêt entre les deux laisse au pire des doublons, ignorés à la lecture.
+    L'événement nomme les lignes copiées : une mission validée entre la lecture
+    et l'événement reste dans le stockage chaud au lieu d'être perdue.
+    Retourne le nombre de tâches archivées.
+    """
+    # Import tardif : stockage importe historique, qui importe ce module
+    from stockage import verrou_fichier
+
+    limite = limite or limite_archivage()
+    dossier = dossier_archives(stockage.chemin_donnees)
+    # Un seul archivage à la fois par foyer (sessions et processus) : le suivant relit l'état à jour
+    with verrou_fichier(dossier + ".lock"):
+        etat = stockage.charger()
+        par_mois = {}
+        for tache in etat["taches_completees"]:
+            if est_archivable(tache, limite):
+                par_mois.setdefault(tache["date"][:7], []).append(tache)
+        if not par_mois and etat["archive_avant"] == limite:
+            return 0
+        if par_mois:
+            os.makedirs(dossier, exist_ok=True)
+        for mois, taches in par_mois.items():
+            _ecrire_mois(dossier, mois, taches)
+        lignes = [list(cle_ligne(tache)) for taches in par_mois.values() for tache in taches]
+        stockage.appliquer(nouvel_evenement("archivage", avant=limite, lignes=lignes))
+    return sum(len(taches) for taches in par_mois.values())
+
+
+def mois_entre(debut, fin):
+    """Mois (AAAA-MM) couverts par l'intervalle de dates [debut, fin]."""
+    annee, mois = int(debut[:4]), int(debut[5:7])
+    while f"{annee:04d}-{mois:02d}" <= fin[:7]:
+        yield f"{annee:04d}-{mois:02d}"
+        annee, mois = (annee + 1, 1) if mois == 12 else (annee, mois + 1)
+
+
+def lire_historique(taches_chaudes, chemin_donnees, archive_avant, debut, fin, user=None, task=None):
+    """
+    Tâches complétées entre `debut` et `fin` (inclus), stockage chaud + archives.
+    Les archives ne sont ouvertes que pour les mois antérieurs à `archive_avant`
+    qui recoupent la période.
+    """
+    resultat = [t for t in taches_chaudes
+                if debut <= t["date"] <= fin
+                and (user is None or t["user"] == user)
+                and (task is None or t["task"] == task)]
+    if archive_avant and debut < archive_avant:
+        dossier = dossier_archives(chemin_donnees)
+        deja_vues = {cle_ligne(t) for t in resultat}
+        for mois in mois_entre(debut, min(fin, archive_avant)):
+            for tache in lire_mois(dossier, mois):
+                if (debut <= tache["date"] <= fin
+                        and (user is None or tache["user"] == user)
+                        and (task is None or tache["task"] == task)
+                        and cle_ligne(tache) not in deja_vues):
+                    resultat.append(tache)
+        resultat.sort(key=lambda t: (t["date"], t["timestamp"]))
+    return resultat
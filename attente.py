@@ -0,0 +1,48 @@
+"""
+File des missions en attente de validation parentale, indexée par membre.
+
+Une mission en attente est un dict {"id", "user", "task", "pts"}. Son "id" est
+l'horodatage ("timestamp") de sa ligne dans taches_completees : la validation
+marque exactement cette ligne, quel que soit le jour où elle a lieu.
+
+IndexAttente garde, pour chaque membre, ses missions en attente par id : la
+page Missions lit le compte d'un enfant sans reparcourir toute la file, et
+l'onglet Validations l'affiche membre par membre. L'index vit dans la session
+(clé "index_attente") et les réducteurs de evenements.py le tiennent à jour.
+"""
+
+
+class IndexAttente:
+    """Missions en attente par membre puis par id, dans l'ordre d'envoi."""
+
+    def __init__(self, attente=()):
+        self._par_user = {}  # membre -> {id: mission}
+        for item in attente:
+            self.ajouter(item)
+
+    # --- MISES À JOUR (appelées par les réducteurs) ---
+    def ajouter(self, item):
+        self._par_user.setdefault(item["user"], {})[item["id"]] = item
+
+    def retirer(self, item):
+        missions = self._par_user.get(item["user"], {})
+        missions.pop(item["id"], None)
+        if not missions:
+            self._par_user.pop(item["user"], None)
+
+    def renommer(self, ancien, nouveau):
+        if ancien in self._par_user:
+            self._par_user.setdefault(nouveau, {}).update(self._par_user.pop(ancien))
+
+    # --- LECTURES ---
+    def membres(self):
+        """Membres ayant au moins une mission en attente, dans l'ordre de leur premier envoi."""
+        return list(self._par_user)
+
+    def nb(self, user=None):
+        if user is None:
+            return sum(len(missions) for missions in self._par_user.values())
+        return len(self._par_user.get(user, ()))
+
+    def missions(self, user):
+        return list(self._par_user.get(user, {}).values())
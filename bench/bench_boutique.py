@@ -0,0 +1,67 @@
+"""
+Compare l'affichage de la boutique avec l'index par id (boutique.IndexBoutique)
+à l'ancienne recherche linéaire (any()/next() sur les achats pour chaque carte).
+
+Usage : python bench/bench_boutique.py [nb_recompenses] [nb_achats]
+"""
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stockage import chrono  # noqa: E402
+from boutique import CATEGORIES_RECOMPENSES, IndexBoutique  # noqa: E402
+
+
+def boutique_synthetique(nb_recompenses, nb_achats):
+    catalogue = [{"id": i, "nom": f"Récompense {i}", "description": "", "points": random.randint(10, 200), "emoji": "🎁",
+                  "couleur": "", "categorie": random.choice(CATEGORIES_RECOMPENSES),
+                  "repetable": i % 2 == 0, "delai_jours": random.choice((0, 3, 7))}
+                 for i in range(1, nb_recompenses + 1)]
+    debut = date.today() - timedelta(days=3 * 365)
+    achats = [{"id": random.randint(1, nb_recompenses), "nom": "", "points_utilises": 50,
+               "date": (debut + timedelta(days=random.randint(0, 3 * 365))).isoformat()} for _ in range(nb_achats)]
+    return catalogue, achats
+
+
+def ancienne_page(catalogue, achats):
+    """Un any() par carte puis un next() par récompense obtenue."""
+    for recompense in catalogue:
+        any(r.get("id") == recompense["id"] for r in achats)
+    for achat in achats:
+        next((r for r in catalogue if r["id"] == achat["id"]), None)
+
+
+def main():
+    nb_recompenses = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    nb_achats = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    random.seed(11)
+    catalogue, achats = boutique_synthetique(nb_recompenses, nb_achats)
+    aujourd_hui = date.today().isoformat()
+    print(f"{nb_recompenses} récompenses, {nb_achats} achats")
+
+    t_ancien = chrono(lambda: ancienne_page(catalogue, achats), repetitions=2)
+    print(f"  recherche linéaire par carte        : {t_ancien:8.1f} ms")
+
+    t_construction = chrono(lambda: IndexBoutique(catalogue, achats))
+    print(f"  construction de l'index             : {t_construction:8.1f} ms")
+
+    index = IndexBoutique(catalogue, achats)
+
+    def page_indexee():
+        for recompense in index.recompenses():
+            index.statut(recompense, 1000, aujourd_hui)
+        for id_recompense, _ in index.achats():
+            index.recompense(id_recompense)
+    t_index = chrono(page_indexee)
+    print(f"  page complète avec l'index          : {t_index:8.1f} ms")
+
+    achat = {"id": 1, "nom": "", "points_utilises": 50, "date": aujourd_hui}
+    t_achat = chrono(lambda: index.ajouter_achat(achat), repetitions=100)
+    print(f"  mise à jour de l'index (un achat)   : {t_achat:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
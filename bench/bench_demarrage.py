@@ -0,0 +1,116 @@
+"""
+Budget de démarrage : import à froid des modules du routeur (main.py) puis
+premier rendu de chaque page, chacun dans un processus neuf, comparés à des
+budgets en millisecondes (BUDGET_IMPORT_MS, BUDGETS_RENDU_MS). Le script sort
+en erreur si une mesure dépasse son budget.
+
+Streamlit lui-même est importé hors mesure (le serveur l'a déjà chargé avant la
+première session). Le premier rendu arrive directement sur la page, par la clé
+du menu ("navigation") : il comprend l'import de la page et de ses dépendances
+lourdes (pandas pour le Classement et l'Espace Parents). L'application tourne
+dans streamlit.testing (AppTest) sur une copie du dépôt et un foyer chargé.
+
+Usage : python bench/bench_demarrage.py [facteur]   (budgets multipliés par facteur, machine lente)
+"""
+import ast
+import importlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+BUDGET_IMPORT_MS = 150
+# Premier rendu par page : les pages sans pandas doivent rester sous la moitié des autres
+BUDGETS_RENDU_MS = {
+    "🚀 Missions": 400,
+    "🎁 Récompenses": 400,
+    "📅 Calendrier": 400,
+    "🏆 Classement": 1000,
+    "⚙️ Espace Parents": 1000,
+}
+REPETITIONS = 3
+
+
+def modules_routeur(chemin):
+    """Modules importés au niveau du module par le routeur, streamlit exclu."""
+    modules = []
+    for noeud in ast.parse(open(chemin, encoding="utf-8").read()).body:
+        if isinstance(noeud, ast.Import):
+            modules += [alias.name for alias in noeud.names]
+        elif isinstance(noeud, ast.ImportFrom):
+            modules.append(noeud.module)
+    return [m for m in modules if m.split(".")[0] != "streamlit"]
+
+
+def mesurer_page(dossier, libelle):
+    """Dans ce processus neuf : import à froid du routeur puis premier rendu de `libelle`."""
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(dossier)
+    sys.path.insert(0, dossier)
+    t0 = time.perf_counter()
+    for module in modules_routeur(os.path.join(dossier, "main.py")):
+        importlib.import_module(module)
+    t_import = (time.perf_counter() - t0) * 1000
+
+    at = AppTest.from_file(os.path.join(dossier, "main.py"), default_timeout=60)
+    at.session_state["navigation"] = libelle
+    at.session_state["parent_authenticated"] = True
+    t0 = time.perf_counter()
+    at.run()
+    t_rendu = (time.perf_counter() - t0) * 1000
+    assert not at.exception, at.exception
+    return {"import_ms": t_import, "rendu_ms": t_rendu, "pandas": "pandas" in sys.modules}
+
+
+def main():
+    if sys.argv[1:2] == ["--page"]:
+        print(json.dumps(mesurer_page(sys.argv[2], sys.argv[3])))
+        return
+    facteur = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    budget_import = BUDGET_IMPORT_MS * facteur
+
+    from bench_payload import etat_boutique
+    from bench_rendu import copier_depot
+    from stockage import StockageJSON
+    from vues import PAGES
+
+    dossier = tempfile.mkdtemp(prefix="bench_demarrage_")
+    resultats = {}
+    try:
+        copier_depot(dossier)
+        StockageJSON(os.path.join(dossier, "data_foyer.json")).sauvegarder(etat_boutique(20))
+        for libelle in PAGES:
+            mesures = []
+            for _ in range(REPETITIONS):
+                sortie = subprocess.run([sys.executable, os.path.abspath(__file__), "--page", dossier, libelle],
+                                        capture_output=True, text=True, check=True).stdout
+                mesures.append(json.loads(sortie.strip().splitlines()[-1]))
+            resultats[libelle] = {"import_ms": statistics.median(m["import_ms"] for m in mesures),
+                                  "rendu_ms": statistics.median(m["rendu_ms"] for m in mesures),
+                                  "pandas": mesures[0]["pandas"]}
+    finally:
+        shutil.rmtree(dossier)
+
+    depassements = 0
+    print(f"Médianes de {REPETITIONS} processus, budgets × {facteur:g}\n")
+    print(f"  {'page':20} {'import à froid':>14} {'premier rendu':>14} {'budget':>9}  pandas")
+    for libelle, r in resultats.items():
+        budget_rendu = BUDGETS_RENDU_MS[libelle] * facteur
+        hors_budget = r["import_ms"] > budget_import or r["rendu_ms"] > budget_rendu
+        depassements += hors_budget
+        nom = libelle.split(" ", 1)[1]
+        print(f"  {nom:20} {r['import_ms']:11.0f} ms {r['rendu_ms']:11.0f} ms {budget_rendu:6.0f} ms  {'oui' if r['pandas'] else 'non':6}"
+              f"{'  HORS BUDGET' if hors_budget else ''}")
+    sys.exit(1 if depassements else 0)
+
+
+if __name__ == "__main__":
+    main()
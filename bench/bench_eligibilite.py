@@ -0,0 +1,94 @@
+"""
+Mesure la grille « qui peut faire quoi » (frequences.matrice_eligibilite) sur une
+grande famille synthétique, comparée à l'évaluation membre par membre
+(frequences.evaluer_missions) et à l'ancien filtrage de l'historique par carte.
+
+Usage : python bench/bench_eligibilite.py [nb_membres] [nb_missions] [nb_annees]
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stockage import chrono  # noqa: E402
+from frequences import etendue_regles, evaluer_missions, matrice_eligibilite  # noqa: E402
+from historique import IndexCompletions  # noqa: E402
+
+ROLES = ["Parent", "Ado", "Enfant"]
+FREQUENCES = ["Quotidien", "Hebdomadaire", "Ponctuel", None]
+
+
+def famille_synthetique(nb_membres, nb_missions, nb_annees, par_jour=3):
+    """Retourne (membres, missions, historique) : ~par_jour complétions par membre et par jour."""
+    membres = {f"Membre {i}": ROLES[i % len(ROLES)] for i in range(nb_membres)}
+    missions = []
+    for i in range(nb_missions):
+        mission = {"n": f"Mission {i}", "p": 10, "c": "Ménage", "d": "",
+                   "r": random.sample(ROLES, random.randint(1, 3)), "f": random.choice(FREQUENCES)}
+        if i % 7 == 0:
+            mission["regle"] = {"max_semaine": 2}
+        elif i % 11 == 0:
+            mission["regle"] = {"delai_jours": 3}
+        elif i % 13 == 0:
+            mission["regle"] = {"jours": [0, 3]}
+        missions.append(mission)
+    noms = [m["n"] for m in missions]
+    debut = date.today() - timedelta(days=365 * nb_annees)
+    historique = []
+    for jour in range(365 * nb_annees + 1):
+        jour = (debut + timedelta(days=jour)).isoformat()
+        for user in membres:
+            for task in random.sample(noms, par_jour):
+                historique.append({"user": user, "task": task, "date": jour, "points": 10})
+    return membres, missions, historique
+
+
+def par_carte(missions, membres, historique, aujourd_hui):
+    """Ancienne approche : un filtrage complet de l'historique par (membre, mission)."""
+    jour = aujourd_hui.isoformat()
+    lundi = (aujourd_hui - timedelta(days=aujourd_hui.weekday())).isoformat()
+    for user, role in membres.items():
+        for mission in missions:
+            if role in mission["r"] and mission["f"]:
+                lignes = [t for t in historique if t["user"] == user and t["task"] == mission["n"]]
+                sum(t["date"] == jour for t in lignes), sum(t["date"] >= lundi for t in lignes)
+
+
+def main():
+    nb_membres = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    nb_missions = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    nb_annees = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    random.seed(7)
+    membres, missions, historique = famille_synthetique(nb_membres, nb_missions, nb_annees)
+    aujourd_hui = date.today()
+    print(f"{nb_membres} membres × {nb_missions} missions, {len(historique):,} complétions sur {nb_annees} an(s)")
+
+    debut = etendue_regles(missions, aujourd_hui)
+    recentes = [t for t in historique if t["date"] >= debut]
+    print(f"  période utile aux règles : depuis {debut} ({len(recentes):,} lignes)")
+
+    t_grille = chrono(lambda: matrice_eligibilite(missions, membres, recentes, aujourd_hui))
+    print(f"  grille pandas (période utile)        : {t_grille:8.1f} ms")
+    t_complet = chrono(lambda: matrice_eligibilite(missions, membres, historique, aujourd_hui), repetitions=2)
+    print(f"  grille pandas (historique complet)   : {t_complet:8.1f} ms")
+
+    def par_membre():
+        index = IndexCompletions(recentes)
+        for user, role in membres.items():
+            evaluer_missions([m for m in missions if role in m["r"]], user, index, aujourd_hui)
+    t_membres = chrono(par_membre)
+    print(f"  moteur de règles membre par membre   : {t_membres:8.1f} ms")
+
+    # L'ancienne approche est mesurée sur un échantillon de membres puis extrapolée
+    echantillon = dict(list(membres.items())[:2])
+    t0 = time.perf_counter()
+    par_carte(missions, echantillon, historique, aujourd_hui)
+    t_carte = (time.perf_counter() - t0) * 1000 * len(membres) / len(echantillon)
+    print(f"  filtrage par carte (extrapolé)       : {t_carte:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
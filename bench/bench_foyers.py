@@ -0,0 +1,75 @@
+"""
+Ouvre et sert N foyers avec un motif d'accès aléatoire (Zipf) à travers le LRU
+de foyers.py, et mesure latence, taux de succès du cache et mémoire.
+
+Usage : python bench/bench_foyers.py [nb_foyers] [capacite_lru] [nb_requetes] [mode]
+"""
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stockage import etat_synthetique, TACHES  # noqa: E402
+from evenements import nouvel_evenement  # noqa: E402
+from foyers import RegistreFoyers, chemin_foyer  # noqa: E402
+from stockage import StockageJSON  # noqa: E402
+
+
+def percentile(valeurs, p):
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * p / 100))]
+
+
+def main():
+    nb_foyers = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    capacite = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    nb_requetes = int(sys.argv[3]) if len(sys.argv) > 3 else 5000
+    mode = sys.argv[4] if len(sys.argv) > 4 else "journal"
+    random.seed(7)
+    dossier = tempfile.mkdtemp(prefix="bench_foyers_")
+    try:
+        ids = [f"foyer{i:05d}" for i in range(nb_foyers)]
+        for foyer_id in ids:
+            chemin = chemin_foyer(foyer_id, dossier)
+            os.makedirs(os.path.dirname(chemin))
+            StockageJSON(chemin).sauvegarder(etat_synthetique(random.randint(200, 2000)))
+
+        registre = RegistreFoyers(dossier, capacite, mode)
+        # Quelques foyers très actifs, une longue traîne de foyers occasionnels
+        poids = [1 / (rang + 1) for rang in range(nb_foyers)]
+        latences = []
+        rss_debut = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        t_total = time.perf_counter()
+        for foyer_id in random.choices(ids, weights=poids, k=nb_requetes):
+            t0 = time.perf_counter()
+            stockage = registre.ouvrir(foyer_id)
+            stockage.charger()
+            if random.random() < 0.2:
+                evt = nouvel_evenement("tache_completee", task=TACHES[0], user="Enfant 1", points=10,
+                                       date=date.today().isoformat(), en_attente=True)
+                stockage.appliquer(evt)
+            latences.append((time.perf_counter() - t0) * 1000)
+        t_total = time.perf_counter() - t_total
+        registre.fermer_tout()
+        rss_fin = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        print(f"{nb_foyers} foyers, LRU={capacite}, {nb_requetes} requêtes, mode={mode}")
+        print(f"  débit          : {nb_requetes / t_total:,.0f} requêtes/s")
+        print(f"  latence p50    : {percentile(latences, 50):.2f} ms")
+        print(f"  latence p95    : {percentile(latences, 95):.2f} ms")
+        print(f"  latence p99    : {percentile(latences, 99):.2f} ms")
+        print(f"  ouvertures     : {registre.ouvertures} (succès cache {1 - registre.ouvertures / nb_requetes:.0%})")
+        print(f"  évictions      : {registre.evictions}")
+        print(f"  RSS max        : {rss_debut // 1024} → {rss_fin // 1024} Mo")
+    finally:
+        shutil.rmtree(dossier)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Temps CPU du serveur et éléments renvoyés au navigateur par clic, avec les
+unités en fragments (FOYER_FRAGMENTS=1) et avec un rerun complet à chaque clic
+(FOYER_FRAGMENTS=0) : mission envoyée, achat, case cochée et validation d'une
+sélection dans la file. L'application tourne dans streamlit.testing (AppTest)
+sur une copie du dépôt, avec un historique chargé et une longue file d'attente.
+
+Le temps mesuré est le temps CPU du fil du script (callbacks, script ou fragments,
+écriture du stockage, deltas), hors préparation et analyse propres à AppTest ;
+comme sur le serveur, le bytecode du script est compilé une fois pour toutes.
+Comme le navigateur, une interaction dans une unité porte l'id de son fragment ;
+la page complète est ensuite reconstruite hors mesure avec les états de widgets
+que le navigateur garde.
+
+Usage : python bench/bench_fragments.py [nb_clics] [nb_en_attente]
+"""
+import functools
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from streamlit.proto.WidgetStates_pb2 import WidgetStates  # noqa: E402
+from streamlit.runtime.scriptrunner import ScriptRunner  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.testing.v1 import app_test, local_script_runner  # noqa: E402
+
+from bench_rendu import copier_depot, etat_mois_charge, mesurer, oublier_application  # noqa: E402
+from bench_stockage import TACHES  # noqa: E402
+from catalogue import IndexMissions  # noqa: E402
+from evenements import appliquer_evenement, nouvel_evenement  # noqa: E402
+from stockage import StockageJSON  # noqa: E402
+
+
+def etat_depart(nb_attente):
+    etat = etat_mois_charge(2)
+    etat["points_foyer"] = 100_000
+    # Une récompense répétable sans délai : achetable à chaque clic
+    etat["recompenses_personnalisees"] = [{"id": 100, "nom": "🍬 Bonbon", "description": "Un bonbon", "points": 5,
+                                           "emoji": "🍬", "couleur": "#FFB74D", "categorie": "Gourmandises",
+                                           "repetable": True}]
+    for i in range(nb_attente):
+        appliquer_evenement(etat, nouvel_evenement("tache_completee", task=TACHES[i % len(TACHES)],
+                                                   user=("Enfant 1", "Enfant 2")[i % 2], date=date.today().isoformat(),
+                                                   points=10, en_attente=True))
+    return etat
+
+
+def chronometrer_script(cpu):
+    """Ajoute à `cpu` le temps CPU (ms) de chaque exécution du script, mesuré dans son fil."""
+    run_script = ScriptRunner._run_script
+
+    def _run_script(runner, rerun_data):
+        t0 = time.thread_time()
+        try:
+            run_script(runner, rerun_data)
+        finally:
+            cpu.append((time.thread_time() - t0) * 1000)
+    ScriptRunner._run_script = _run_script
+
+
+def interagir(at, action, cle_unite, cpu):
+    """
+    Joue `action` (clic, case cochée...) et retourne (ms CPU, éléments, octets) du rerun qui suit.
+    Avec les fragments, la requête porte l'id du fragment de l'unité, comme celle du navigateur.
+    """
+    avant = at._tree.get_widget_states()
+    file_fragments = []
+    if os.environ["FOYER_FRAGMENTS"] == "1":
+        file_fragments = at._fragment_storage.resolve_target(cle_unite)
+    # AppTest crée un exécuteur par rerun : ses requêtes portent la file de fragments
+    rerun_data = local_script_runner.RerunData
+    local_script_runner.RerunData = functools.partial(rerun_data, fragment_id_queue=file_fragments)
+    cpu.clear()
+    try:
+        action()
+        duree = sum(cpu)
+    finally:
+        local_script_runner.RerunData = rerun_data
+    nb, octets = mesurer(at)
+    # Le navigateur garde les widgets hors de l'unité : page reconstruite avec leurs états
+    etats = {w.id: w for w in avant.widgets}
+    etats.update({w.id: w for w in at._tree.get_widget_states().widgets})
+    page = WidgetStates()
+    page.widgets.extend(etats.values())
+    at._run(page)
+    return duree, nb, octets
+
+
+def scenarios(at):
+    """Chaque scénario amène l'application sur sa page puis retourne (action, clé de l'unité) du clic suivant."""
+    def missions():
+        at.sidebar.radio[0].set_value("🚀 Missions").run()
+        at.selectbox[0].set_value("Ado 1").run()
+
+    def clic_mission():
+        bouton = next(b for b in at.button if (b.key or "").startswith("btn_") and not b.disabled)
+        # Bouton « btn_<mission>_<membre>_<jeton> » : en rendu compact, l'unité est la catégorie de la mission
+        mission = IndexMissions(at.session_state["taches_personnalisees"]).mission(bouton.key[4:].rsplit("_", 2)[0])
+        return lambda: bouton.click().run(), f"missions_{mission['c']}"
+
+    def boutique():
+        at.sidebar.radio[0].set_value("🎁 Récompenses").run()
+
+    def clic_achat():
+        bouton = next(b for b in at.button if (b.key or "").startswith("buy_100_"))
+        return lambda: bouton.click().run(), f"recompense_{bouton.key.split('_')[1]}"
+
+    def validations():
+        at.session_state["parent_authenticated"] = True
+        at.sidebar.radio[0].set_value("⚙️ Espace Parents").run()
+
+    def case_cochee():
+        case = next(c for c in at.checkbox if not c.value)
+        return lambda: case.check().run(), "validations"
+
+    def clic_selection():
+        next(c for c in at.checkbox if not c.value).check().run()
+        bouton = next(b for b in at.button if b.label.startswith("Valider la sélection"))
+        return lambda: bouton.click().run(), "validations"
+
+    return [("mission envoyée", missions, clic_mission), ("achat", boutique, clic_achat),
+            ("case cochée", validations, case_cochee), ("validation sélection", validations, clic_selection)]
+
+
+def main():
+    nb_clics = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    nb_attente = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    resultats = {}
+    cpu = []
+    chronometrer_script(cpu)
+    # AppTest recompile le script à chaque rerun, le serveur garde son bytecode en cache
+    cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: cache
+    for fragments in ("0", "1"):
+        os.environ["FOYER_FRAGMENTS"] = fragments
+        oublier_application()
+        dossier = tempfile.mkdtemp(prefix="bench_fragments_")
+        try:
+            copier_depot(dossier)
+            StockageJSON(os.path.join(dossier, "data_foyer.json")).sauvegarder(etat_depart(nb_attente))
+            os.chdir(dossier)
+            at = AppTest.from_file(os.path.join(dossier, "main.py"), default_timeout=60).run()
+            for nom, preparer, clic in scenarios(at):
+                preparer()
+                mesures = []
+                for _ in range(nb_clics):
+                    action, cle_unite = clic()
+                    mesures.append(interagir(at, action, cle_unite, cpu))
+                    assert not at.exception, at.exception
+                resultats[nom, fragments] = [statistics.median(m[i] for m in mesures) for i in range(3)]
+        finally:
+            os.chdir(RACINE)
+            shutil.rmtree(dossier)
+
+    print(f"{nb_clics} clics par scénario, {nb_attente} missions en attente (médianes)\n")
+    print(f"  {'scénario':22} {'rerun complet':>28}   {'fragments':>28}")
+    for nom, *_ in scenarios(None):
+        colonnes = [f"{ms:6.1f} ms CPU {nb:4.0f} él. {octets / 1024:5.1f} Ko"
+                    for ms, nb, octets in (resultats[nom, "0"], resultats[nom, "1"])]
+        print(f"  {nom:22} {colonnes[0]:>28}   {colonnes[1]:>28}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Octets envoyés au navigateur par rerun, page par page, avec la feuille de style
+en ligne (server.enableStaticServing=false) et servie en fichier statique (un
+lien par rerun, le fichier est mis en cache par le navigateur). L'application
+tourne dans streamlit.testing (AppTest) sur une copie du dépôt, avec trois mois
+d'historique, une file d'attente et des achats dans la boutique.
+
+Pour comparer deux versions, donner la racine d'une autre copie de l'application
+(par exemple `git worktree add /tmp/avant HEAD~1`) : ses pages sont mesurées de
+la même façon.
+
+Usage : python bench/bench_payload.py [racine_application] [nb_en_attente]
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from streamlit import config  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from bench_fragments import etat_depart  # noqa: E402
+from bench_rendu import copier_depot, mesurer  # noqa: E402
+from stockage import StockageJSON  # noqa: E402
+
+MODES_FEUILLE = {"en ligne": False, "statique": True}
+
+
+def etat_boutique(nb_attente):
+    etat = etat_depart(nb_attente)
+    etat["recompenses_achetees"] = [{"id": i, "nom": nom, "date": "2026-01-0%d" % i, "points_utilises": 50}
+                                    for i, nom in ((1, "🎮 Soirée Jeux Vidéo"), (3, "🍦 Dessert Spécial"), (4, "🎁 Petit Cadeau"))]
+    return etat
+
+
+def pages(at):
+    """Chaque page : (nom, préparation) ; la mesure porte sur le rerun qui suit la préparation."""
+    def missions():
+        at.sidebar.radio[0].set_value("🚀 Missions").run()
+        at.selectbox[0].set_value("Ado 1").run()
+
+    def recompenses():
+        at.sidebar.radio[0].set_value("🎁 Récompenses").run()
+
+    def calendrier():
+        at.sidebar.radio[0].set_value("📅 Calendrier").run()
+        at.radio[0].set_value("Semaine").run()
+
+    def parents():
+        at.session_state["parent_authenticated"] = True
+        at.sidebar.radio[0].set_value("⚙️ Espace Parents").run()
+
+    def classement():
+        at.session_state["parent_authenticated"] = True
+        at.sidebar.radio[0].set_value("🏆 Classement").run()
+
+    return [("Missions", missions), ("Récompenses", recompenses), ("Calendrier", calendrier),
+            ("Espace Parents", parents), ("Classement", classement)]
+
+
+def main():
+    depot = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else RACINE
+    nb_attente = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    resultats = {}
+    dossier = tempfile.mkdtemp(prefix="bench_payload_")
+    try:
+        copier_depot(dossier, depot)
+        StockageJSON(os.path.join(dossier, "data_foyer.json")).sauvegarder(etat_boutique(nb_attente))
+        os.chdir(dossier)
+        for mode, statique in MODES_FEUILLE.items():
+            config.set_option("server.enableStaticServing", statique)
+            at = AppTest.from_file(os.path.join(dossier, "main.py"), default_timeout=60).run()
+            for nom, preparer in pages(at):
+                preparer()
+                at.run()
+                assert not at.exception, at.exception
+                resultats[nom, mode] = mesurer(at)
+    finally:
+        os.chdir(RACINE)
+        shutil.rmtree(dossier)
+
+    print(f"Application : {depot}")
+    print(f"  {'page':20} " + "   ".join(f"{'feuille ' + mode:>24}" for mode in MODES_FEUILLE))
+    for nom, _ in pages(None):
+        colonnes = [f"{resultats[nom, mode][0]:4d} él. {resultats[nom, mode][1]:8,d} o" for mode in MODES_FEUILLE]
+        print(f"  {nom:20} " + "   ".join(f"{colonne:>24}" for colonne in colonnes))
+
+
+if __name__ == "__main__":
+    main()
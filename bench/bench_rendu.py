@@ -0,0 +1,122 @@
+"""
+Compte les éléments envoyés au navigateur (≈ deltas du websocket) et leur taille
+par rerun, pour les pages Missions et Calendrier, en affichage détaillé et allégé
+(FOYER_RENDU=detaille|compact). L'application tourne dans streamlit.testing
+(AppTest) sur une copie du dépôt et un mois d'historique synthétique chargé.
+
+Usage : python bench/bench_rendu.py [completions_par_membre_et_par_jour]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from bench_stockage import TACHES  # noqa: E402
+from stockage import CONFIG_DEFAUT, StockageJSON, etat_vide  # noqa: E402
+
+MODES_RENDU = ["detaille", "compact"]
+
+
+def copier_depot(dossier, depot=RACINE):
+    for nom in os.listdir(depot):
+        if nom in (".git", "bench") or nom.startswith("data_foyer"):
+            continue
+        source = os.path.join(depot, nom)
+        (shutil.copytree if os.path.isdir(source) else shutil.copy)(source, os.path.join(dossier, nom))
+
+
+def oublier_application():
+    """
+    Retire de sys.modules les modules qui lisent les options d'affichage (FOYER_RENDU...) à l'import :
+    le prochain AppTest les relit avec l'environnement courant, comme un serveur redémarré.
+    """
+    for nom in [nom for nom in sys.modules if nom == "session" or nom.split(".")[0] == "vues"]:
+        del sys.modules[nom]
+
+
+def etat_mois_charge(par_jour):
+    """Historique de 90 jours : `par_jour` complétions par membre et par jour."""
+    etat = etat_vide()
+    membres = [m for role in CONFIG_DEFAUT.values() for m in role]
+    for i in range(90, -1, -1):
+        jour = (date.today() - timedelta(days=i)).isoformat()
+        for user in membres:
+            for n in range(par_jour):
+                etat["taches_completees"].append({"task": TACHES[n % len(TACHES)], "user": user, "date": jour,
+                                                  "points": 10, "timestamp": f"{jour}T12:00:{n:02d}", "validated": True})
+    del etat["cumuls"]  # reconstruits au chargement
+    return etat
+
+
+def mesurer(at):
+    """Retourne (nombre d'éléments, octets) de l'arbre rendu par le dernier rerun."""
+    nb, octets = 0, 0
+    pile = list(at._tree.children.values())
+    while pile:
+        noeud = pile.pop()
+        nb += 1
+        proto = getattr(noeud, "proto", None)
+        if proto is not None:
+            octets += proto.ByteSize()
+        pile.extend((getattr(noeud, "children", None) or {}).values())
+    return nb, octets
+
+
+def scenarios(at):
+    """Chaque scénario amène l'application sur une page puis mesure un rerun."""
+    def missions_enfant():
+        at.sidebar.radio[0].set_value("🚀 Missions").run()
+        at.selectbox[0].set_value("Ado 1").run()
+
+    def missions_parent():
+        at.session_state["parent_authenticated"] = True
+        at.sidebar.radio[0].set_value("🚀 Missions").run()
+        at.selectbox[0].set_value("Papa").run()
+
+    def calendrier_mois():
+        at.sidebar.radio[0].set_value("📅 Calendrier").run()
+        at.radio[0].set_value("Mois").run()
+
+    def calendrier_periode():
+        at.sidebar.radio[0].set_value("📅 Calendrier").run()
+        at.radio[0].set_value("Période").run()
+        at.date_input[0].set_value((date.today() - timedelta(days=90), date.today())).run()
+
+    return [("Missions (ado)", missions_enfant), ("Missions (parent)", missions_parent),
+            ("Calendrier (mois)", calendrier_mois), ("Calendrier (90 jours)", calendrier_periode)]
+
+
+def main():
+    par_jour = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    dossier = tempfile.mkdtemp(prefix="bench_rendu_")
+    try:
+        copier_depot(dossier)
+        StockageJSON(os.path.join(dossier, "data_foyer.json")).sauvegarder(etat_mois_charge(par_jour))
+        os.chdir(dossier)
+        print(f"{par_jour} complétions par membre et par jour sur 90 jours")
+        print(f"  {'scénario':24} {'rendu':9} {'éléments':>9} {'octets':>9} {'rerun':>9}")
+        for mode in MODES_RENDU:
+            os.environ["FOYER_RENDU"] = mode
+            oublier_application()
+            at = AppTest.from_file(os.path.join(dossier, "main.py"), default_timeout=60).run()
+            for nom, preparer in scenarios(at):
+                preparer()
+                t0 = time.perf_counter()
+                at.run()
+                duree = (time.perf_counter() - t0) * 1000
+                nb, octets = mesurer(at)
+                print(f"  {nom:24} {mode:9} {nb:9d} {octets:9,d} {duree:7.0f} ms")
+    finally:
+        os.chdir(RACINE)
+        shutil.rmtree(dossier)
+
+
+if __name__ == "__main__":
+    main()
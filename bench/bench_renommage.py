@@ -0,0 +1,53 @@
+"""
+Compare le renommage d'un membre avant les ids (nom réécrit dans l'historique,
+la file de validation, le classement et les cumuls) au renommage par id (une
+seule entrée de "noms"), pour chaque mode de stockage.
+
+Usage : python bench/bench_renommage.py [nb_taches_completees]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stockage import etat_synthetique  # noqa: E402
+from evenements import cumuls_depuis_historique, nouvel_evenement  # noqa: E402
+from stockage import MODES, StockageJSON, ouvrir_stockage  # noqa: E402
+
+
+def main():
+    nb = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    random.seed(8)
+    etat_initial = etat_synthetique(nb)
+    etat_initial["cumuls"] = cumuls_depuis_historique(etat_initial["taches_completees"])
+    dossier = tempfile.mkdtemp(prefix="bench_renommage_")
+    print(f"Historique : {nb} tâches complétées\n")
+    print(f"{'mode':<10}{'par le nom':>14}{'par id':>12}")
+    try:
+        for mode in MODES:
+            durees = []
+            for par_id in (False, True):
+                chemin = os.path.join(dossier, f"{mode}_{par_id}", "data_foyer.json")
+                os.makedirs(os.path.dirname(chemin))
+                StockageJSON(chemin).sauvegarder(etat_initial)
+                stockage = ouvrir_stockage(chemin, mode)
+                stockage.charger()
+                if par_id:
+                    evt = nouvel_evenement("renommage", id="Enfant 1", nom="Léa")
+                else:
+                    evt = nouvel_evenement("renommage", role="enfants", index=0, ancien="Enfant 1", nouveau="Léa")
+                t0 = time.perf_counter()
+                stockage.appliquer(evt)
+                durees.append((time.perf_counter() - t0) * 1000)
+                stockage.fermer()
+            print(f"{mode:<10}{durees[0]:>11.1f} ms{durees[1]:>9.1f} ms")
+    finally:
+        shutil.rmtree(dossier)
+
+
+if __name__ == "__main__":
+    main()
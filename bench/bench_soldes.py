@@ -0,0 +1,98 @@
+"""
+Mesure la réconciliation des soldes (soldes.reconcilier) sur un historique
+synthétique de plusieurs années, archivé par mois comme en production.
+
+Le foyer est construit en rejouant les événements (missions, validations le
+lendemain, achats) : les compteurs tenus par les réducteurs doivent être égaux
+au pli de l'historique. Un écart est ensuite introduit puis corrigé.
+
+Usage : python bench/bench_soldes.py [nb_annees] [completions_par_membre_et_par_jour]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archives import archiver, lire_historique  # noqa: E402
+from bench_stockage import MEMBRES, TACHES  # noqa: E402
+from evenements import appliquer_evenement, nouvel_evenement, plier_achats, plier_completions  # noqa: E402
+from soldes import FICHIER_POINTS_CONTROLE, reconcilier, solde_vide  # noqa: E402
+from stockage import StockageJSON, etat_vide, ouvrir_stockage  # noqa: E402
+
+ENFANTS = {"Enfant 1", "Enfant 2"}
+
+
+def etat_rejoue(nb_annees, par_jour):
+    """Rejoue `nb_annees` d'événements ; les missions des enfants sont validées le lendemain."""
+    etat = etat_vide()
+    debut = date.today() - timedelta(days=365 * nb_annees)
+    en_attente = []
+    for i in range(365 * nb_annees + 1):
+        jour = (debut + timedelta(days=i)).isoformat()
+        for item in en_attente:
+            appliquer_evenement(etat, nouvel_evenement("validation", index=0, user=item["user"],
+                                                       task=item["task"], date=jour))
+        en_attente = []
+        for user in MEMBRES:
+            for n in range(par_jour):
+                evt = nouvel_evenement("tache_completee", task=random.choice(TACHES), user=user, date=jour,
+                                       points=random.choice((5, 10, 15)), en_attente=user in ENFANTS and n == 0)
+                appliquer_evenement(etat, evt)
+                if evt["en_attente"]:
+                    en_attente.append(evt)
+        if i % 5 == 0 and etat["points_foyer"] >= 50:
+            appliquer_evenement(etat, nouvel_evenement("achat", id=1, nom="🍦 Dessert Spécial", points=50, date=jour))
+    return etat
+
+
+def main():
+    nb_annees = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    par_jour = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    random.seed(3)
+    dossier = tempfile.mkdtemp(prefix="bench_soldes_")
+    chemin = os.path.join(dossier, "data_foyer.json")
+    try:
+        t0 = time.perf_counter()
+        StockageJSON(chemin).sauvegarder(etat_rejoue(nb_annees, par_jour))
+        stockage = ouvrir_stockage(chemin, "json")
+        nb_archivees = archiver(stockage)
+        etat = stockage.charger()
+        print(f"{nb_annees} an(s), {len(MEMBRES)} membres × {par_jour} missions/jour : "
+              f"{nb_archivees:,} tâches archivées, {len(etat['taches_completees']):,} chaudes, "
+              f"{len(etat['recompenses_achetees']):,} achats (préparation {time.perf_counter() - t0:.1f} s)")
+
+        # Référence : tout l'historique chargé en mémoire puis plié
+        t0 = time.perf_counter()
+        tout = lire_historique(etat["taches_completees"], chemin, etat["archive_avant"], "0000-01-01", "9999-12-31")
+        plier_achats(plier_completions(solde_vide(), tout), etat["recompenses_achetees"])
+        print(f"  historique complet en mémoire puis pli : {(time.perf_counter() - t0) * 1000:8.0f} ms")
+
+        for libelle in ("sans point de contrôle", "points de contrôle valides"):
+            t0 = time.perf_counter()
+            rapport = reconcilier(stockage)
+            duree = (time.perf_counter() - t0) * 1000
+            ecart = rapport["classement"] or rapport["cumuls"] or rapport["points_foyer"][0] != rapport["points_foyer"][1]
+            print(f"  réconciliation, {libelle:26}: {duree:8.0f} ms  "
+                  f"({rapport['mois_relus']} mois relus, {'ÉCART' if ecart else 'cohérent'})")
+        taille = os.path.getsize(os.path.join(dossier, "data_foyer_archives", FICHIER_POINTS_CONTROLE))
+        print(f"  points de contrôle : {taille:,} octets")
+
+        # Dérive simulée puis corrigée
+        stockage.appliquer(nouvel_evenement("reconciliation", points_foyer=etat["points_foyer"] + 123,
+                                            classement={**etat["classement"], "Papa": 0}))
+        rapport = reconcilier(stockage, appliquer=True)
+        print(f"  dérive simulée : {len(rapport['classement'])} membre(s) et trésor "
+              f"{rapport['points_foyer'][0]} -> {rapport['points_foyer'][1]}, corrigée : {rapport['corrige']}, "
+              f"ensuite cohérent : {not any(reconcilier(stockage)[cle] for cle in ('classement', 'cumuls'))}")
+        stockage.fermer()
+    finally:
+        shutil.rmtree(dossier)
+
+
+if __name__ == "__main__":
+    main()
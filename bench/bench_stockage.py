@@ -0,0 +1,81 @@
+"""
+Compare les modes de stockage (json, journal, sqlite) sur un historique synthétique.
+
+Usage : python bench/bench_stockage.py [nb_taches_completees]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evenements import nouvel_evenement, appliquer_evenement  # noqa: E402
+from stockage import MODES, StockageJSON, etat_vide  # noqa: E402
+
+MEMBRES = ["Papa", "Maman", "Ado 1", "Enfant 1", "Enfant 2"]
+TACHES = ["🍽️ Maître du Dressage", "🧼 Ninja du Débarrassage", "🌀 Aspirateur-Man", "🗑️ Maître des Bacs", "🦷 Sourire Éclatant"]
+
+
+def etat_synthetique(nb):
+    """Construit un état avec `nb` tâches complétées réparties sur les derniers jours."""
+    etat = etat_vide()
+    debut = date.today() - timedelta(days=nb // 10 + 1)
+    for i in range(nb):
+        user = random.choice(MEMBRES)
+        jour = (debut + timedelta(days=i // 10)).isoformat()
+        etat["taches_completees"].append({
+            "task": random.choice(TACHES), "user": user, "date": jour,
+            "points": 10, "timestamp": f"{jour}T12:00:00", "validated": True
+        })
+        etat["classement"][user] = etat["classement"].get(user, 0) + 10
+        etat["points_foyer"] += 10
+    return etat
+
+
+def chrono(fonction, repetitions=5):
+    """Retourne le meilleur temps d'exécution en millisecondes."""
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - t0)
+    return meilleur * 1000
+
+
+def main():
+    nb = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    random.seed(42)
+    etat_initial = etat_synthetique(nb)
+    aujourd_hui = date.today()
+    lundi = (aujourd_hui - timedelta(days=aujourd_hui.weekday())).isoformat()
+    dossier = tempfile.mkdtemp(prefix="bench_stockage_")
+    print(f"Historique : {nb} tâches complétées\n")
+    print(f"{'mode':<10}{'charger':>12}{'1 action':>12}{'requête semaine':>18}")
+    try:
+        for mode, classe in MODES.items():
+            chemin = os.path.join(dossier, mode, "data_foyer.json")
+            os.makedirs(os.path.dirname(chemin))
+            StockageJSON(chemin).sauvegarder(etat_initial)
+            stockage = classe(chemin)
+            etat = stockage.charger()
+
+            def une_action():
+                evt = nouvel_evenement("tache_completee", task=TACHES[0], user="Enfant 1", points=10,
+                                       date=aujourd_hui.isoformat(), en_attente=False)
+                appliquer_evenement(etat, evt)
+                stockage.enregistrer(evt, etat)
+
+            t_charger = chrono(stockage.charger)
+            t_action = chrono(une_action, repetitions=20)
+            t_requete = chrono(lambda: stockage.historique(user="Enfant 1", task=TACHES[0], debut=lundi))
+            print(f"{mode:<10}{t_charger:>10.1f}ms{t_action:>10.2f}ms{t_requete:>16.2f}ms")
+    finally:
+        shutil.rmtree(dossier)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Suite de benchmarks des chemins chauds, sur des foyers synthétiques de plus en
+plus anciens (bench/foyer_synthetique.py) :
+- ouverture du foyer et copie de session, par le chemin de l'application
+  (session.stockage_foyer puis StockageEnCache.copie, à froid puis en cache),
+  écriture d'une mission envoyée (StockageEnCache.appliquer), et instantané
+  complet écrit par le mode de stockage (sauvegarder : fichier JSON entier,
+  compaction du journal, migration SQLite) ;
+- page Missions à chaque changement de membre (règles de fréquence évaluées) ;
+- vue Mois du Calendrier, puis les mois précédents (lus dans les archives) ;
+- validation d'une mission cochée dans la file de l'Espace Parents ;
+- achat d'une récompense.
+
+Chaque foyer est mesuré dans un processus neuf, sur une copie de l'application
+dans streamlit.testing (AppTest) : temps réel et temps CPU du fil du script
+(médianes de REPETITIONS mesures). La première ouverture, qui range l'historique
+ancien dans les archives, est mesurée à part. Le mode de stockage est celui de
+FOYER_STOCKAGE.
+
+Les résultats sont écrits en JSON (--sortie). --comparer relit un fichier
+précédent et signale les mesures plus lentes que tolérance × la référence (code
+de sortie 1). Pour mesurer une autre version, donner la racine d'une autre copie
+de l'application (--depot, par exemple `git worktree add /tmp/avant HEAD~1`).
+
+Usage : python bench/bench_suite.py [nb_annees ...] [--sortie bench_suite.json]
+                                    [--comparer reference.json] [--tolerance 1.25] [--depot racine]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+REPETITIONS = 5
+# En dessous, un écart relève du bruit de mesure plutôt que d'une régression
+ECART_MINIMAL_MS = 2.0
+
+
+# --- MESURES (processus neuf, application copiée) ---
+def chronometrer_script(cpu):
+    """Ajoute à `cpu` le temps CPU (ms) de chaque exécution du script, mesuré dans son fil."""
+    from streamlit.runtime.scriptrunner import ScriptRunner
+
+    run_script = ScriptRunner._run_script
+
+    def _run_script(runner, rerun_data):
+        t0 = time.thread_time()
+        try:
+            run_script(runner, rerun_data)
+        finally:
+            cpu.append((time.thread_time() - t0) * 1000)
+    ScriptRunner._run_script = _run_script
+
+
+def chrono(action, cpu=None):
+    """Joue `action` et retourne (ms réelles, ms CPU) : CPU du fil du script si `cpu` est donné, sinon du fil courant."""
+    if cpu is not None:
+        cpu.clear()
+    t0, t0_cpu = time.perf_counter(), time.thread_time()
+    action()
+    duree = (time.perf_counter() - t0) * 1000
+    return duree, sum(cpu) if cpu is not None else (time.thread_time() - t0_cpu) * 1000
+
+
+def scenarios(at, config):
+    """Chaque scénario : (nom, préparation, action mesurée à chaque répétition)."""
+    # Un autre membre à chaque fois : son éligibilité n'est pas encore en cache
+    membres = itertools.cycle(config["ados"] + config["enfants"])
+
+    def missions():
+        at.sidebar.radio[0].set_value("🚀 Missions").run()
+
+    def changer_membre():
+        at.selectbox[0].set_value(next(membres)).run()
+
+    def calendrier():
+        at.sidebar.radio[0].set_value("📅 Calendrier").run()
+        at.radio[0].set_value("Mois").run()
+
+    def mois_precedent():
+        at.button(key="cal_precedent").click().run()
+
+    def validations():
+        at.session_state["parent_authenticated"] = True
+        at.sidebar.radio[0].set_value("⚙️ Espace Parents").run()
+
+    def valider_cochee():
+        next(c for c in at.checkbox if "sel_" in (c.key or "") and not c.value).check().run()
+        bouton = next(b for b in at.button if b.label.startswith("Valider la sélection"))
+        return lambda: bouton.click().run()
+
+    def boutique():
+        at.sidebar.radio[0].set_value("🎁 Récompenses").run()
+
+    def acheter():
+        bouton = next(b for b in at.button if (b.key or "").startswith("buy_100_"))
+        return lambda: bouton.click().run()
+
+    return [("Missions (changement de membre)", missions, lambda: changer_membre),
+            ("Calendrier (mois)", calendrier, lambda: at.run),
+            ("Calendrier (mois précédent)", calendrier, lambda: mois_precedent),
+            ("validation d'une mission", validations, valider_cochee),
+            ("achat d'une récompense", boutique, acheter)]
+
+
+def mesurer_foyer(dossier):
+    """Dans ce processus neuf : mesures de l'application copiée dans `dossier` sur son data_foyer.json."""
+    os.chdir(dossier)
+    sys.path.insert(0, dossier)
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest, app_test
+    from streamlit.testing.v1 import local_script_runner
+
+    from evenements import nouvel_evenement
+    from foyers import FOYER_DEFAUT
+    from session import CLES_SESSION, registre_foyers, stockage_foyer
+
+    cpu = []
+    chronometrer_script(cpu)
+    # AppTest recompile le script à chaque rerun, le serveur garde son bytecode en cache
+    cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: cache
+
+    with open("data_foyer.json", encoding="utf-8") as f:
+        config = json.load(f)["config"]
+    at = AppTest.from_file(os.path.join(dossier, "main.py"), default_timeout=120)
+    mesures = {"première ouverture": [chrono(at.run, cpu)]}
+    assert not at.exception, at.exception
+
+    for nom, preparer, action in scenarios(at, config):
+        # Après un clic, seul le fragment de son unité a été relancé : page complète reconstruite d'abord
+        at.run()
+        preparer()
+        mesures[nom] = []
+        for _ in range(REPETITIONS):
+            mesures[nom].append(chrono(action(), cpu))
+            assert not at.exception, at.exception
+
+    # Chemin de l'application hors script : registre des foyers (le même que celui des sessions
+    # AppTest, partagé par st.cache_resource), copie de session, puis écriture d'un événement
+    def copie_a_froid():
+        registre_foyers().fermer_tout()
+        stockage_foyer(FOYER_DEFAUT).copie(CLES_SESSION)
+
+    def envoyer_mission():
+        stockage_foyer(FOYER_DEFAUT).appliquer(nouvel_evenement(
+            "tache_completee", task="🍽️ Mettre la table", user=config["enfants"][0], points=10,
+            date=datetime.now().date().isoformat(), en_attente=True, cle=os.urandom(8).hex()))
+
+    mesures["stockage_foyer + copie (à froid)"] = [chrono(copie_a_froid) for _ in range(REPETITIONS)]
+    mesures["stockage_foyer + copie (en cache)"] = [chrono(lambda: stockage_foyer(FOYER_DEFAUT).copie(CLES_SESSION))
+                                                    for _ in range(REPETITIONS)]
+    mesures["appliquer (mission envoyée)"] = [chrono(envoyer_mission) for _ in range(REPETITIONS)]
+    etat = stockage_foyer(FOYER_DEFAUT).charger()
+    # Plus appelé depuis une session, mais toujours écrit par le mode de stockage (compaction, migration)
+    stockage = stockage_foyer(FOYER_DEFAUT).stockage
+    mesures["sauvegarder (instantané complet)"] = [chrono(lambda: stockage.sauvegarder(etat))
+                                                   for _ in range(REPETITIONS)]
+    return {"historique_chaud": len(etat["taches_completees"]), "octets": os.path.getsize("data_foyer.json"),
+            "mesures": {nom: {"ms": statistics.median(m[0] for m in valeurs),
+                              "cpu_ms": statistics.median(m[1] for m in valeurs)}
+                        for nom, valeurs in mesures.items()}}
+
+
+# --- SUITE ---
+def version_depot(depot):
+    try:
+        return subprocess.run(["git", "-C", depot, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparer(resultats, reference, tolerance):
+    """Affiche les rapports aux mesures de `reference` ; retourne le nombre de régressions."""
+    foyers_reference = {foyer["nb_annees"]: foyer for foyer in reference["foyers"]}
+    regressions = 0
+    print(f"\nComparaison avec {reference.get('version') or reference['depot']} ({reference['date']}), "
+          f"tolérance × {tolerance:g}")
+    for foyer in resultats["foyers"]:
+        ancien = foyers_reference.get(foyer["nb_annees"])
+        if ancien is None:
+            continue
+        for nom, mesure in foyer["mesures"].items():
+            avant = ancien["mesures"].get(nom)
+            if avant is None:
+                continue
+            rapport = mesure["ms"] / avant["ms"] if avant["ms"] else float("inf")
+            regression = rapport > tolerance and mesure["ms"] - avant["ms"] > ECART_MINIMAL_MS
+            regressions += regression
+            print(f"  {foyer['nb_annees']} an(s)  {nom:32} {avant['ms']:8.1f} → {mesure['ms']:8.1f} ms  × {rapport:5.2f}"
+                  f"{'  RÉGRESSION' if regression else ''}")
+    return regressions
+
+
+def main():
+    if sys.argv[1:2] == ["--foyer"]:
+        print(json.dumps(mesurer_foyer(sys.argv[2])))
+        return
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins chauds sur des foyers synthétiques.")
+    parser.add_argument("annees", nargs="*", type=int, default=[1, 3], help="ancienneté des foyers mesurés (années)")
+    parser.add_argument("--sortie", default="bench_suite.json", help="fichier JSON des résultats")
+    parser.add_argument("--comparer", help="résultats de référence (JSON d'un passage précédent)")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="rapport au-delà duquel une mesure régresse")
+    parser.add_argument("--depot", default=RACINE, help="racine de l'application mesurée")
+    args = parser.parse_args()
+
+    from bench_rendu import copier_depot
+    from foyer_synthetique import foyer_synthetique
+    from stockage import StockageJSON
+
+    import streamlit
+
+    depot = os.path.abspath(args.depot)
+    resultats = {"date": datetime.now().isoformat(timespec="seconds"), "depot": depot, "version": version_depot(depot),
+                 "python": platform.python_version(), "streamlit": streamlit.__version__,
+                 "stockage": os.environ.get("FOYER_STOCKAGE", "json"), "repetitions": REPETITIONS, "foyers": []}
+    for nb_annees in args.annees:
+        etat = foyer_synthetique(nb_annees)
+        dossier = tempfile.mkdtemp(prefix="bench_suite_")
+        try:
+            copier_depot(dossier, depot)
+            StockageJSON(os.path.join(dossier, "data_foyer.json")).sauvegarder(etat)
+            sortie = subprocess.run([sys.executable, os.path.abspath(__file__), "--foyer", dossier],
+                                    capture_output=True, text=True, check=True).stdout
+        finally:
+            shutil.rmtree(dossier)
+        foyer = {"nb_annees": nb_annees, "membres": sum(len(membres) for membres in etat["config"].values()),
+                 "completions": len(etat["taches_completees"]), "en_attente": len(etat["attente_validation"]),
+                 **json.loads(sortie.strip().splitlines()[-1])}
+        resultats["foyers"].append(foyer)
+
+        print(f"{nb_annees} an(s) : {foyer['membres']} membres, {foyer['completions']:,} missions "
+              f"({foyer['historique_chaud']:,} hors archives), {foyer['en_attente']} en attente")
+        for nom, mesure in foyer["mesures"].items():
+            print(f"  {nom:34} {mesure['ms']:8.1f} ms   {mesure['cpu_ms']:8.1f} ms CPU")
+
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(resultats, f, ensure_ascii=False, indent=1)
+    print(f"\nRésultats : {args.sortie}")
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            reference = json.load(f)
+        sys.exit(1 if comparer(resultats, reference, args.tolerance) else 0)
+
+
+if __name__ == "__main__":
+    main()
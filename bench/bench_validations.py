@@ -0,0 +1,80 @@
+"""
+Compare la validation d'une file de missions en attente une par une (un
+événement, une transaction et une sauvegarde par mission, comme l'ancien
+bouton « Valider ») à la validation groupée (un seul événement "validation"
+portant tous les ids), pour chaque mode de stockage.
+
+Usage : python bench/bench_validations.py [nb_taches_completees] [nb_en_attente]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attente import IndexAttente  # noqa: E402
+from bench_stockage import TACHES, chrono, etat_synthetique  # noqa: E402
+from evenements import appliquer_evenement, nouvel_evenement  # noqa: E402
+from stockage import MODES, StockageJSON, ouvrir_stockage  # noqa: E402
+
+ENFANTS = ["Enfant 1", "Enfant 2", "Ado 1"]
+
+
+def preparer(chemin, etat_initial, nb_attente):
+    """Écrit l'état avec `nb_attente` missions envoyées ces trois derniers jours ; retourne leurs ids."""
+    etat = {**etat_initial, "taches_completees": list(etat_initial["taches_completees"]), "attente_validation": []}
+    for i in range(nb_attente):
+        jour = (date.today() - timedelta(days=i % 3)).isoformat()
+        appliquer_evenement(etat, nouvel_evenement("tache_completee", task=random.choice(TACHES),
+                                                   user=ENFANTS[i % len(ENFANTS)], date=jour, points=10, en_attente=True))
+    StockageJSON(chemin).sauvegarder(etat)
+    return [item["id"] for item in etat["attente_validation"]]
+
+
+def main():
+    nb = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    nb_attente = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    random.seed(5)
+    etat_initial = etat_synthetique(nb)
+    aujourd_hui = date.today().isoformat()
+    dossier = tempfile.mkdtemp(prefix="bench_validations_")
+    print(f"Historique : {nb} tâches, {nb_attente} missions en attente\n")
+    print(f"{'mode':<10}{'une par une':>14}{'groupée':>12}")
+    try:
+        for mode in MODES:
+            durees = []
+            for groupee in (False, True):
+                chemin = os.path.join(dossier, f"{mode}_{groupee}", "data_foyer.json")
+                os.makedirs(os.path.dirname(chemin))
+                ids = preparer(chemin, etat_initial, nb_attente)
+                stockage = ouvrir_stockage(chemin, mode)
+                stockage.charger()
+                t0 = time.perf_counter()
+                if groupee:
+                    stockage.appliquer(nouvel_evenement("validation", ids=ids, date=aujourd_hui))
+                else:
+                    for id_attente in ids:
+                        stockage.appliquer(nouvel_evenement("validation", ids=[id_attente], date=aujourd_hui))
+                durees.append((time.perf_counter() - t0) * 1000)
+                etat = stockage.charger()
+                assert not etat["attente_validation"]
+                assert all(t.get("validated") is not False for t in etat["taches_completees"])
+                stockage.fermer()
+            print(f"{mode:<10}{durees[0]:>11.1f} ms{durees[1]:>9.1f} ms")
+    finally:
+        shutil.rmtree(dossier)
+
+    # Compte des missions en attente d'un enfant (page Missions) : parcours de la file ou index par membre
+    file = [{"id": str(i), "user": ENFANTS[i % len(ENFANTS)], "task": "", "pts": 10} for i in range(nb_attente * 100)]
+    index = IndexAttente(file)
+    t_scan = chrono(lambda: len([m for m in file if m["user"] == "Enfant 1"]), repetitions=20)
+    t_index = chrono(lambda: index.nb("Enfant 1"), repetitions=20)
+    print(f"\nfile de {len(file)} missions, compte d'un enfant : parcours {t_scan:.3f} ms, index {t_index:.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Foyers synthétiques au format de data_foyer.json : membres (parents, ados,
+enfants) avec leurs ids et leurs noms, missions et récompenses personnalisées,
+et plusieurs années d'historique avec les achats, le classement, le trésor et
+les cumuls qui vont avec.
+
+Le rythme suit une vraie famille : chaque membre fait chaque jour quelques
+missions de son rôle (chacune au plus une fois par jour). Les missions des ados
+et des enfants passent par la validation d'un parent : validées, parfois
+refusées (elles restent alors dans l'historique sans rapporter de points), et
+encore en attente sur les derniers jours. La famille dépense son trésor en
+récompenses quand elle le peut, en respectant leurs délais.
+
+Le fichier n'est pas archivé : à sa première ouverture, l'application range
+l'historique validé de plus d'un mois dans les archives mensuelles, comme pour
+un foyer qui passe à cette version.
+
+Usage : python bench/foyer_synthetique.py sortie.json [nb_annees] [parents ados enfants]
+"""
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalogue import CATEGORIES, RECOMPENSES, ROLES, IndexMissions  # noqa: E402
+from evenements import cumuls_depuis_historique  # noqa: E402
+from frequences import REGLES_FREQUENCE  # noqa: E402
+from gabarits import DEGRADES  # noqa: E402
+from stockage import StockageJSON, etat_vide  # noqa: E402
+
+# Récompense personnalisée répétable sans délai : toujours achetable (bench_suite.py l'achète)
+BONBON = {"id": 100, "nom": "🍬 Bonbon", "description": "Un bonbon au choix", "points": 5, "emoji": "🍬",
+          "couleur": DEGRADES[6], "categorie": "Gourmandises", "repetable": True}
+EMOJIS = "🎨🧩🎲🏊🎳🛹🎤📚🍕🚲"
+
+
+def _membres(rng, parents, ados, enfants):
+    """Config et noms d'un foyer : chaque membre a un id court immuable, comme ceux créés par l'Espace Parents."""
+    config, noms, roles = {"parents": [], "ados": [], "enfants": []}, {}, {}
+    for cle, role, nb in (("parents", "Parent", parents), ("ados", "Ado", ados), ("enfants", "Enfant", enfants)):
+        for i in range(nb):
+            membre = f"{rng.getrandbits(32):08x}"
+            config[cle].append(membre)
+            noms[membre] = f"{role} {i + 1}"
+            roles[membre] = role
+    return config, noms, roles
+
+
+def _taches_personnalisees(rng, nb):
+    taches = []
+    for i in range(nb):
+        tache = {"n": f"⭐ Mission maison {i + 1}", "p": rng.choice((5, 10, 15, 20, 30)), "c": rng.choice(CATEGORIES),
+                 "r": rng.sample(ROLES, rng.randint(1, len(ROLES))), "d": "Mission créée par les parents.",
+                 "f": rng.choice(list(REGLES_FREQUENCE) + [None])}
+        if i % 3 == 1:
+            tache["regle"] = {"max_semaine": 2}
+        elif i % 3 == 2:
+            tache["regle"] = {"delai_jours": 3}
+        taches.append(tache)
+    return taches
+
+
+def _recompenses_personnalisees(rng, nb):
+    recompenses = [dict(BONBON)]
+    for i in range(1, nb):
+        emoji = EMOJIS[i % len(EMOJIS)]
+        recompense = {"id": BONBON["id"] + i, "nom": f"{emoji} Surprise {i}", "description": "Récompense choisie par les parents.",
+                      "points": rng.choice((20, 40, 60, 80, 150)), "emoji": emoji, "couleur": rng.choice(DEGRADES),
+                      "categorie": rng.choice(("Sorties", "Privilèges", "Cadeaux")), "repetable": i % 4 != 0}
+        if recompense["repetable"] and i % 2:
+            recompense["delai_jours"] = rng.choice((3, 7, 14))
+        recompenses.append(recompense)
+    return recompenses
+
+
+def foyer_synthetique(nb_annees=3, parents=2, ados=1, enfants=2, nb_taches=8, nb_recompenses=6, par_jour=3,
+                      jours_en_attente=3, part_refus=0.03, graine=42, aujourd_hui=None):
+    """
+    Retourne l'état d'un foyer utilisé depuis `nb_annees` ans : ~`par_jour` missions par membre et
+    par jour, en attente de validation sur les `jours_en_attente` derniers jours (ados et enfants).
+    """
+    rng = random.Random(graine)
+    aujourd_hui = aujourd_hui or date.today()
+    etat = etat_vide()
+    etat["config"], etat["noms"], roles = _membres(rng, parents, ados, enfants)
+    etat["taches_personnalisees"] = _taches_personnalisees(rng, nb_taches)
+    etat["recompenses_personnalisees"] = _recompenses_personnalisees(rng, nb_recompenses)
+
+    missions = IndexMissions(etat["taches_personnalisees"])
+    recompenses = RECOMPENSES + etat["recompenses_personnalisees"]
+    derniers_achats = {}
+    debut = aujourd_hui - timedelta(days=365 * nb_annees)
+    for n in range((aujourd_hui - debut).days + 1):
+        jour = debut + timedelta(days=n)
+        iso = jour.isoformat()
+        en_attente = (aujourd_hui - jour).days < jours_en_attente
+        k = 0
+        for membre, role in roles.items():
+            proposees = missions.missions(role)
+            for mission in rng.sample(proposees, min(len(proposees), rng.randint(0, 2 * par_jour))):
+                k += 1
+                # Horodatage unique dans la journée : c'est aussi l'id d'une mission en attente
+                ts = f"{iso}T{7 + k // 60:02d}:{k % 60:02d}:{rng.randrange(60):02d}.{k:06d}"
+                ligne = {"task": mission["n"], "user": membre, "date": iso, "points": mission["p"], "timestamp": ts}
+                if role != "Parent":
+                    ligne["validated"] = not en_attente and rng.random() >= part_refus
+                    if en_attente:
+                        etat["attente_validation"].append({"id": ts, "user": membre, "task": mission["n"], "pts": mission["p"]})
+                if ligne.get("validated") is not False:
+                    etat["points_foyer"] += mission["p"]
+                    etat["classement"][membre] = etat["classement"].get(membre, 0) + mission["p"]
+                etat["taches_completees"].append(ligne)
+
+        # Environ deux achats par semaine, quand le trésor et les délais le permettent
+        if rng.random() < 0.3:
+            recompense = rng.choice(recompenses)
+            dernier = derniers_achats.get(recompense["id"])
+            disponible = dernier is None or (recompense.get("repetable") and
+                                             dernier + timedelta(days=recompense.get("delai_jours") or 0) <= jour)
+            if disponible and etat["points_foyer"] >= recompense["points"]:
+                etat["points_foyer"] -= recompense["points"]
+                etat["recompenses_achetees"].append({"id": recompense["id"], "nom": recompense["nom"], "date": iso,
+                                                     "points_utilises": recompense["points"]})
+                derniers_achats[recompense["id"]] = jour
+
+    etat["cumuls"] = cumuls_depuis_historique(etat["taches_completees"])
+    return etat
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    chemin = sys.argv[1]
+    nb_annees = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    composition = [int(nb) for nb in sys.argv[3:6]] or [2, 1, 2]
+    etat = foyer_synthetique(nb_annees, *composition)
+    StockageJSON(chemin).sauvegarder(etat)
+    print(f"{chemin} : {sum(composition)} membres, {len(etat['taches_completees']):,} missions sur {nb_annees} an(s), "
+          f"{len(etat['attente_validation'])} en attente, {len(etat['recompenses_achetees'])} achats, "
+          f"trésor {etat['points_foyer']} pts, {os.path.getsize(chemin) / 1e6:.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
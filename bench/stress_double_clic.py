@@ -0,0 +1,187 @@
+"""
+Doubles appuis et appuis concurrents sur « Terminé ! 🚀 » et « ✨ Obtenir cette
+récompense », joués avec streamlit.testing (AppTest) sur une copie du dépôt,
+pour chaque mode de stockage.
+
+- double appui : le navigateur renvoie deux fois les états de widgets de la même
+  page (second appui avant l'arrivée de la nouvelle page) ;
+- rerun interrompu : même chose, mais la session n'a pas eu le temps de changer
+  de jeton après l'écriture (le stockage doit refuser la clé déjà vue). Joué en
+  rendu détaillé, le double appui en rendu compact : les deux rendus sont couverts ;
+- sessions concurrentes : plusieurs processus (ce script avec --session)
+  achètent en même temps la même récompense unique avec un trésor qui n'en
+  permet qu'une ;
+- rafale : des threads appliquent en même temps la même mission (même clé) et
+  des achats du même cadeau (clés différentes) directement sur le stockage.
+
+Usage : python bench/stress_double_clic.py [nb_sessions_concurrentes]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from bench_rendu import copier_depot, oublier_application  # noqa: E402
+from evenements import EvenementDuplique, EvenementInvalide, nouvel_evenement  # noqa: E402
+from stockage import MODES, StockageJSON, etat_vide, ouvrir_stockage  # noqa: E402
+
+PETIT_CADEAU = 4  # récompense unique à 100 pts
+
+
+def ouvrir_app(dossier):
+    os.chdir(dossier)
+    return AppTest.from_file(os.path.join(dossier, "main.py"), default_timeout=60).run()
+
+
+def bouton(at, prefixe):
+    return next(b for b in at.button if b.key and b.key.startswith(prefixe) and not b.disabled)
+
+
+def double_appui(at, prefixe, interrompu=False):
+    """Envoie deux fois les états de widgets de la page courante avec `prefixe` appuyé."""
+    bouton(at, prefixe).click()
+    etats = at._tree.get_widget_states()
+    jeton = at.session_state["jeton_action"]
+    at._run(etats)
+    if interrompu:
+        # La session n'a pas changé de jeton : le second appui porte la même clé d'idempotence
+        at.session_state["jeton_action"] = jeton
+    at._run(etats)
+
+
+def scenario_session(dossier, interrompu):
+    at = ouvrir_app(dossier)
+    at.sidebar.radio[0].set_value("🚀 Missions").run()
+    at.selectbox[0].set_value("Enfant 1").run()
+    double_appui(at, "btn_", interrompu)
+    at.sidebar.radio[0].set_value("🎁 Récompenses").run()
+    double_appui(at, f"buy_{PETIT_CADEAU}_", interrompu)
+    assert not at.exception, at.exception
+
+
+def acheter(dossier, depart):
+    """
+    Une session qui achète le petit cadeau au signal de départ. Retourne "refus" si le stockage a
+    refusé l'achat, "exception" en cas d'erreur, "ok" sinon (achat passé, ou bouton disparu parce
+    que la session a repris le trésor à jour avant de traiter l'appui).
+    """
+    at = ouvrir_app(dossier)
+    at.sidebar.radio[0].set_value("🎁 Récompenses").run()
+    bouton(at, f"buy_{PETIT_CADEAU}_").click()
+    while time.time() < depart:
+        time.sleep(0.001)
+    at.run()
+    if at.exception:
+        return "exception"
+    # Un achat refusé par le stockage est signalé par un avertissement « ⚠️ … » (l'emoji devient son icône)
+    return "refus" if any(w.icon == "⚠️" for w in at.warning) else "ok"
+
+
+def etat_depart(dossier, points):
+    etat = etat_vide()
+    etat["points_foyer"] = points
+    StockageJSON(os.path.join(dossier, "data_foyer.json")).sauvegarder(etat)
+
+
+def bilan(dossier, mode):
+    etat = ouvrir_stockage(os.path.join(dossier, "data_foyer.json"), mode, cache=False).charger()
+    achats = sum(a["id"] == PETIT_CADEAU for a in etat["recompenses_achetees"])
+    return len(etat["attente_validation"]), len(etat["taches_completees"]), achats, etat["points_foyer"]
+
+
+def main():
+    if sys.argv[1:2] == ["--session"]:
+        print(acheter(sys.argv[2], float(sys.argv[3])))
+        return
+    nb_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    print(f"{'mode':8} {'scénario':24} {'en attente':>10} {'historique':>10} {'achats':>7} {'trésor':>7}")
+    echecs = 0
+    for mode in MODES:
+        os.environ["FOYER_STOCKAGE"] = mode
+        for nom, interrompu in (("double appui", False), ("rerun interrompu", True)):
+            os.environ["FOYER_RENDU"] = "detaille" if interrompu else "compact"
+            oublier_application()
+            dossier = tempfile.mkdtemp(prefix="stress_")
+            try:
+                copier_depot(dossier)
+                etat_depart(dossier, 150)
+                scenario_session(dossier, interrompu)
+                resultat = bilan(dossier, mode)
+            finally:
+                os.chdir(RACINE)
+                shutil.rmtree(dossier)
+            ok = resultat == (1, 1, 1, 50)
+            echecs += not ok
+            print(f"{mode:8} {nom:24} {resultat[0]:10d} {resultat[1]:10d} {resultat[2]:7d} {resultat[3]:7d}  {'ok' if ok else 'ÉCHEC'}")
+
+        os.environ["FOYER_RENDU"] = "compact"
+        oublier_application()
+        dossier = tempfile.mkdtemp(prefix="stress_")
+        try:
+            copier_depot(dossier)
+            etat_depart(dossier, 150)
+            depart = time.time() + 15
+            sessions = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "--session", dossier, str(depart)],
+                                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                        for _ in range(nb_sessions)]
+            issues = [session.communicate()[0].strip() for session in sessions]
+            resultat = bilan(dossier, mode)
+        finally:
+            os.chdir(RACINE)
+            shutil.rmtree(dossier)
+        ok = resultat[2:] == (1, 50) and "exception" not in issues
+        echecs += not ok
+        print(f"{mode:8} {f'{nb_sessions} sessions concurrentes':24} {resultat[0]:10d} {resultat[1]:10d} "
+              f"{resultat[2]:7d} {resultat[3]:7d}  {'ok' if ok else 'ÉCHEC'} "
+              f"({issues.count('refus')} refusée(s) par le stockage)")
+
+        dossier = tempfile.mkdtemp(prefix="stress_")
+        try:
+            etat_depart(dossier, 150)
+            stockage = ouvrir_stockage(os.path.join(dossier, "data_foyer.json"), mode)
+            mission = nouvel_evenement("tache_completee", task="🍽️ Maître du Dressage", user="Enfant 1",
+                                       date="2025-01-01", points=10, en_attente=True, cle="rafale")
+            refus = {"doublons": 0, "achats": 0}
+
+            def appliquer(evt, compteur):
+                try:
+                    stockage.appliquer(evt)
+                except EvenementInvalide:
+                    refus[compteur] += 1
+            # Même mission (même clé) et achats du petit cadeau (clés différentes) mêlés
+            fils = [threading.Thread(target=appliquer, args=(dict(mission), "doublons")) for _ in range(20)]
+            fils += [threading.Thread(target=appliquer, args=(nouvel_evenement(
+                "achat", id=PETIT_CADEAU, nom="🎁 Petit Cadeau", points=100, date="2025-01-01",
+                unique=True, delai_jours=0, cle=f"achat_{i}"), "achats")) for i in range(20)]
+            for fil in fils:
+                fil.start()
+            for fil in fils:
+                fil.join()
+            t0 = time.perf_counter()
+            for _ in range(100):
+                try:
+                    stockage.appliquer(dict(mission))
+                except EvenementDuplique:
+                    pass
+            duree_refus = (time.perf_counter() - t0) * 10
+            stockage.fermer()
+            resultat = bilan(dossier, mode)
+        finally:
+            shutil.rmtree(dossier)
+        ok = resultat == (1, 1, 1, 50) and refus == {"doublons": 19, "achats": 19}
+        echecs += not ok
+        print(f"{mode:8} {'rafale de 40 threads':24} {resultat[0]:10d} {resultat[1]:10d} {resultat[2]:7d} {resultat[3]:7d}  "
+              f"{'ok' if ok else 'ÉCHEC'} (doublon refusé en {duree_refus:.3f} ms)")
+    sys.exit(1 if echecs else 0)
+
+
+if __name__ == "__main__":
+    main()
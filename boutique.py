@@ -0,0 +1,88 @@
+"""
+Catalogue des récompenses et achats, indexés par identifiant de récompense.
+
+Une récompense est un dict {"id", "nom", "description", "points", "emoji",
+"couleur"} complété par des clés optionnelles :
+
+    categorie    rayon de la boutique (voir CATEGORIES_RECOMPENSES, "Autre" par défaut)
+    repetable    peut être obtenue plusieurs fois (sinon une seule fois, comme avant)
+    delai_jours  nombre minimum de jours entre deux achats d'une récompense répétable
+
+IndexBoutique garde le catalogue par id et, pour chaque récompense, le nombre
+d'achats, la date du dernier et le total de points dépensés : la page
+Récompenses ne reparcourt plus la liste des achats pour chaque carte. L'index
+vit dans la session (clé "boutique") et les réducteurs de evenements.py le
+tiennent à jour à chaque achat ou modification du catalogue.
+"""
+from datetime import date, timedelta
+
+CATEGORIES_RECOMPENSES = ["Écrans", "Sorties", "Gourmandises", "Cadeaux", "Privilèges", "Autre"]
+
+
+class IndexBoutique:
+    """Catalogue par id, statistiques d'achat par récompense."""
+
+    def __init__(self, catalogue=(), achats=()):
+        self._catalogue = {}  # id -> récompense, dans l'ordre du catalogue
+        self._achats = {}  # id -> {"nb", "dernier", "points", "nom"}
+        for recompense in catalogue:
+            self.enregistrer(recompense)
+        for achat in achats:
+            self.ajouter_achat(achat)
+
+    # --- MISES À JOUR (appelées par les réducteurs) ---
+    def enregistrer(self, recompense):
+        """Ajoute une récompense au catalogue ou remplace celle de même id."""
+        self._catalogue[recompense["id"]] = recompense
+
+    def supprimer(self, id_recompense):
+        self._catalogue.pop(id_recompense, None)
+
+    def ajouter_achat(self, achat):
+        stats = self._achats.setdefault(achat["id"], {"nb": 0, "dernier": achat["date"], "points": 0})
+        stats["nb"] += 1
+        stats["dernier"] = max(stats["dernier"], achat["date"])
+        stats["points"] += achat["points_utilises"]
+        stats["nom"] = achat["nom"]
+
+    # --- LECTURES ---
+    def recompense(self, id_recompense):
+        return self._catalogue.get(id_recompense)
+
+    def categories(self):
+        """Catégories présentes dans le catalogue, dans l'ordre de CATEGORIES_RECOMPENSES."""
+        presentes = {r.get("categorie") or "Autre" for r in self._catalogue.values()}
+        return [c for c in CATEGORIES_RECOMPENSES if c in presentes] + sorted(presentes - set(CATEGORIES_RECOMPENSES))
+
+    def recompenses(self, categorie=None):
+        """Récompenses du catalogue, toutes ou d'une seule catégorie."""
+        if categorie is None:
+            return list(self._catalogue.values())
+        return [r for r in self._catalogue.values() if (r.get("categorie") or "Autre") == categorie]
+
+    def nb_achats(self, id_recompense):
+        stats = self._achats.get(id_recompense)
+        return stats["nb"] if stats else 0
+
+    def achats(self):
+        """[(id, statistiques)] des récompenses déjà obtenues, la plus récemment obtenue d'abord."""
+        return sorted(self._achats.items(), key=lambda item: item[1]["dernier"], reverse=True)
+
+    def statut(self, recompense, solde, aujourd_hui):
+        """
+        État d'une récompense pour la boutique : {"nb_achats", "obtenue", "disponible_le", "manque",
+        "peut_acheter"}. `obtenue` : récompense unique déjà achetée ; `disponible_le` : date (YYYY-MM-DD)
+        de fin du délai d'une récompense répétable, None si elle est disponible.
+        """
+        stats = self._achats.get(recompense["id"])
+        nb = stats["nb"] if stats else 0
+        obtenue = nb > 0 and not recompense.get("repetable")
+        disponible_le = None
+        delai = recompense.get("delai_jours") or 0
+        if nb and recompense.get("repetable") and delai:
+            prochaine = (date.fromisoformat(stats["dernier"]) + timedelta(days=delai)).isoformat()
+            if prochaine > aujourd_hui:
+                disponible_le = prochaine
+        manque = max(0, recompense["points"] - solde)
+        return {"nb_achats": nb, "obtenue": obtenue, "disponible_le": disponible_le, "manque": manque,
+                "peut_acheter": not obtenue and disponible_le is None and not manque}
@@ -0,0 +1,114 @@
+"""
+Catalogue par défaut (catalogue.json) et index des missions par rôle et catégorie.
+
+catalogue.json décrit, sous un numéro de "version", l'ordre des catégories de
+missions, les missions et les récompenses proposées à tout foyer. Il est lu et
+validé une fois par processus, à l'import : un fichier invalide lève
+CatalogueInvalide au démarrage plutôt qu'une erreur au milieu d'une page.
+
+Une mission est un dict {"n": nom, "p": points, "c": catégorie, "r": rôles,
+"d": description, "f": fréquence} complété par une "regle" optionnelle (voir
+frequences.py) ; une récompense est décrite dans boutique.py.
+
+IndexMissions fusionne les missions du catalogue et celles du foyer
+(taches_personnalisees) en listes précalculées par rôle et par (rôle,
+catégorie), dans l'ordre du catalogue. L'index vit dans la session (clé
+"index_missions") : les réducteurs de evenements.py le retirent quand une
+mission personnalisée est créée ou supprimée, et il est reconstruit au
+prochain besoin.
+"""
+import json
+import os
+
+from frequences import REGLES_FREQUENCE
+
+FICHIER_CATALOGUE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogue.json")
+VERSION_CATALOGUE = 1
+ROLES = ("Parent", "Ado", "Enfant")
+
+
+class CatalogueInvalide(ValueError):
+    """catalogue.json ne respecte pas le format attendu."""
+
+
+def _verifier_mission(mission, categories):
+    for cle, types in (("n", str), ("p", int), ("c", str), ("r", list), ("d", str)):
+        if not isinstance(mission.get(cle), types):
+            raise CatalogueInvalide(f"Mission {mission.get('n')!r} : champ {cle!r} manquant ou invalide.")
+    if mission["c"] not in categories:
+        raise CatalogueInvalide(f"Mission {mission['n']!r} : catégorie inconnue {mission['c']!r}.")
+    if not mission["r"] or not set(mission["r"]) <= set(ROLES):
+        raise CatalogueInvalide(f"Mission {mission['n']!r} : rôles invalides {mission['r']!r}.")
+    if mission.get("f") is not None and mission["f"] not in REGLES_FREQUENCE:
+        raise CatalogueInvalide(f"Mission {mission['n']!r} : fréquence inconnue {mission['f']!r}.")
+    if not isinstance(mission.get("regle") or {}, dict):
+        raise CatalogueInvalide(f"Mission {mission['n']!r} : la règle doit être un objet.")
+
+
+def _verifier_recompense(recompense):
+    for cle, types in (("id", int), ("nom", str), ("description", str), ("points", int),
+                       ("emoji", str), ("couleur", str)):
+        if not isinstance(recompense.get(cle), types):
+            raise CatalogueInvalide(f"Récompense {recompense.get('nom')!r} : champ {cle!r} manquant ou invalide.")
+
+
+def charger_catalogue(chemin=FICHIER_CATALOGUE):
+    """Lit et valide un catalogue ; retourne {"version", "categories", "missions", "recompenses"}."""
+    with open(chemin, encoding="utf-8") as f:
+        catalogue = json.load(f)
+    if catalogue.get("version") != VERSION_CATALOGUE:
+        raise CatalogueInvalide(f"Version de catalogue non prise en charge : {catalogue.get('version')!r}.")
+    categories = catalogue["categories"]
+    noms = set()
+    for mission in catalogue["missions"]:
+        _verifier_mission(mission, categories)
+        if mission["n"] in noms:
+            raise CatalogueInvalide(f"Mission en double : {mission['n']!r}.")
+        noms.add(mission["n"])
+    ids = set()
+    for recompense in catalogue["recompenses"]:
+        _verifier_recompense(recompense)
+        if recompense["id"] in ids:
+            raise CatalogueInvalide(f"Récompense en double : id {recompense['id']}.")
+        ids.add(recompense["id"])
+    return catalogue
+
+
+# Lu une fois par processus ; ces listes sont partagées par toutes les sessions : ne pas les modifier
+_CATALOGUE = charger_catalogue()
+CATEGORIES = _CATALOGUE["categories"]
+MISSIONS = _CATALOGUE["missions"]
+RECOMPENSES = _CATALOGUE["recompenses"]
+
+
+class IndexMissions:
+    """Missions du catalogue puis du foyer, par rôle et par (rôle, catégorie), dans l'ordre du catalogue."""
+
+    def __init__(self, personnalisees=()):
+        self.toutes = MISSIONS + list(personnalisees)
+        self._par_nom = {}
+        self._par_role = {}  # rôle -> [missions]
+        self._par_categorie = {}  # (rôle, catégorie) -> [missions]
+        for mission in self.toutes:
+            self._par_nom.setdefault(mission["n"], mission)
+            for role in mission["r"]:
+                self._par_role.setdefault(role, []).append(mission)
+                self._par_categorie.setdefault((role, mission["c"]), []).append(mission)
+        # Catégories du catalogue, puis celles que seules des missions personnalisées utilisent
+        self._categories = list(CATEGORIES)
+        for mission in self.toutes:
+            if mission["c"] not in self._categories:
+                self._categories.append(mission["c"])
+
+    def missions(self, role, categorie=None):
+        """Missions proposées à un rôle, toutes ou d'une seule catégorie."""
+        if categorie is None:
+            return self._par_role.get(role, [])
+        return self._par_categorie.get((role, categorie), [])
+
+    def categories(self, role):
+        """Catégories qui ont au moins une mission pour ce rôle, dans l'ordre du catalogue."""
+        return [categorie for categorie in self._categories if (role, categorie) in self._par_categorie]
+
+    def mission(self, nom):
+        return self._par_nom.get(nom)
@@ -0,0 +1,419 @@
+"""
+Événements du foyer.
+
+Chaque mutation de l'état (mission terminée, validation, achat, renommage...)
+est décrite par un petit dict sérialisable. `appliquer_evenement()` rejoue cet
+événement sur un état (dict ou st.session_state) : c'est la seule fonction qui
+modifie les compteurs, l'historique et la configuration.
+
+Un événement peut être préparé sur une copie périmée de l'état (autre appareil
+qui a écrit entre-temps) : les positions qu'il cite sont alors retrouvées par
+leur contenu, puis corrigées dans l'événement avant qu'il soit persisté. Les
+missions en attente de validation portent un id stable (l'horodatage de leur
+ligne d'historique) : "validation" et "refus" citent ces ids ("ids"), une ou
+plusieurs missions dans le même événement ; l'ancienne forme par position
+reste rejouable.
+
+Les membres sont désignés par un id immuable (config, historique, file de
+validation, classement, cumuls) ; "noms" associe chaque id au nom affiché, si
+bien qu'un renommage ne modifie qu'une entrée. Les membres antérieurs aux ids
+ont pour id leur nom d'alors.
+
+points_foyer et classement sont le pli de l'historique (voir soldes.py) : une
+tâche créditée ajoute ses points au membre et au trésor, un achat les retire du
+trésor. Les réducteurs ci-dessous tiennent ce pli à jour incrémentalement.
+
+Les actions de l'interface portent une clé d'idempotence ("cle") : une clé déjà
+vue parmi les CLES_RETENUES dernières est refusée (EvenementDuplique) avant
+toute modification, si bien qu'un double appui ne compte qu'une fois. Ces
+événements sont aussi contrôlés (solde suffisant, récompense unique ou en
+délai) au moment où ils s'appliquent ; les événements sans clé (anciens
+journaux, outils) sont rejoués tels quels.
+
+Les points gagnés sont aussi cumulés par membre et par jour, semaine ISO et
+mois (clé "cumuls") au moment où ils sont crédités : les classements par
+période se lisent directement, sans reparcourir l'historique.
+"""
+from datetime import date, datetime, timedelta
+
+# Nombre de clés d'idempotence gardées dans l'état du foyer
+CLES_RETENUES = 500
+
+
+class EvenementInvalide(ValueError):
+    """L'événement ne s'applique plus à l'état courant (déjà traité ailleurs...)."""
+
+
+class EvenementDuplique(EvenementInvalide):
+    """Un événement de même clé d'idempotence a déjà été appliqué (double appui...)."""
+
+
+def nouvel_evenement(type_evt, **donnees):
+    """Construit un événement horodaté."""
+    return {"type": type_evt, "ts": datetime.now().isoformat(), **donnees}
+
+
+def est_creditee(tache):
+    """Une tâche complétée rapporte ses points sauf si elle attend encore une validation (ou a été refusée)."""
+    return tache.get("validated") is not False
+
+
+# --- CUMULS DE POINTS ---
+def cles_cumuls(jour):
+    """Retourne les clés de cumul d'une date YYYY-MM-DD : (("jour", ...), ("semaine", "AAAA-Sxx"), ("mois", ...))."""
+    annee, semaine, _ = date.fromisoformat(jour).isocalendar()
+    return ("jour", jour), ("semaine", f"{annee}-S{semaine:02d}"), ("mois", jour[:7])
+
+
+def _cumuler(cumuls, user, points, jour):
+    for periode, cle in cles_cumuls(jour):
+        par_user = cumuls[periode].setdefault(cle, {})
+        par_user[user] = par_user.get(user, 0) + points
+
+
+def cumuls_depuis_historique(taches):
+    """Reconstruit les cumuls de points à partir de l'historique (tâches créditées seulement)."""
+    cumuls = {"jour": {}, "semaine": {}, "mois": {}}
+    for tache in taches:
+        if est_creditee(tache):
+            _cumuler(cumuls, tache["user"], tache["points"], tache["date"])
+    return cumuls
+
+
+# --- SOLDES ---
+def plier_completions(solde, taches):
+    """Ajoute au solde {"points_foyer", "classement"} les points des tâches créditées."""
+    classement = solde["classement"]
+    total = 0
+    for tache in taches:
+        if est_creditee(tache):
+            classement[tache["user"]] = classement.get(tache["user"], 0) + tache["points"]
+            total += tache["points"]
+    solde["points_foyer"] += total
+    return solde
+
+
+def plier_achats(solde, achats):
+    """Retire du trésor les points des récompenses achetées."""
+    solde["points_foyer"] -= sum(achat["points_utilises"] for achat in achats)
+    return solde
+
+
+# --- APPLICATEURS ---
+def _crediter(etat, user, points, jour):
+    etat["points_foyer"] = etat["points_foyer"] + points
+    etat["classement"][user] = etat["classement"].get(user, 0) + points
+    # Les sessions ne copient pas les cumuls : elles les lisent dans l'état partagé
+    cumuls = etat.get("cumuls")
+    if cumuls is not None:
+        _cumuler(cumuls, user, points, jour)
+
+
+def _tache_completee(etat, evt):
+    ligne = {
+        "task": evt["task"],
+        "user": evt["user"],
+        "date": evt["date"],
+        "points": evt["points"],
+        "timestamp": evt["ts"]
+    }
+    if evt.get("en_attente"):
+        # Mission d'un enfant/ado : en attente de validation parentale, liée à sa ligne d'historique
+        item = {"id": evt["ts"], "user": evt["user"], "task": evt["task"], "pts": evt["points"]}
+        etat["attente_validation"].append(item)
+        index = etat.get("index_attente")
+        if index is not None:
+            index.ajouter(item)
+        ligne["validated"] = False
+    else:
+        _crediter(etat, evt["user"], evt["points"], evt["date"])
+    etat["taches_completees"].append(ligne)
+
+
+def _resoudre_index(liste, evt, correspond, message):
+    """Retrouve l'élément visé par evt["index"], même si la liste a bougé depuis."""
+    index = evt["index"]
+    if not (0 <= index < len(liste) and correspond(liste[index])):
+        index = next((i for i, element in enumerate(liste) if correspond(element)), None)
+        if index is None:
+            raise EvenementInvalide(message)
+        evt["index"] = index
+    return index
+
+
+def _index_attente(etat, evt):
+    # Les anciens événements ne portaient que la position
+    if "user" not in evt:
+        return evt["index"]
+    return _resoudre_index(
+        etat["attente_validation"], evt,
+        lambda item: item["user"] == evt["user"] and item["task"] == evt["task"],
+        "Cette mission a déjà été traitée sur un autre appareil."
+    )
+
+
+def _retirer_attente(etat, evt):
+    """
+    Retire de la file les missions dont l'id est dans evt["ids"] et les retourne.
+    Celles déjà traitées ailleurs sont ignorées (evt["ids"] ne garde que les autres).
+    """
+    ids = set(evt["ids"])
+    retirees = [item for item in etat["attente_validation"] if item.get("id") in ids]
+    if not retirees:
+        raise EvenementInvalide("Ces missions ont déjà été traitées sur un autre appareil.")
+    etat["attente_validation"][:] = [item for item in etat["attente_validation"] if item.get("id") not in ids]
+    evt["ids"] = [item["id"] for item in retirees]
+    index = etat.get("index_attente")
+    if index is not None:
+        for item in retirees:
+            index.retirer(item)
+    return retirees
+
+
+def _validation(etat, evt):
+    if "ids" in evt:
+        # Une ou plusieurs missions, chacune liée à sa ligne d'historique par son id
+        retirees = {item["id"]: item for item in _retirer_attente(etat, evt)}
+        jours = {}
+        for task in etat["taches_completees"]:
+            item = retirees.get(task["timestamp"])
+            if item is not None and task["user"] == item["user"] and task.get("validated") is False:
+                task["validated"] = True
+                jours[item["id"]] = task["date"]
+        # Points cumulés au jour de l'envoi, celui de la ligne d'historique (comme cumuls_depuis_historique)
+        for item in retirees.values():
+            _crediter(etat, item["user"], item["pts"], jours.get(item["id"], evt["date"]))
+        return
+    item = etat["attente_validation"].pop(_index_attente(etat, evt))
+    index = etat.get("index_attente")
+    if index is not None and "id" in item:
+        index.retirer(item)
+    # Marquer la tâche comme validée dans l'historique
+    trouvee, en_attente = None, None
+    for task in etat["taches_completees"]:
+        if task["task"] == item["task"] and task["user"] == item["user"]:
+            if task["date"] == evt["date"]:
+                task["validated"] = True
+                trouvee = task
+            elif task.get("validated") is False and task["date"] < evt["date"] and (
+                    en_attente is None or task["date"] >= en_attente["date"]):
+                en_attente = task
+    if trouvee is None and en_attente is not None:
+        # Validée un autre jour que celui de l'envoi : la plus récente encore en attente
+        en_attente["validated"] = True
+        trouvee = en_attente
+    _crediter(etat, item["user"], item["pts"], trouvee["date"] if trouvee is not None else evt["date"])
+
+
+def _refus(etat, evt):
+    if "ids" in evt:
+        _retirer_attente(etat, evt)
+        return
+    item = etat["attente_validation"].pop(_index_attente(etat, evt))
+    index = etat.get("index_attente")
+    if index is not None and "id" in item:
+        index.retirer(item)
+
+
+def _achat(etat, evt):
+    if "cle" in evt:
+        # Contrôles faits dans la même transaction que le débit
+        if etat["points_foyer"] < evt["points"]:
+            raise EvenementInvalide("Trésor insuffisant pour cette récompense.")
+        if evt.get("unique") or evt.get("delai_jours"):
+            dernier = max((a["date"] for a in etat["recompenses_achetees"] if a["id"] == evt["id"]), default=None)
+            if dernier and evt.get("unique"):
+                raise EvenementInvalide("Cette récompense a déjà été obtenue.")
+            if dernier and date.fromisoformat(dernier) + timedelta(days=evt["delai_jours"]) > date.fromisoformat(evt["date"]):
+                raise EvenementInvalide("Cette récompense a déjà été obtenue récemment.")
+    etat["points_foyer"] = etat["points_foyer"] - evt["points"]
+    achat = {
+        "id": evt["id"],
+        "nom": evt["nom"],
+        "date": evt["date"],
+        "points_utilises": evt["points"]
+    }
+    etat["recompenses_achetees"].append(achat)
+    # Index de la boutique d'une session (boutique.IndexBoutique), s'il est construit
+    boutique = etat.get("boutique")
+    if boutique is not None:
+        boutique.ajouter_achat(achat)
+
+
+def _renommage(etat, evt):
+    if "id" in evt:
+        # Historique, file et classement citent l'id du membre : seul son nom affiché change
+        if evt["id"] not in etat["noms"]:
+            raise EvenementInvalide("Ce membre a été supprimé entre-temps.")
+        etat["noms"][evt["id"]] = evt["nom"]
+        return
+    # Anciens journaux : le nom servait d'identifiant et était réécrit partout
+    ancien, nouveau = evt["ancien"], evt["nouveau"]
+    index = _resoudre_index(etat["config"][evt["role"]], evt, lambda nom: nom == ancien,
+                            f"{ancien} a déjà été renommé ou supprimé.")
+    etat["config"][evt["role"]][index] = nouveau
+    if ancien in etat["classement"]:
+        etat["classement"][nouveau] = etat["classement"].pop(ancien)
+    for item in etat["attente_validation"]:
+        if item["user"] == ancien:
+            item["user"] = nouveau
+    index_attente = etat.get("index_attente")
+    if index_attente is not None:
+        index_attente.renommer(ancien, nouveau)
+    etat["noms"].pop(ancien, None)
+    etat["noms"][nouveau] = nouveau
+    for task in etat["taches_completees"]:
+        if task["user"] == ancien:
+            task["user"] = nouveau
+    cumuls = etat.get("cumuls")
+    if cumuls is not None:
+        for par_cle in cumuls.values():
+            for par_user in par_cle.values():
+                if ancien in par_user:
+                    par_user[nouveau] = par_user.pop(ancien)
+
+
+def _reconciliation(etat, evt):
+    # Soldes recalculés depuis l'historique (soldes.reconcilier)
+    etat["points_foyer"] = evt["points_foyer"]
+    etat["classement"] = dict(evt["classement"])
+    if "cumuls" in evt and etat.get("cumuls") is not None:
+        # Cumuls reconstruits, mois archivés compris (absents des anciennes réconciliations)
+        etat["cumuls"] = {periode: {cle: dict(par_user) for cle, par_user in par_cle.items()}
+                          for periode, par_cle in evt["cumuls"].items()}
+
+
+def _config(etat, evt):
+    # Remplacement complet de la configuration (anciens journaux)
+    etat["config"] = evt["config"]
+    retire = evt.get("retire")
+    if retire is not None:
+        etat["classement"].pop(retire, None)
+
+
+def _id_membre(evt):
+    # Les anciens événements citaient le membre par son nom, qui lui servait d'id
+    return evt.get("id", evt.get("nom"))
+
+
+def _membre_ajoute(etat, evt):
+    membre = _id_membre(evt)
+    etat["config"][evt["role"]].append(membre)
+    etat["noms"][membre] = evt["nom"]
+
+
+def _membre_supprime(etat, evt):
+    membre = _id_membre(evt)
+    membres = etat["config"][evt["role"]]
+    if membre not in membres:
+        raise EvenementInvalide(f"{etat['noms'].get(membre, membre)} a déjà été supprimé.")
+    membres.remove(membre)
+    # Un membre supprimé disparaît du classement ; son nom reste pour afficher son historique
+    etat["classement"].pop(membre, None)
+
+
+def _membre_change_role(etat, evt):
+    membre = _id_membre(evt)
+    if membre not in etat["config"][evt["de"]]:
+        raise EvenementInvalide(f"{etat['noms'].get(membre, membre)} a déjà changé de rôle.")
+    etat["config"][evt["vers"]].append(membre)
+    etat["config"][evt["de"]].remove(membre)
+
+
+def _oublier_index_missions(etat):
+    # Index des missions d'une session (catalogue.IndexMissions) : reconstruit au prochain besoin
+    if etat.get("index_missions") is not None:
+        etat["index_missions"] = None
+
+
+def _tache_creee(etat, evt):
+    etat["taches_personnalisees"].append(evt["tache"])
+    _oublier_index_missions(etat)
+
+
+def _tache_supprimee(etat, evt):
+    index = evt["index"]
+    if "n" in evt:
+        index = _resoudre_index(etat["taches_personnalisees"], evt, lambda t: t["n"] == evt["n"],
+                                "Cette tâche a déjà été supprimée.")
+    etat["taches_personnalisees"].pop(index)
+    _oublier_index_missions(etat)
+
+
+def _recompense_enregistree(etat, evt):
+    recompense = evt["recompense"]
+    boutique = etat.get("boutique")
+    if boutique is not None:
+        boutique.enregistrer(recompense)
+    perso = etat["recompenses_personnalisees"]
+    for idx, r in enumerate(perso):
+        if r.get("id") == recompense["id"]:
+            perso[idx] = recompense
+            return
+    perso.append(recompense)
+
+
+def _recompense_supprimee(etat, evt):
+    boutique = etat.get("boutique")
+    if boutique is not None:
+        boutique.supprimer(evt["id"])
+    etat["recompenses_personnalisees"] = [r for r in etat["recompenses_personnalisees"] if r.get("id") != evt["id"]]
+
+
+def est_archivable(tache, limite):
+    """Une tâche part en archive si elle est antérieure à la limite et n'attend plus de validation."""
+    return tache["date"] < limite and est_creditee(tache)
+
+
+def cle_ligne(tache):
+    """Identifie une ligne d'historique (chaude ou archivée)."""
+    return tache["timestamp"], tache["user"], tache["task"]
+
+
+def _archivage(etat, evt):
+    # Les lignes ont déjà été copiées dans les archives mensuelles (voir archives.py)
+    if "lignes" in evt:
+        # Exactement celles copiées : une mission validée depuis la copie reste dans le stockage chaud
+        copiees = {tuple(ligne) for ligne in evt["lignes"]}
+        etat["taches_completees"] = [t for t in etat["taches_completees"] if cle_ligne(t) not in copiees]
+    else:
+        etat["taches_completees"] = [t for t in etat["taches_completees"] if not est_archivable(t, evt["avant"])]
+    etat["archive_avant"] = evt["avant"]
+
+
+APPLICATEURS = {
+    "tache_completee": _tache_completee,
+    "validation": _validation,
+    "refus": _refus,
+    "achat": _achat,
+    "renommage": _renommage,
+    "reconciliation": _reconciliation,
+    "config": _config,
+    "membre_ajoute": _membre_ajoute,
+    "membre_supprime": _membre_supprime,
+    "membre_change_role": _membre_change_role,
+    "tache_creee": _tache_creee,
+    "tache_supprimee": _tache_supprimee,
+    "recompense_enregistree": _recompense_enregistree,
+    "recompense_supprimee": _recompense_supprimee,
+    "archivage": _archivage,
+}
+
+
+def appliquer_evenement(etat, evt):
+    """
+    Applique un événement à l'état (dict ou st.session_state).
+    Lève EvenementInvalide sans rien modifier si l'événement ne s'applique plus.
+    """
+    try:
+        applicateur = APPLICATEURS[evt["type"]]
+    except KeyError:
+        raise ValueError(f"Type d'événement inconnu : {evt.get('type')!r}")
+    # Les sessions ne copient pas les clés : seul l'état partagé du foyer les contrôle
+    cles = etat.get("cles_recentes") if "cle" in evt else None
+    if cles is not None and evt["cle"] in cles:
+        raise EvenementDuplique("Cette action a déjà été enregistrée.")
+    applicateur(etat, evt)
+    if cles is not None:
+        cles.append(evt["cle"])
+        del cles[:-CLES_RETENUES]
@@ -0,0 +1,173 @@
+"""
+Hébergement de plusieurs foyers sur un même serveur.
+
+Chaque foyer est identifié par un identifiant court (paramètre d'URL ?foyer=...)
+et possède son propre stockage sous FOYER_DOSSIER/<identifiant>/. Le foyer par
+défaut garde le fichier historique data_foyer.json à la racine.
+
+Un foyer n'existe que s'il a été créé explicitement (creer_foyer(), ou
+`python foyers.py creer <identifiant> <code>`) : une URL qui cite un autre
+identifiant est refusée (FoyerInconnu) sans rien créer sur disque.
+
+Chaque foyer a son propre code parent, enregistré à côté de ses données
+(<données>_acces.json) sous forme d'empreinte salée (PBKDF2) ; le code n'est
+jamais stocké en clair. Le foyer par défaut, antérieur aux codes par foyer,
+accepte l'ancien code commun tant qu'aucun code ne lui a été donné
+(`python foyers.py code defaut <code>`).
+
+Les stockages ouverts sont gardés dans un LRU borné (FOYER_LRU_CAPACITE) : le
+moins récemment utilisé est vidé sur disque puis fermé quand la limite est
+atteinte, si bien que la mémoire ne dépend pas du nombre de foyers hébergés.
+
+Usage : python foyers.py creer|code <identifiant> <code>
+"""
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+from collections import OrderedDict
+
+from stockage import ouvrir_stockage
+
+FOYER_DEFAUT = "defaut"
+FICHIER_DEFAUT = "data_foyer.json"
+DOSSIER_FOYERS = os.environ.get("FOYER_DOSSIER", "foyers")
+CAPACITE_LRU = int(os.environ.get("FOYER_LRU_CAPACITE", "64"))
+
+_ID_VALIDE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+ITERATIONS_CODE = 100_000
+# Empreinte SHA-256 de l'ancien code commun à tous les foyers ("1234"), pour le seul foyer par défaut
+EMPREINTE_HISTORIQUE = "03ac674216f3e15c761ee1a5e255f067953623c8b388b4459e13f978d7c846f4"
+
+
+class FoyerInconnu(ValueError):
+    """Aucun foyer n'a été créé sous cet identifiant."""
+
+
+def chemin_foyer(foyer_id, dossier=DOSSIER_FOYERS):
+    """Retourne le chemin du fichier de données d'un foyer (identifiant validé)."""
+    if foyer_id == FOYER_DEFAUT:
+        return FICHIER_DEFAUT
+    if not _ID_VALIDE.match(foyer_id):
+        raise ValueError(f"Identifiant de foyer invalide : {foyer_id!r}")
+    return os.path.join(dossier, foyer_id, FICHIER_DEFAUT)
+
+
+def foyer_existe(foyer_id, dossier=DOSSIER_FOYERS):
+    """Le foyer par défaut existe toujours ; un autre foyer, si son dossier a été créé."""
+    return foyer_id == FOYER_DEFAUT or os.path.isdir(os.path.dirname(chemin_foyer(foyer_id, dossier)))
+
+
+def creer_foyer(foyer_id, code_parent, dossier=DOSSIER_FOYERS):
+    """Crée le dossier d'un nouveau foyer et enregistre son code parent ; retourne le chemin de ses données."""
+    chemin = chemin_foyer(foyer_id, dossier)
+    if foyer_existe(foyer_id, dossier) and os.path.exists(chemin_acces(chemin)):
+        raise ValueError(f"Le foyer {foyer_id!r} existe déjà.")
+    if os.path.dirname(chemin):
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    definir_code_parent(chemin, code_parent)
+    return chemin
+
+
+# --- CODE PARENT ---
+def chemin_acces(chemin_donnees):
+    """Fichier du code parent d'un foyer (à côté de son fichier de données, comme ses archives)."""
+    return os.path.splitext(chemin_donnees)[0] + "_acces.json"
+
+
+def _empreinte(code, sel, iterations):
+    return hashlib.pbkdf2_hmac("sha256", code.encode(), bytes.fromhex(sel), iterations).hex()
+
+
+def definir_code_parent(chemin_donnees, code):
+    """Enregistre (ou remplace) le code parent du foyer dont `chemin_donnees` est le fichier de données."""
+    if not code:
+        raise ValueError("Le code parent ne peut pas être vide.")
+    sel = secrets.token_hex(16)
+    acces = {"sel": sel, "iterations": ITERATIONS_CODE, "empreinte": _empreinte(code, sel, ITERATIONS_CODE)}
+    chemin = chemin_acces(chemin_donnees)
+    tmp = f"{chemin}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(acces, f)
+    os.replace(tmp, chemin)
+
+
+def verifier_code_parent(chemin_donnees, code, defaut=False):
+    """
+    Vrai si `code` est le code parent du foyer. Sans code enregistré, seul le foyer par défaut
+    (`defaut`) accepte l'ancien code commun ; un autre foyer refuse tout code.
+    """
+    try:
+        with open(chemin_acces(chemin_donnees), "r") as f:
+            acces = json.load(f)
+    except FileNotFoundError:
+        return defaut and hmac.compare_digest(hashlib.sha256(code.encode()).hexdigest(), EMPREINTE_HISTORIQUE)
+    return hmac.compare_digest(_empreinte(code, acces["sel"], acces["iterations"]), acces["empreinte"])
+
+
+class RegistreFoyers:
+    """LRU des stockages de foyers ouverts (partagé par toutes les sessions du processus)."""
+
+    def __init__(self, dossier=DOSSIER_FOYERS, capacite=CAPACITE_LRU, mode=None):
+        self.dossier = dossier
+        self.capacite = capacite
+        self.mode = mode
+        self._ouverts = OrderedDict()
+        self._verrou = threading.Lock()
+        self.ouvertures = 0
+        self.evictions = 0
+
+    def ouvrir(self, foyer_id):
+        """
+        Retourne le stockage du foyer, en l'ouvrant (et en évinçant le plus ancien) si besoin.
+        Lève FoyerInconnu si le foyer n'a pas été créé : rien n'est écrit sur disque.
+        """
+        with self._verrou:
+            stockage = self._ouverts.get(foyer_id)
+            if stockage is not None:
+                self._ouverts.move_to_end(foyer_id)
+                return stockage
+            chemin = chemin_foyer(foyer_id, self.dossier)
+            if not foyer_existe(foyer_id, self.dossier):
+                raise FoyerInconnu(f"Foyer inconnu : {foyer_id!r}")
+            stockage = ouvrir_stockage(chemin, self.mode)
+            self._ouverts[foyer_id] = stockage
+            self.ouvertures += 1
+            evinces = []
+            while len(self._ouverts) > self.capacite:
+                evinces.append(self._ouverts.popitem(last=False)[1])
+                self.evictions += 1
+        # Vidage hors du verrou : un foyer lent à compacter ne bloque pas les autres
+        for ancien in evinces:
+            ancien.fermer()
+        return stockage
+
+    def fermer_tout(self):
+        """Vide et ferme tous les stockages ouverts (arrêt du serveur, benchmark)."""
+        with self._verrou:
+            ouverts = list(self._ouverts.values())
+            self._ouverts.clear()
+        for stockage in ouverts:
+            stockage.fermer()
+
+    def __len__(self):
+        return len(self._ouverts)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("creer", "code"):
+        print("Usage : python foyers.py creer|code <identifiant> <code>")
+        sys.exit(1)
+    commande, foyer_id, code = sys.argv[1:]
+    if commande == "creer":
+        print(f"Foyer {foyer_id!r} créé : {creer_foyer(foyer_id, code)}")
+    elif not foyer_existe(foyer_id):
+        print(f"Foyer inconnu : {foyer_id!r} (python foyers.py creer {foyer_id} <code>)")
+        sys.exit(1)
+    else:
+        definir_code_parent(chemin_foyer(foyer_id), code)
+        print(f"Code parent du foyer {foyer_id!r} enregistré.")
@@ -0,0 +1,156 @@
+"""
+Règles de fréquence des missions.
+
+Une règle est un petit dict déclaratif, déduit de la fréquence de la mission
+("f") puis complété par sa clé optionnelle "regle" :
+
+    max_jour     nombre maximum de complétions par jour
+    max_semaine  nombre maximum de complétions par semaine ISO (lundi-dimanche)
+    jours        jours autorisés (0 = lundi ... 6 = dimanche)
+    delai_jours  nombre minimum de jours entre deux complétions
+    note         précision affichée quand la mission est disponible
+
+    {"n": "🌀 Aspirateur-Man", ..., "f": "Hebdomadaire", "regle": {"max_semaine": 2}}
+
+evaluer_missions() évalue toutes les missions d'un membre d'un coup à partir de
+l'index des complétions (historique.IndexCompletions) : aucune relecture de
+l'historique par carte. matrice_eligibilite() calcule la même chose pour toute
+la famille (membres × missions) en un seul regroupement pandas ; pandas et
+numpy ne sont importés qu'à son premier appel.
+"""
+from datetime import date, timedelta
+
+REGLES_FREQUENCE = {
+    "Quotidien": {"max_jour": 1},
+    "Hebdomadaire": {"max_semaine": 1},
+    "Ponctuel": {},
+}
+
+NOMS_JOURS = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
+
+
+def regle_mission(tache):
+    """Retourne la règle complète d'une mission, ou None si elle n'a pas de fréquence."""
+    if not tache.get("f") and not tache.get("regle"):
+        return None
+    return {**REGLES_FREQUENCE.get(tache.get("f"), {}), **(tache.get("regle") or {})}
+
+
+def etendue_regles(taches, aujourd_hui):
+    """Première date (YYYY-MM-DD) dont l'historique est nécessaire pour évaluer ces missions."""
+    debut = aujourd_hui - timedelta(days=aujourd_hui.weekday())
+    for tache in taches:
+        delai = (regle_mission(tache) or {}).get("delai_jours")
+        if delai:
+            debut = min(debut, aujourd_hui - timedelta(days=delai))
+    return debut.isoformat()
+
+
+def _prochain_jour_autorise(jour, jours):
+    if not jours:
+        return jour
+    while jour.weekday() not in jours:
+        jour += timedelta(days=1)
+    return jour
+
+
+def evaluer(regle, index, user, task, aujourd_hui):
+    """
+    Évalue une règle pour un membre.
+    Retourne {"peut_valider", "message", "prochaine_date", "prochaine_affichage"}.
+    """
+    jour = aujourd_hui.isoformat()
+    nb_jour = index.nb_jour(user, task, jour)
+    nb_semaine = index.nb_semaine(user, task, jour)
+    max_jour, max_semaine = regle.get("max_jour"), regle.get("max_semaine")
+    jours, delai = regle.get("jours"), regle.get("delai_jours")
+
+    # Chaque contrainte non respectée propose une date au plus tôt ; la plus tardive l'emporte
+    messages, dates = [], []
+    if jours and aujourd_hui.weekday() not in jours:
+        messages.append("📅 Uniquement le " + ", ".join(NOMS_JOURS[j] for j in sorted(jours)))
+    if max_jour and nb_jour >= max_jour:
+        messages.append(f"✅ Déjà complétée aujourd'hui ({nb_jour} fois)")
+        dates.append(aujourd_hui + timedelta(days=1))
+    if max_semaine and nb_semaine >= max_semaine:
+        messages.append(f"⚠️ Déjà complétée {nb_semaine} fois cette semaine (max: {max_semaine})")
+        dates.append(aujourd_hui + timedelta(days=7 - aujourd_hui.weekday()))
+    if delai:
+        derniere = index.derniere(user, task, avant=(aujourd_hui + timedelta(days=1)).isoformat())
+        if derniere:
+            possible = date.fromisoformat(derniere) + timedelta(days=delai)
+            if possible > aujourd_hui:
+                messages.append(f"⏳ Une fois tous les {delai} jours (dernière le {date.fromisoformat(derniere):%d/%m})")
+                dates.append(possible)
+
+    if messages:
+        prochaine = _prochain_jour_autorise(max(dates, default=aujourd_hui), jours)
+        return {"peut_valider": False, "message": messages[0],
+                "prochaine_date": prochaine.isoformat(), "prochaine_affichage": f"le {prochaine:%d/%m/%Y}"}
+
+    if regle.get("note"):
+        message, affichage = f"📅 Peut être complétée {regle['note']}", regle["note"]
+    elif max_semaine:
+        message = f"📅 Peut être complétée {max_semaine}x par semaine ({nb_semaine}/{max_semaine} cette semaine)"
+        affichage = "aujourd'hui" if nb_semaine == 0 else "encore cette semaine"
+    elif max_jour:
+        message = "📅 Peut être complétée chaque jour" if max_jour == 1 else f"📅 Peut être complétée {max_jour}x par jour"
+        affichage = "aujourd'hui"
+    else:
+        message, affichage = "📅 Tâche ponctuelle - Peut être refaite", "à tout moment"
+    return {"peut_valider": True, "message": message, "prochaine_date": jour, "prochaine_affichage": affichage}
+
+
+def evaluer_missions(taches, user, index, aujourd_hui=None):
+    """Évalue en une passe toutes les missions d'un membre : {nom de mission: résultat d'evaluer()}."""
+    aujourd_hui = aujourd_hui or date.today()
+    resultats = {}
+    for tache in taches:
+        regle = regle_mission(tache)
+        if regle is not None:
+            resultats[tache["n"]] = evaluer(regle, index, user, tache["n"], aujourd_hui)
+    return resultats
+
+
+def matrice_eligibilite(taches, membres, historique, aujourd_hui=None):
+    """
+    Grille « qui peut encore faire quoi » pour toute la famille.
+    `membres` : {nom: rôle ("Parent", "Ado", "Enfant")} ; `historique` : lignes ou DataFrame
+    avec au moins les colonnes user, task, date.
+    Retourne un DataFrame membres × missions : 1.0 possible, 0.0 bloquée, NaN hors rôle.
+    """
+    # Importés ici : seule la grille des parents en a besoin, pas les pages qui évaluent les règles
+    import numpy as np
+    import pandas as pd
+
+    aujourd_hui = aujourd_hui or date.today()
+    jour = aujourd_hui.isoformat()
+    users, noms = list(membres), [t["n"] for t in taches]
+
+    # Un seul regroupement sur la partie utile de l'historique, dates en jours écoulés (entiers)
+    df = historique if isinstance(historique, pd.DataFrame) else pd.DataFrame(list(historique), columns=["user", "task", "date"])
+    df = df.loc[(df["date"] >= etendue_regles(taches, aujourd_hui)) & (df["date"] <= jour)]
+    ecart = (pd.Timestamp(aujourd_hui) - pd.to_datetime(df["date"], format="%Y-%m-%d")).dt.days
+    stats = pd.DataFrame({"user": df["user"], "task": df["task"], "nb_jour": ecart == 0,
+                          "nb_semaine": ecart <= aujourd_hui.weekday(), "ecart": ecart}).groupby(["user", "task"]).agg(
+        nb_jour=("nb_jour", "sum"), nb_semaine=("nb_semaine", "sum"), ecart=("ecart", "min"))
+
+    def grille(colonne):
+        return stats[colonne].unstack().reindex(index=users, columns=noms)
+
+    nb_jour = grille("nb_jour").fillna(0).to_numpy()
+    nb_semaine = grille("nb_semaine").fillna(0).to_numpy()
+    ecart = grille("ecart").to_numpy(dtype=float)
+
+    # Règles des missions en vecteurs (une valeur par colonne)
+    regles = [regle_mission(t) or {} for t in taches]
+    max_jour = np.array([r.get("max_jour") or np.inf for r in regles], dtype=float)
+    max_semaine = np.array([r.get("max_semaine") or np.inf for r in regles], dtype=float)
+    delai = np.array([r.get("delai_jours") or 0 for r in regles], dtype=float)
+    jour_autorise = np.array([not r.get("jours") or aujourd_hui.weekday() in r["jours"] for r in regles])
+
+    possible = ((nb_jour < max_jour) & (nb_semaine < max_semaine) & jour_autorise
+                & (np.isnan(ecart) | (ecart >= delai)))
+    par_role = {role: np.array([role in t["r"] for t in taches], dtype=bool) for role in set(membres.values())}
+    concerne = np.array([par_role[membres[u]] for u in users], dtype=bool).reshape(len(users), len(taches))
+    return pd.DataFrame(np.where(concerne, possible.astype(float), np.nan), index=users, columns=noms)
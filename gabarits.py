@@ -0,0 +1,136 @@
+"""
+Gabarits HTML compacts des pages : feuille de style, cartes de mission et de récompense.
+
+La feuille de style (static/foyer.css) est servie comme fichier statique quand
+server.enableStaticServing est actif (.streamlit/config.toml) : le navigateur la
+télécharge une fois par session puis la garde en cache, et chaque rerun n'envoie
+plus qu'un lien versionné par son contenu. Sinon elle part en ligne comme avant,
+commentaires et blancs retirés.
+
+Les cartes ne portent que des classes de la feuille, sans style en ligne. Leur
+HTML est mémorisé par (mission, état) et par (récompense, état) : le module est
+importé une fois par processus, ses caches servent à toutes les sessions.
+"""
+import functools
+import hashlib
+import os
+import re
+
+FEUILLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "foyer.css")
+
+# Dégradés proposés pour les récompenses ; le n-ième a la classe "degrade-n" dans la feuille
+DEGRADES = [
+    "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
+    "linear-gradient(135deg, #f093fb 0%, #f5576c 100%)",
+    "linear-gradient(135deg, #4facfe 0%, #00f2fe 100%)",
+    "linear-gradient(135deg, #fa709a 0%, #fee140 100%)",
+    "linear-gradient(135deg, #30cfd0 0%, #330867 100%)",
+    "linear-gradient(135deg, #a8edea 0%, #fed6e3 100%)",
+    "linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%)",
+]
+
+FREQUENCES = {
+    "Quotidien": ("mission-box-quotidien", "freq-badge-quotidien", " 🔄"),
+    "Hebdomadaire": ("mission-box-hebdomadaire", "freq-badge-hebdomadaire", " 📅"),
+    "Ponctuel": ("mission-box-ponctuel", "freq-badge-ponctuel", " ⭐"),
+}
+
+LEGENDE = [
+    "<div class='legende legende-quotidien'><strong>🔄 Quotidien</strong><br><small>Tâches journalières</small></div>",
+    "<div class='legende legende-hebdomadaire'><strong>📅 Hebdomadaire</strong><br><small>Tâches hebdomadaires</small></div>",
+    "<div class='legende legende-ponctuel'><strong>⭐ Ponctuel</strong><br><small>Tâches ponctuelles</small></div>",
+]
+
+SABLIER_ENVOI = ("<div class='sablier-anime'><span class='sablier'>⏳</span>"
+                 "<p class='envoyee'>Mission envoyée !</p><p class='attente'>En attente de validation...</p></div>")
+SABLIER_CLASSEMENT = "<div class='sablier-anime grand'><span class='sablier'>⏳</span></div>"
+
+
+# --- FEUILLE DE STYLE ---
+@functools.lru_cache(maxsize=None)
+def _feuille():
+    """(version, feuille compactée) de static/foyer.css, lus une fois par processus."""
+    with open(FEUILLE, encoding="utf-8") as f:
+        css = f.read()
+    compacte = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    compacte = re.sub(r"\s*([{};,])\s*", r"\1", re.sub(r"\s+", " ", compacte)).strip()
+    return hashlib.sha1(css.encode()).hexdigest()[:8], compacte
+
+
+def style(statique):
+    """Lien vers la feuille servie en fichier statique, ou la feuille en ligne si `statique` est faux."""
+    version, compacte = _feuille()
+    if statique:
+        return f"<link rel='stylesheet' href='app/static/foyer.css?v={version}'>"
+    return f"<style>{compacte}</style>"
+
+
+# --- CARTES ---
+def carte_mission(t, regle=None):
+    """Retourne (HTML de la carte, message de statut) d'une mission ; `regle` = résultat d'evaluer()."""
+    etat = (regle["peut_valider"], regle["prochaine_affichage"]) if regle else None
+    return _carte_mission(t["n"], t["p"], t["d"], t.get("f"), etat), (regle["message"] if regle else "")
+
+
+@functools.lru_cache(maxsize=4096)
+def _carte_mission(nom, points, description, frequence, etat):
+    box_class, freq_class, freq_badge = FREQUENCES.get(frequence, ("mission-box", "", ""))
+    freq_label = f" ({frequence})" if frequence else ""
+    freq_badge_html = f"<span class='{freq_class}'>{freq_badge if etat else ''}</span>" if freq_class else ""
+
+    # Date de la prochaine réalisation dans la description
+    date_info = ""
+    if etat:
+        peut_valider, prochaine = etat
+        if peut_valider:
+            date_info = f" | <strong class='a-faire'>📅 À faire {prochaine}</strong>"
+        else:
+            date_info = f" | <strong class='prochaine'>📅 Prochaine fois {prochaine}</strong>"
+
+    return (f"<div class='{box_class}'><span class='pts-badge'>+{points} pts{freq_badge_html}</span>"
+            f"<b>{nom}{freq_label}</b><br><span class='description-text'>👉 {description}{date_info}</span></div>")
+
+
+def carte_recompense(recompense, statut):
+    """HTML de la carte d'une récompense selon son statut (IndexBoutique.statut)."""
+    grisee = bool(statut["obtenue"] or statut["disponible_le"])
+    return _carte_recompense(recompense["emoji"], recompense["nom"], recompense["description"], recompense["points"],
+                             recompense["couleur"], grisee, statut["obtenue"], statut["nb_achats"])
+
+
+@functools.lru_cache(maxsize=1024)
+def _carte_recompense(emoji, nom, description, points, couleur, grisee, obtenue, nb_achats):
+    classes = "reward-card achetee" if grisee else "reward-card"
+    style_fond = ""
+    if couleur in DEGRADES:
+        classes += f" degrade-{DEGRADES.index(couleur) + 1}"
+    else:
+        # Couleur libre (anciennes récompenses) : seul cas avec un style en ligne
+        style_fond = f" style='background: {couleur};'"
+    badge = ""
+    if obtenue:
+        badge = "<div class='reward-badge-achete'>✅ Déjà obtenue !</div>"
+    elif nb_achats:
+        badge = f"<div class='reward-badge-achete'>🔁 Obtenue {nb_achats} fois</div>"
+    return (f"<div class='{classes}'{style_fond}><div class='reward-title'>{emoji} {nom}</div>"
+            f"<div class='reward-description'>{description}</div>"
+            f"<div class='reward-price'>{points} 💰 pts</div>{badge}</div>")
+
+
+def apercu_degrade(couleur):
+    """Bande de couleur d'une récompense dans la liste des récompenses personnalisées."""
+    if couleur in DEGRADES:
+        return f"<div class='apercu-degrade degrade-{DEGRADES.index(couleur) + 1}'></div>"
+    return f"<div class='apercu-degrade' style='background: {couleur};'></div>"
+
+
+def solde_boutique(points):
+    """Trésor disponible en tête de la boutique."""
+    return f"<div class='solde-boutique'><h2>💰 {points} pts</h2><p>Trésor disponible</p></div>"
+
+
+def recompense_obtenue(emoji, nom, nb, dernier, points):
+    """Ligne d'une récompense obtenue : nombre d'achats, date du dernier (JJ/MM/AAAA) et points utilisés."""
+    fois = f" × {nb}" if nb > 1 else ""
+    return (f"<div class='recompense-obtenue'><strong>{emoji} {nom}{fois}</strong><br>"
+            f"<small>{'Dernière fois' if fois else 'Obtenue'} le {dernier} • {points} points utilisés</small></div>")
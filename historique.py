@@ -0,0 +1,180 @@
+"""
+Historique des tâches complétées vu par une session.
+
+La session ne copie plus tout l'historique du foyer : FenetreHistorique charge
+les mois à la demande (stockage chaud + archives) et n'en garde qu'un nombre
+borné en mémoire. La page Missions ne touche que la semaine en cours, le
+calendrier le mois affiché, la boutique rien du tout ; la mémoire et le temps
+de démarrage d'une session ne dépendent donc plus de l'ancienneté du foyer.
+
+La fenêtre est rangée dans st.session_state sous la clé "taches_completees" :
+les réducteurs de evenements.py y ajoutent (append) et y parcourent les lignes
+déjà chargées, exactement comme sur une liste. Les mois non chargés seront lus
+à jour depuis le stockage quand ils seront demandés.
+
+IndexCompletions répond aux contrôles de fréquence (déjà faite aujourd'hui ?
+combien de fois cette semaine ?) sans reparcourir l'historique à chaque carte.
+IndexJours range les complétions par jour (avec cumuls par semaine ISO et par
+mois) : lire une période ne coûte que les lignes de cette période.
+"""
+import bisect
+import os
+from collections import Counter, OrderedDict, defaultdict
+from datetime import date
+
+from archives import mois_entre
+
+FENETRE_MOIS = int(os.environ.get("FOYER_FENETRE_MOIS", "3"))
+
+
+def semaine_iso(jour):
+    """Retourne (année ISO, numéro de semaine ISO) d'une date YYYY-MM-DD."""
+    return date.fromisoformat(jour).isocalendar()[:2]
+
+
+class IndexCompletions:
+    """Index (membre, tâche) -> dates triées, nombre de complétions par jour et par semaine ISO."""
+
+    def __init__(self, taches=()):
+        self._dates = defaultdict(list)
+        self._par_jour = Counter()
+        self._par_semaine = Counter()
+        for tache in taches:
+            self.ajouter(tache)
+
+    def ajouter(self, tache):
+        user, task, jour = tache["user"], tache["task"], tache["date"]
+        bisect.insort(self._dates[user, task], jour)
+        self._par_jour[user, task, jour] += 1
+        self._par_semaine[(user, task) + semaine_iso(jour)] += 1
+
+    def nb_jour(self, user, task, jour):
+        """Nombre de complétions de la tâche par le membre ce jour-là."""
+        return self._par_jour[user, task, jour]
+
+    def nb_semaine(self, user, task, jour):
+        """Nombre de complétions de la tâche par le membre dans la semaine ISO de `jour`."""
+        return self._par_semaine[(user, task) + semaine_iso(jour)]
+
+    def derniere(self, user, task, avant=None):
+        """Date de la dernière complétion (strictement avant `avant` si fourni), ou None."""
+        dates = self._dates.get((user, task), [])
+        i = len(dates) if avant is None else bisect.bisect_left(dates, avant)
+        return dates[i - 1] if i else None
+
+
+class IndexJours:
+    """Index jour -> complétions, tenu à jour à l'insertion, avec cumuls par semaine ISO et par mois."""
+
+    def __init__(self, taches=()):
+        self._jours = []  # jours ayant des complétions, triés
+        self._par_jour = {}
+        self.par_semaine = Counter()  # (année ISO, semaine) -> nombre de complétions
+        self.par_mois = Counter()  # "AAAA-MM" -> nombre de complétions
+        for tache in taches:
+            self.ajouter(tache)
+
+    def ajouter(self, tache):
+        jour = tache["date"]
+        lignes = self._par_jour.get(jour)
+        if lignes is None:
+            bisect.insort(self._jours, jour)
+            lignes = self._par_jour[jour] = []
+        lignes.append(tache)
+        self.par_semaine[semaine_iso(jour)] += 1
+        self.par_mois[jour[:7]] += 1
+
+    def jours(self, debut, fin):
+        """Retourne [(jour, complétions)] des jours de [debut, fin] qui en ont, dans l'ordre chronologique."""
+        i = bisect.bisect_left(self._jours, debut)
+        j = bisect.bisect_right(self._jours, fin)
+        return [(jour, self._par_jour[jour]) for jour in self._jours[i:j]]
+
+    def lignes(self, debut, fin):
+        """Retourne les complétions de [debut, fin] (bornes incluses, YYYY-MM-DD)."""
+        return [tache for _, lignes in self.jours(debut, fin) for tache in lignes]
+
+    def __iter__(self):
+        for jour in self._jours:
+            yield from self._par_jour[jour]
+
+    def __len__(self):
+        return sum(self.par_mois.values())
+
+
+class FenetreHistorique:
+    """Historique d'une session, chargé par mois et borné à `capacite` mois (LRU)."""
+
+    def __init__(self, charger_mois, capacite=FENETRE_MOIS):
+        # charger_mois(mois) -> tâches complétées du mois AAAA-MM (lignes partagées, non modifiées ici)
+        self._charger_mois = charger_mois
+        self.capacite = max(2, capacite)  # une semaine ISO peut couvrir deux mois
+        self._mois = OrderedDict()
+        self._index = None
+        self.chargements = 0
+
+    def _mois_charge(self, mois):
+        lignes = self._mois.get(mois)
+        if lignes is not None:
+            self._mois.move_to_end(mois)
+            return lignes
+        # Copie : les réducteurs modifient les lignes de la session (validation, renommage)
+        lignes = IndexJours(dict(t) for t in self._charger_mois(mois))
+        self._mois[mois] = lignes
+        self.chargements += 1
+        if self._index is not None:
+            for tache in lignes:
+                self._index.ajouter(tache)
+        while len(self._mois) > self.capacite:
+            self._mois.popitem(last=False)
+            self._index = None
+        return lignes
+
+    def index(self, debut, fin):
+        """
+        Index des complétions, garanti complet pour [debut, fin] (mois chargés au besoin).
+        Construit une fois à partir des mois en mémoire, puis tenu à jour par append().
+        """
+        for mois in mois_entre(debut, fin):
+            self._mois_charge(mois)
+        if self._index is None:
+            self._index = IndexCompletions(self)
+        return self._index
+
+    def par_jour(self, debut, fin):
+        """Retourne [(jour, complétions)] des jours de [debut, fin] qui en ont, dans l'ordre chronologique."""
+        resultat = []
+        for mois in mois_entre(debut, fin):
+            resultat.extend(self._mois_charge(mois).jours(debut, fin))
+        return resultat
+
+    def periode(self, debut, fin, user=None, task=None):
+        """Retourne les tâches complétées entre deux dates incluses (YYYY-MM-DD), filtrées au besoin."""
+        return [t for _, lignes in self.par_jour(debut, fin) for t in lignes
+                if (user is None or t["user"] == user) and (task is None or t["task"] == task)]
+
+    def mois(self, mois):
+        """Index par jour d'un mois (AAAA-MM), chargé au besoin ; donne aussi ses cumuls par semaine."""
+        return self._mois_charge(mois)
+
+    def append(self, ligne):
+        """Nouvelle tâche complétée : ajoutée seulement si son mois est déjà en mémoire."""
+        lignes = self._mois.get(ligne["date"][:7])
+        if lignes is not None:
+            lignes.ajouter(ligne)
+            if self._index is not None:
+                self._index.ajouter(ligne)
+
+    def __iter__(self):
+        """Parcourt les lignes en mémoire (utilisé par les réducteurs d'événements)."""
+        # Un réducteur peut modifier les lignes parcourues (renommage) : index reconstruit au besoin
+        self._index = None
+        for lignes in list(self._mois.values()):
+            yield from lignes
+
+    def __len__(self):
+        return sum(len(lignes) for lignes in self._mois.values())
+
+    def mois_en_memoire(self):
+        """Mois actuellement chargés, du moins au plus récemment utilisé."""
+        return list(self._mois)
@@ -0,0 +1,230 @@
+"""
+Profil des reruns (FOYER_PROFIL=1) : temps réel et temps CPU de chaque section
+de page, des évaluations d'éligibilité et des accès au stockage, relances
+demandées (st.rerun) et deltas envoyés au navigateur, rerun par rerun.
+
+Un rerun est mesuré dans le fil de son script : il commence avec ses callbacks
+(les boutons d'action passent avant le script) et se termine avec le script, ou
+avec la dernière unité d'une relance de fragments seuls. La taille du foyer et
+de son historique sont relevées au début du script ou de la relance, après les
+écritures des callbacks : une fois st.stop() ou st.rerun() demandé, le script ne
+peut plus lire st.session_state.
+
+Les mesures terminées sont gardées ici par session Streamlit (RERUNS_GARDES par
+session, pour les SESSIONS_GARDEES dernières) et lues par l'onglet « 🩺 Diagnostic »
+de l'Espace Parents. Si FOYER_PROFIL_TRACE nomme un fichier, chacune y est aussi
+ajoutée en JSONL, une ligne par rerun ; la trace tourne au-delà de
+FOYER_PROFIL_TRACE_KO ko, en gardant FOYER_PROFIL_TRACE_FICHIERS fichiers.
+
+Sans FOYER_PROFIL, lu à l'import comme les options de session.py, mesure()
+retourne un contexte vide partagé et chronometre() la fonction elle-même : le
+coût se limite à un test par appel instrumenté.
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import warnings
+from collections import OrderedDict, deque
+from datetime import datetime
+
+ACTIF = os.environ.get("FOYER_PROFIL", "0") == "1"
+TRACE = os.environ.get("FOYER_PROFIL_TRACE")
+TRACE_OCTETS = int(os.environ.get("FOYER_PROFIL_TRACE_KO", "1024")) * 1024
+TRACE_FICHIERS = int(os.environ.get("FOYER_PROFIL_TRACE_FICHIERS", "3"))
+# Mesures gardées pour l'onglet de diagnostic : par session, pour les dernières sessions
+RERUNS_GARDES = 200
+SESSIONS_GARDEES = 64
+
+_AUCUNE_MESURE = contextlib.nullcontext()
+# Rerun en cours du fil : un script (et ses callbacks) tourne dans un seul fil à la fois
+_courant = threading.local()
+# id de session -> mesures terminées, la session la moins récente en tête
+_sessions = OrderedDict()
+_verrou = threading.Lock()
+
+
+def _rerun():
+    rerun = getattr(_courant, "rerun", None)
+    if rerun is None:
+        debut = time.perf_counter()
+        debut_cpu = time.thread_time()
+        rerun = _courant.rerun = {"debut": debut, "debut_cpu": debut_cpu, "etape": debut, "etape_cpu": debut_cpu,
+                                  "sections": {}, "relances": [], "deltas": 0}
+    return rerun
+
+
+def _ajouter(nom, ms, cpu_ms):
+    if not ACTIF:
+        # Profil coupé en cours de route (voir _compter_deltas) : les fonctions déjà décorées ne comptent plus
+        return
+    cumul = _rerun()["sections"].setdefault(nom, [0, 0.0, 0.0])
+    cumul[0] += 1
+    cumul[1] += ms
+    cumul[2] += cpu_ms
+
+
+@contextlib.contextmanager
+def _mesure(nom):
+    t0, t0_cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        _ajouter(nom, (time.perf_counter() - t0) * 1000, (time.thread_time() - t0_cpu) * 1000)
+
+
+def mesure(nom):
+    """Contexte dont la durée s'ajoute à la section `nom` du rerun en cours."""
+    return _mesure(nom) if ACTIF else _AUCUNE_MESURE
+
+
+def chronometre(nom):
+    """Décorateur : chaque appel compte dans la section `nom` ; sans profil, la fonction est rendue telle quelle."""
+    def decorer(fonction):
+        if not ACTIF:
+            return fonction
+
+        @functools.wraps(fonction)
+        def mesuree(*args, **kwargs):
+            with _mesure(nom):
+                return fonction(*args, **kwargs)
+        return mesuree
+    return decorer
+
+
+def _compter_deltas(ctx):
+    """
+    Compte désormais les deltas que le contexte de script `ctx` envoie au navigateur (une fois par contexte).
+    Passe par l'attribut privé ScriptRunContext._enqueue : s'il a disparu (autre version de Streamlit),
+    le profil est désactivé avec un avertissement plutôt que de faire échouer le script.
+    """
+    global ACTIF
+    if not ACTIF or ctx is None or getattr(ctx, "_profil_deltas", False):
+        return
+    envoyer = getattr(ctx, "_enqueue", None)
+    if not callable(envoyer):
+        warnings.warn("FOYER_PROFIL=1 ignoré : cette version de Streamlit n'expose plus ScriptRunContext._enqueue",
+                      RuntimeWarning, stacklevel=3)
+        ACTIF = False
+        _courant.rerun = None
+        return
+
+    def compter(msg):
+        rerun = getattr(_courant, "rerun", None)
+        if rerun is not None and msg.HasField("delta"):
+            rerun["deltas"] += 1
+        envoyer(msg)
+    ctx._enqueue = compter
+    ctx._profil_deltas = True
+
+
+def debut(ctx, infos):
+    """
+    Début du script (contexte `ctx`) : poursuit la mesure ouverte par ses callbacks, ou en ouvre une,
+    avec le dict retourné par `infos()` (taille du foyer...). Une mesure dont le script avait déjà
+    commencé n'a pas été close (script arrêté avant la fin) : elle est abandonnée.
+    """
+    if not ACTIF:
+        return
+    if getattr(_courant, "rerun", None) is not None and _courant.rerun.get("script"):
+        _courant.rerun = None
+    rerun = _rerun()
+    rerun["script"] = True
+    rerun["infos"] = infos()
+    rerun["etape"], rerun["etape_cpu"] = time.perf_counter(), time.thread_time()
+    _compter_deltas(ctx)
+
+
+def etape(nom):
+    """Compte dans la section `nom` le temps écoulé depuis le début du script ou l'étape précédente."""
+    if not ACTIF:
+        return
+    rerun = _rerun()
+    maintenant, maintenant_cpu = time.perf_counter(), time.thread_time()
+    _ajouter(nom, (maintenant - rerun["etape"]) * 1000, (maintenant_cpu - rerun["etape_cpu"]) * 1000)
+    rerun["etape"], rerun["etape_cpu"] = maintenant, maintenant_cpu
+
+
+def relance(cible):
+    """Note un st.rerun() demandé pendant le rerun en cours : "application" ou la liste des unités relancées."""
+    if ACTIF:
+        _rerun()["relances"].append(cible)
+
+
+def unite_relancee(ctx, nb, infos):
+    """
+    Une unité relancée seule (fragment, contexte `ctx`) commence : retourne True si c'est la
+    dernière des `nb` unités de la relance, celle qui doit clore la mesure. `infos()` n'est
+    appelé que par la première.
+    """
+    _compter_deltas(ctx)
+    if not ACTIF:
+        return False
+    rerun = _rerun()
+    if "infos" not in rerun:
+        rerun["infos"] = infos()
+    rerun["unites_restantes"] = rerun.get("unites_restantes", nb) - 1
+    return rerun["unites_restantes"] <= 0
+
+
+@functools.lru_cache(maxsize=None)
+def _trace():
+    # logging n'est importé que si une trace est demandée
+    import logging
+    import logging.handlers
+
+    journal = logging.getLogger("foyer.profil")
+    journal.propagate = False
+    journal.setLevel(logging.INFO)
+    fichier = logging.handlers.RotatingFileHandler(TRACE, maxBytes=TRACE_OCTETS, backupCount=TRACE_FICHIERS - 1,
+                                                   encoding="utf-8")
+    fichier.setFormatter(logging.Formatter("%(message)s"))
+    journal.addHandler(fichier)
+    return journal
+
+
+def terminer(session, **infos):
+    """
+    Clôt le rerun en cours du fil, le garde parmi les mesures de `session` et retourne sa mesure (None
+    sans profil ou sans rerun ouvert) : heure, ms et cpu_ms totaux, deltas, relances, sections
+    {nom: {appels, ms, cpu_ms}}, infos relevées au début et `infos`.
+    """
+    rerun = getattr(_courant, "rerun", None) if ACTIF else None
+    if rerun is None:
+        return None
+    _courant.rerun = None
+    resultat = {
+        "heure": datetime.now().isoformat(timespec="milliseconds"),
+        "ms": round((time.perf_counter() - rerun["debut"]) * 1000, 2),
+        "cpu_ms": round((time.thread_time() - rerun["debut_cpu"]) * 1000, 2),
+        "deltas": rerun["deltas"],
+        "relances": rerun["relances"],
+        "sections": {nom: {"appels": appels, "ms": round(ms, 2), "cpu_ms": round(cpu_ms, 2)}
+                     for nom, (appels, ms, cpu_ms) in rerun["sections"].items()},
+        **rerun.get("infos", {}),
+        **infos,
+    }
+    with _verrou:
+        if session not in _sessions:
+            _sessions[session] = deque(maxlen=RERUNS_GARDES)
+            while len(_sessions) > SESSIONS_GARDEES:
+                _sessions.popitem(last=False)
+        _sessions.move_to_end(session)
+        _sessions[session].append(resultat)
+    if TRACE:
+        _trace().info(json.dumps({"session": session, **resultat}, ensure_ascii=False))
+    return resultat
+
+
+def mesures(session):
+    """Mesures terminées de `session`, de la plus ancienne à la plus récente."""
+    with _verrou:
+        return list(_sessions.get(session, ()))
+
+
+def effacer(session):
+    """Oublie les mesures de `session`."""
+    with _verrou:
+        _sessions.pop(session, None)
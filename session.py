@@ -0,0 +1,382 @@
+"""
+État du foyer dans la session Streamlit, partagé par le routeur (main.py) et les pages (vues/).
+
+Le stockage du foyer est relu dans le registre des foyers ouverts à chaque appel
+(stockage_courant), à partir de l'id de foyer gardé en session : une unité
+rejouée seule (fragment) n'a pas besoin que le script entier ait tourné.
+On y trouve aussi l'authentification parent, l'enregistrement des événements
+avec leurs clés d'idempotence, les boutons d'action et les index de session
+(boutique, file d'attente, éligibilité des missions).
+
+Les options d'affichage (FOYER_RENDU, FOYER_ANIMATIONS, FOYER_FRAGMENTS) sont lues
+à l'import, une fois par processus comme celles de foyers.py. Avec FOYER_PROFIL=1,
+chaque rerun est mesuré (voir profil.py) : sections, éligibilité, accès au stockage
+et relances.
+"""
+import copy
+import functools
+import hashlib
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import profil
+
+from archives import lire_historique
+from attente import IndexAttente
+from boutique import IndexBoutique
+from catalogue import RECOMPENSES, IndexMissions
+from evenements import EvenementDuplique, EvenementInvalide, appliquer_evenement
+from foyers import FOYER_DEFAUT, RegistreFoyers, verifier_code_parent
+from frequences import etendue_regles, evaluer_missions
+from historique import FenetreHistorique
+from stockage import ETAT_VIDE
+
+
+# --- CONFIGURATION & SAUVEGARDE ---
+# Clés copiées dans chaque session ; l'historique est chargé à la demande, les cumuls
+# de points sont lus directement dans l'état partagé du foyer et les clés d'idempotence
+# ne sont contrôlées que par lui
+CLES_SESSION = [key for key in ETAT_VIDE if key not in ("taches_completees", "cumuls", "cles_recentes")]
+# Affichage allégé (par défaut) : une mission (carte et statut, chacune avec son bouton) ou un jour
+# du calendrier = un seul bloc HTML envoyé au navigateur ; FOYER_RENDU=detaille rétablit un élément par ligne
+RENDU_COMPACT = os.environ.get("FOYER_RENDU", "compact") != "detaille"
+RECOMPENSES_PAR_PAGE = 10
+# Animations jouées par le navigateur (CSS) sans bloquer le script ;
+# FOYER_ANIMATIONS=bloquantes rétablit les anciennes animations à base de time.sleep
+ANIMATIONS_BLOQUANTES = os.environ.get("FOYER_ANIMATIONS", "css") == "bloquantes"
+# Cartes, file de validation et trésor sont des fragments (st.fragment) : un clic ne réexécute
+# et ne renvoie que les unités touchées ; FOYER_FRAGMENTS=0 rétablit le rerun complet à chaque clic
+FRAGMENTS = os.environ.get("FOYER_FRAGMENTS", "1") != "0"
+
+
+# --- FONCTIONS D'AUTHENTIFICATION ---
+def verify_password(input_password):
+    """Vérifie si le code entré est le code parent du foyer de la session (voir foyers.py)."""
+    return verifier_code_parent(stockage_courant().chemin_donnees, input_password,
+                                defaut=st.session_state.foyer_id == FOYER_DEFAUT)
+
+
+def require_parent_auth(show_form=True):
+    """
+    Vérifie si l'utilisateur est authentifié en tant que parent.
+    Si show_form=True, affiche un formulaire d'authentification si non authentifié.
+    Retourne True si authentifié, False sinon.
+    """
+    if st.session_state.get('parent_authenticated', False):
+        return True
+    
+    if show_form:
+        st.title("🔐 Authentification Parents")
+        st.info("Cette section est réservée aux parents. Veuillez entrer le code d'accès.")
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            code_input = st.text_input("Code Parent :", type="password", key="auth_code_input")
+            
+            col_btn1, col_btn2 = st.columns(2)
+            with col_btn1:
+                if st.button("✅ Se connecter", use_container_width=True, key="auth_btn_connect"):
+                    if verify_password(code_input):
+                        st.session_state.parent_authenticated = True
+                        if ANIMATIONS_BLOQUANTES:
+                            st.success("✅ Authentification réussie !")
+                            time.sleep(0.5)
+                        else:
+                            # Le toast reste affiché après le rerun
+                            st.toast("✅ Authentification réussie !")
+                        relancer()
+                    else:
+                        st.error("❌ Code incorrect. Accès refusé.")
+            with col_btn2:
+                if st.button("🔙 Retour", use_container_width=True, key="auth_btn_back"):
+                    st.session_state.parent_authenticated = False
+                    relancer()
+    
+    return False
+
+
+def logout_parent():
+    """Déconnecte le parent et réinitialise la session."""
+    st.session_state.parent_authenticated = False
+    relancer()
+
+
+@st.cache_resource
+def registre_foyers():
+    """Registre des foyers ouverts, unique par processus : chaque cache est partagé par toutes les sessions."""
+    return RegistreFoyers()
+
+
+def stockage_foyer(foyer_id):
+    """Stockage du foyer demandé, chargé au premier accès puis gardé en cache par le registre."""
+    return registre_foyers().ouvrir(foyer_id)
+
+
+def stockage_courant():
+    """Stockage du foyer de la session, lu dans le registre à chaque appel (une unité peut être rejouée seule)."""
+    return registre_foyers().ouvrir(st.session_state.foyer_id)
+
+
+@profil.chronometre("rafraichir_session (copie du foyer)")
+def rafraichir_session():
+    """
+    Recopie dans la session l'état courant du foyer et sa revision.
+    L'historique n'est pas copié : il est relu mois par mois à la demande.
+    """
+    donnees, revision = stockage_courant().copie(CLES_SESSION)
+    for key, value in donnees.items():
+        st.session_state[key] = value
+    st.session_state.taches_completees = FenetreHistorique(charger_mois_historique)
+    # Index de la boutique, de la file de validation et des missions reconstruits au prochain besoin
+    st.session_state.boutique = None
+    st.session_state.index_attente = None
+    st.session_state.index_missions = None
+    st.session_state.revision = revision
+
+
+@profil.chronometre("enregistrer (écriture du foyer)")
+def enregistrer(evenement):
+    """
+    Persiste un événement puis met la session à jour.
+    L'écriture est optimiste : si un autre appareil a modifié le foyer depuis que la
+    session l'a chargé, l'événement est rejoué sur l'état le plus récent et la session
+    est rafraîchie. Retourne None si l'action n'a plus lieu d'être.
+    """
+    evenement.setdefault("cle", cle_idempotence(evenement))
+    try:
+        revision, conflit = stockage_courant().appliquer(evenement, st.session_state.get("revision"))
+    except EvenementDuplique:
+        # Double appui : l'action est déjà enregistrée, la session la reprend du foyer
+        rafraichir_session()
+        return None
+    except EvenementInvalide as e:
+        st.session_state.message_flash = f"⚠️ {e}"
+        rafraichir_session()
+        return None
+    if conflit:
+        rafraichir_session()
+    else:
+        # Copie : l'événement a aussi été appliqué à l'état partagé
+        appliquer_evenement(st.session_state, copy.deepcopy(evenement))
+        st.session_state.revision = revision
+    return evenement
+
+
+def cle_idempotence(evenement):
+    """
+    Clé d'idempotence d'une action : même jeton de session et même contenu donnent la même clé,
+    si bien qu'un second appui traité avant le changement de jeton est refusé par le stockage.
+    """
+    contenu = json.dumps({k: v for k, v in evenement.items() if k not in ("ts", "cle")}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(f"{st.session_state.jeton_action}:{contenu}".encode()).hexdigest()[:20]
+
+
+def cle_widget(cle):
+    """
+    Clé d'un bouton d'action, renouvelée après chaque action : un second appui envoyé
+    depuis la page précédente vise un bouton qui n'existe plus et n'a aucun effet.
+    """
+    return f"{cle}_{st.session_state.jeton_action}"
+
+
+def action(cle, callback, *args, **kwargs):
+    """Clé et paramètres on_click d'un bouton d'action : `callback(*args, **kwargs)` passé par appel_action."""
+    cle = cle_widget(cle)
+    return {"key": cle, "on_click": appel_action, "args": (cle, st.session_state.jeton_action, callback, *args), "kwargs": kwargs}
+
+
+def appel_action(cle, jeton, callback, *args, **kwargs):
+    """
+    Streamlit garde le callback d'un bouton disparu et l'appelle si des états envoyés depuis une page
+    précédente le mentionnent encore : seul le bouton appuyé agit. L'action prend le jeton de la page
+    qui a affiché le bouton, si bien qu'un second appui depuis cette page donne la même clé
+    d'idempotence (les unités non réexécutées gardent leurs boutons, et leur jeton, d'avant).
+    """
+    if st.session_state.get(cle):
+        st.session_state.jeton_action = jeton
+        callback(*args, **kwargs)
+
+
+def charger_mois_historique(mois):
+    """Retourne les tâches complétées d'un mois (AAAA-MM), stockage chaud et archives."""
+    debut, fin = f"{mois}-01", f"{mois}-31"
+    stockage = stockage_courant()
+    return lire_historique(stockage.historique(debut=debut, fin=fin), stockage.chemin_donnees,
+                           st.session_state.archive_avant, debut, fin)
+
+
+def historique_periode(debut, fin, user=None, task=None):
+    """Retourne les tâches complétées entre deux dates (YYYY-MM-DD), chargées à la demande."""
+    return st.session_state.taches_completees.periode(debut, fin, user, task)
+
+
+def boutique():
+    """Index de la boutique (catalogue et achats par id), construit au premier besoin puis tenu à jour par les événements."""
+    if st.session_state.get("boutique") is None:
+        st.session_state.boutique = IndexBoutique(RECOMPENSES + st.session_state.recompenses_personnalisees,
+                                                  st.session_state.recompenses_achetees)
+    return st.session_state.boutique
+
+
+def nom_membre(membre):
+    """Nom affiché d'un membre (id) ; un id inconnu, comme dans d'anciennes archives, s'affiche tel quel."""
+    return st.session_state.noms.get(membre, membre)
+
+
+def file_attente():
+    """Index des missions en attente par membre, construit au premier besoin puis tenu à jour par les événements."""
+    if st.session_state.get("index_attente") is None:
+        st.session_state.index_attente = IndexAttente(st.session_state.attente_validation)
+    return st.session_state.index_attente
+
+
+def points_cumules(periode, cle):
+    """Retourne {membre: points gagnés} pour un jour, une semaine ("AAAA-Sxx") ou un mois (cumuls tenus à jour)."""
+    return stockage_courant().charger()["cumuls"][periode].get(cle, {})
+
+
+# --- FONCTIONS DE GESTION DES FRÉQUENCES ---
+def get_today_str():
+    """Retourne la date d'aujourd'hui au format YYYY-MM-DD."""
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def get_week_start(date_str=None):
+    """Retourne le début de la semaine (lundi) pour une date donnée."""
+    if date_str is None:
+        date_str = get_today_str()
+    date = datetime.strptime(date_str, "%Y-%m-%d")
+    # Retourner le lundi de la semaine
+    days_since_monday = date.weekday()
+    monday = date - timedelta(days=days_since_monday)
+    return monday.strftime("%Y-%m-%d")
+
+
+def eligibilite_missions(tasks, user):
+    """
+    Évalue les règles de fréquence de toutes les missions du membre en une passe.
+    Retourne {nom de mission: {"peut_valider", "message", "prochaine_date", "prochaine_affichage"}}.
+    Le résultat est gardé en session tant que l'historique (revision) et le jour ne changent pas.
+    """
+    cle = (st.session_state.foyer_id, user, st.session_state.revision, get_today_str())
+    cache = st.session_state.get("eligibilite")
+    if cache is None or cache[0] != cle:
+        with profil.mesure("éligibilité (règles de fréquence)"):
+            aujourd_hui = datetime.now().date()
+            index = st.session_state.taches_completees.index(etendue_regles(tasks, aujourd_hui), get_today_str())
+            cache = (cle, evaluer_missions(tasks, user, index, aujourd_hui))
+        st.session_state.eligibilite = cache
+    return cache[1]
+
+
+def index_missions():
+    """
+    Index des missions (catalogue et personnalisées) par rôle et par (rôle, catégorie), construit
+    au premier besoin ; les réducteurs le retirent quand les missions personnalisées changent.
+    """
+    if st.session_state.get("index_missions") is None:
+        st.session_state.index_missions = IndexMissions(st.session_state.taches_personnalisees)
+    return st.session_state.index_missions
+
+
+# --- ACTIONS ET UNITÉS RÉEXÉCUTABLES (FRAGMENTS) ---
+# Rejouée seule, une unité reçoit les arguments de son dernier rerun complet : elle ne prend
+# que des identifiants et relit la session à chaque exécution
+def update_and_save(evenement=None, unites=(), **effets):
+    """
+    Enregistre l'événement puis relance le script. Depuis le callback d'un bouton d'unité,
+    `unites` nomme les fragments à réexécuter seuls (l'unité et celles qui affichent ce que
+    l'action change) et `effets` les drapeaux de session qu'ils joueront (ballons, sablier...).
+    Une action refusée, ou une session en retard sur le foyer, relance toute l'application.
+    """
+    a_jour = st.session_state.get("revision") == stockage_courant().revision
+    if evenement is not None and enregistrer(evenement) is None:
+        a_jour = False
+    else:
+        st.session_state.update(effets)
+    # Nouveau jeton : nouvelles clés de boutons et d'idempotence pour la prochaine action
+    st.session_state.jeton_action = uuid.uuid4().hex[:12]
+    if FRAGMENTS and unites and a_jour:
+        relancer(list(unites))
+    relancer()
+
+
+def relancer(unites=None):
+    """st.rerun() de toute l'application, ou des seules `unites` (fragments), noté dans le profil du rerun."""
+    profil.relance(unites or "application")
+    if unites:
+        st.rerun(unites)
+    st.rerun()
+
+
+def unite(cle):
+    """
+    Décorateur d'une unité réexécutable seule, nommée `cle` pour st.rerun ; sans effet si FOYER_FRAGMENTS=0.
+    Avec FOYER_PROFIL=1, l'unité est une section du profil, et clôt la mesure d'une relance d'unités seules.
+    """
+    def decorer(fonction):
+        if profil.ACTIF:
+            fonction = _unite_profilee(cle, fonction)
+        return st.fragment(key=cle)(fonction) if FRAGMENTS else fonction
+    return decorer
+
+
+def _unite_profilee(cle, fonction):
+    @functools.wraps(fonction)
+    def profilee(*args, **kwargs):
+        ctx = get_script_run_ctx()
+        relancees = ctx.fragment_ids_this_run if ctx is not None else None
+        derniere = bool(relancees) and profil.unite_relancee(ctx, len(relancees), lambda: infos_foyer(stockage_courant()))
+        try:
+            with profil.mesure(f"unité {cle}"):
+                return fonction(*args, **kwargs)
+        finally:
+            if derniere:
+                fin_rerun(f"unité {cle}")
+    return profilee
+
+
+def metrique_tresor():
+    """Trésor commun de la barre latérale ; joue les ballons d'un crédit ou d'un achat."""
+    if st.session_state.pop("ballons", False):
+        st.balloons()
+    st.metric("💰 Trésor Commun", f"{st.session_state.points_foyer} pts")
+
+
+# --- PROFIL DES RERUNS ---
+def infos_foyer(stockage):
+    """Taille du foyer sur disque et de son historique chaud, relevées dans chaque mesure de rerun."""
+    return {"octets": stockage.octets(), "historique": len(stockage.charger()["taches_completees"])}
+
+
+def debut_rerun(stockage):
+    """Début du script : la mesure du rerun (FOYER_PROFIL=1) compte aussi les deltas envoyés au navigateur."""
+    profil.debut(get_script_run_ctx(), lambda: infos_foyer(stockage))
+
+
+def fin_rerun(page):
+    """
+    Clôt la mesure du rerun (FOYER_PROFIL=1) et la garde pour l'onglet « 🩺 Diagnostic » de l'Espace
+    Parents. Appelée aussi après st.stop() ou st.rerun() : n'utilise pas st.session_state.
+    """
+    if not profil.ACTIF:
+        return
+    ctx = get_script_run_ctx()
+    profil.terminer(ctx.session_id if ctx is not None else None, page=page,
+                    fragments=bool(ctx is not None and ctx.fragment_ids_this_run))
+
+
+def mesures_profil():
+    """Mesures des derniers reruns de la session, de la plus ancienne à la plus récente."""
+    return profil.mesures(get_script_run_ctx().session_id)
+
+
+def effacer_profil():
+    """Oublie les mesures de la session (bouton de l'onglet de diagnostic)."""
+    profil.effacer(get_script_run_ctx().session_id)
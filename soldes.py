@@ -0,0 +1,181 @@
+"""
+Soldes du foyer (trésor commun et classement) recalculés depuis l'historique.
+
+Le registre des points est l'historique lui-même : chaque tâche complétée
+créditée ajoute ses points à son membre et au trésor, chaque récompense achetée
+retire les siens du trésor. points_foyer et classement ne sont que le pli de ce
+registre (evenements.plier_completions / plier_achats), tenu à jour par les
+réducteurs à chaque action. Le classement ne garde que les membres actuels du
+foyer.
+
+reconcilier() refait ce pli en un seul passage (archives mensuelles lues ligne
+à ligne, puis historique chaud et achats), le compare aux compteurs enregistrés
+et, sur demande, corrige ces derniers par un événement "reconciliation". Les
+cumuls par jour, semaine et mois (evenements.cumuls_depuis_historique) sont
+reconstruits dans le même passage, mois archivés compris, et corrigés avec eux.
+
+Un mois archivé ne change plus : sa contribution (soldes et cumuls) est gardée dans
+<archives>/soldes.json, point de contrôle invalidé par la signature (mtime,
+taille) de son fichier. Une réconciliation suivante ne relit donc que
+l'historique chaud et les archives modifiées depuis.
+
+Usage : python soldes.py reconcilier [data_foyer.json] [--appliquer]
+"""
+import json
+import os
+import sys
+
+from archives import dossier_archives, mois_archives, parcourir_mois, signature_mois
+from evenements import cumuls_depuis_historique, nouvel_evenement, plier_achats, plier_completions
+from stockage import ouvrir_stockage
+
+FICHIER_POINTS_CONTROLE = "soldes.json"
+
+
+def solde_vide():
+    """Solde d'un registre vide."""
+    return {"points_foyer": 0, "classement": {}}
+
+
+def _ajouter(solde, autre):
+    solde["points_foyer"] += autre["points_foyer"]
+    for user, points in autre["classement"].items():
+        solde["classement"][user] = solde["classement"].get(user, 0) + points
+
+
+def _ajouter_cumuls(cumuls, autres):
+    # Une semaine ISO peut être à cheval sur deux mois : ses points s'additionnent
+    for periode, par_cle in autres.items():
+        for cle, par_user in par_cle.items():
+            cumul = cumuls[periode].setdefault(cle, {})
+            for user, points in par_user.items():
+                cumul[user] = cumul.get(user, 0) + points
+
+
+def ecarts_cumuls(enregistres, attendus):
+    """Entrées (période, clé, membre) dont les points diffèrent entre deux cumuls ; une absence vaut 0."""
+    ecarts = 0
+    for periode in ("jour", "semaine", "mois"):
+        avant, apres = enregistres.get(periode, {}), attendus.get(periode, {})
+        for cle in set(avant) | set(apres):
+            par_user, attendu = avant.get(cle, {}), apres.get(cle, {})
+            ecarts += sum(par_user.get(user, 0) != attendu.get(user, 0) for user in set(par_user) | set(attendu))
+    return ecarts
+
+
+def _lire_points_controle(chemin):
+    try:
+        with open(chemin, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _ecrire_points_controle(chemin, points_controle):
+    tmp = f"{chemin}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(points_controle, f, ensure_ascii=False)
+    os.replace(tmp, chemin)
+
+
+def soldes_archives(dossier, archive_avant):
+    """
+    Pli des mois archivés avant `archive_avant`, à partir des points de contrôle
+    mensuels encore valides. Retourne (solde avec ses "cumuls", nombre de mois relus).
+    """
+    solde, relus = {**solde_vide(), "cumuls": {"jour": {}, "semaine": {}, "mois": {}}}, 0
+    if not archive_avant:
+        return solde, relus
+    chemin = os.path.join(dossier, FICHIER_POINTS_CONTROLE)
+    points_controle = _lire_points_controle(chemin)
+    modifies = False
+    for mois in mois_archives(dossier):
+        # Comme lire_historique() : les archives au-delà de archive_avant sont des doublons
+        if mois >= archive_avant[:7]:
+            break
+        signature = list(signature_mois(dossier, mois))
+        controle = points_controle.get(mois)
+        # Les points de contrôle antérieurs aux cumuls sont refaits une fois
+        if controle is None or controle["signature"] != signature or "cumuls" not in controle:
+            taches = list(parcourir_mois(dossier, mois))
+            controle = {"signature": signature, **plier_completions(solde_vide(), taches),
+                        "cumuls": cumuls_depuis_historique(taches)}
+            points_controle[mois] = controle
+            modifies = True
+            relus += 1
+        _ajouter(solde, controle)
+        _ajouter_cumuls(solde["cumuls"], controle["cumuls"])
+    if modifies:
+        _ecrire_points_controle(chemin, points_controle)
+    return solde, relus
+
+
+def soldes_registre(etat, chemin_donnees):
+    """
+    Pli complet du registre : {"points_foyer", "classement", "cumuls", "mois_relus"}.
+    Le classement et les cumuls retournés contiennent aussi les membres qui ne sont plus dans le foyer.
+    """
+    solde, relus = soldes_archives(dossier_archives(chemin_donnees), etat["archive_avant"])
+    plier_completions(solde, etat["taches_completees"])
+    _ajouter_cumuls(solde["cumuls"], cumuls_depuis_historique(etat["taches_completees"]))
+    plier_achats(solde, etat["recompenses_achetees"])
+    solde["mois_relus"] = relus
+    return solde
+
+
+def reconcilier(stockage, appliquer=False):
+    """
+    Compare les soldes enregistrés au pli de l'historique (`stockage` : StockageEnCache).
+    Retourne {"points_foyer": (enregistré, attendu), "classement": {membre: (enregistré, attendu)},
+    "cumuls": nombre d'entrées qui diffèrent, "hors_foyer": {nom: points}, "mois_relus": n,
+    "corrige": bool} ; seuls les écarts sont listés.
+    Avec appliquer=True, un écart est corrigé par un événement "reconciliation" (soldes et cumuls).
+    """
+    etat = stockage.charger()
+    registre = soldes_registre(etat, stockage.chemin_donnees)
+    config = etat["config"]
+    membres = set(config["parents"] + config["ados"] + config["enfants"])
+    classement = {user: points for user, points in registre["classement"].items() if user in membres}
+
+    ecarts = {user: (etat["classement"].get(user, 0), classement.get(user, 0))
+              for user in set(etat["classement"]) | set(classement)
+              if etat["classement"].get(user, 0) != classement.get(user, 0)}
+    rapport = {
+        "points_foyer": (etat["points_foyer"], registre["points_foyer"]),
+        "classement": ecarts,
+        "cumuls": ecarts_cumuls(etat["cumuls"], registre["cumuls"]),
+        # Membres supprimés, ou renommés (avant les ids de membres) après l'archivage de leurs missions
+        "hors_foyer": {user: points for user, points in registre["classement"].items() if user not in membres},
+        "mois_relus": registre["mois_relus"],
+        "corrige": False,
+    }
+    if appliquer and (ecarts or rapport["cumuls"] or etat["points_foyer"] != registre["points_foyer"]):
+        stockage.appliquer(nouvel_evenement("reconciliation", points_foyer=registre["points_foyer"],
+                                            classement=classement, cumuls=registre["cumuls"]))
+        rapport["corrige"] = True
+    return rapport
+
+
+if __name__ == "__main__":
+    arguments = [a for a in sys.argv[1:] if a != "--appliquer"]
+    if not arguments or arguments[0] != "reconcilier":
+        print("Usage : python soldes.py reconcilier [data_foyer.json] [--appliquer]")
+        sys.exit(1)
+    stockage = ouvrir_stockage(arguments[1] if len(arguments) > 1 else "data_foyer.json")
+    rapport = reconcilier(stockage, appliquer="--appliquer" in sys.argv)
+    enregistre, attendu = rapport["points_foyer"]
+    noms = stockage.charger()["noms"]
+    print(f"Trésor commun : {enregistre} pts enregistrés, {attendu} pts d'après l'historique")
+    for user, (points, points_attendus) in sorted(rapport["classement"].items()):
+        print(f"  {noms.get(user, user)} : {points} pts enregistrés, {points_attendus} pts d'après l'historique")
+    for user, points in sorted(rapport["hors_foyer"].items()):
+        print(f"  {noms.get(user, user)} (hors foyer) : {points} pts dans l'historique, ignorés au classement")
+    if rapport["cumuls"]:
+        print(f"Cumuls par période : {rapport['cumuls']} entrée(s) différente(s) de l'historique")
+    if rapport["corrige"]:
+        print("Soldes corrigés.")
+    elif rapport["classement"] or rapport["cumuls"] or enregistre != attendu:
+        print("Écarts non corrigés (relancer avec --appliquer).")
+    else:
+        print("Soldes cohérents avec l'historique.")
+    stockage.fermer()
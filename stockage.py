@@ -0,0 +1,873 @@
+"""
+Stockage des données du foyer.
+
+Trois modes sont disponibles (variable d'environnement FOYER_STOCKAGE) :
+- "json" (défaut) : tout l'état est réécrit dans data_foyer.json à chaque action ;
+- "journal" : chaque action ajoute une ligne JSONL au journal, et le journal est
+  compacté périodiquement dans le fichier instantané (data_foyer.json) ;
+- "sqlite" : base SQLite (mode WAL) à côté du fichier JSON, mise à jour ligne à
+  ligne ; elle est migrée automatiquement depuis data_foyer.json à la première ouverture.
+
+Tous les modes exposent la même interface : charger(), sauvegarder(etat),
+enregistrer(evt, etat), historique(user, task, debut, fin) et signature(), et
+tiennent un numéro de `revision` incrémenté à chaque écriture.
+
+ouvrir_stockage() enveloppe le mode choisi dans StockageEnCache : l'état chargé
+est gardé en mémoire pour tout le processus et n'est relu que si les fichiers
+ont changé (signature mtime/taille, ou data_version pour SQLite). C'est aussi lui
+qui sérialise les écritures : appliquer(evt, revision_attendue) compare la
+revision de la session à celle du disque sous un verrou de fichier tenu le
+temps d'une écriture seulement, et rejoue l'événement sur l'état le plus récent
+en cas de conflit (plusieurs appareils, plusieurs processus).
+
+Migration manuelle : python stockage.py migrer data_foyer.json data_foyer.sqlite3
+"""
+import copy
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+import profil
+from evenements import CLES_RETENUES, EvenementInvalide, appliquer_evenement, cles_cumuls, cumuls_depuis_historique
+from historique import IndexJours
+
+try:
+    import fcntl
+except ImportError:  # Windows : le verrou ne protège que le processus courant
+    fcntl = None
+
+CONFIG_DEFAUT = {"parents": ["Papa", "Maman"], "ados": ["Ado 1"], "enfants": ["Enfant 1", "Enfant 2"]}
+
+ETAT_VIDE = {
+    "points_foyer": 0,
+    "classement": {},
+    "attente_validation": [],
+    "taches_completees": [],
+    "taches_personnalisees": [],
+    "config": CONFIG_DEFAUT,
+    # Nom affiché de chaque membre, par id (les listes de config et l'historique citent les ids)
+    "noms": {nom: nom for membres in CONFIG_DEFAUT.values() for nom in membres},
+    "recompenses_achetees": [],
+    "recompenses_personnalisees": [],
+    # Date (AAAA-MM-JJ) avant laquelle l'historique validé est dans les archives mensuelles
+    "archive_avant": None,
+    # Points gagnés par membre : {"jour": {"2025-03-14": {membre: pts}}, "semaine": {"2025-S11": ...}, "mois": {"2025-03": ...}}
+    "cumuls": {"jour": {}, "semaine": {}, "mois": {}},
+    # Clés d'idempotence des dernières actions appliquées (evenements.CLES_RETENUES)
+    "cles_recentes": []
+}
+
+# Nombre d'événements journalisés avant compaction dans l'instantané
+SEUIL_COMPACTION = int(os.environ.get("FOYER_JOURNAL_SEUIL", "500"))
+
+
+def etat_vide():
+    """Retourne un état vierge (copie indépendante)."""
+    return copy.deepcopy(ETAT_VIDE)
+
+
+def completer_etat(donnees):
+    """Complète un état chargé avec les clés manquantes (anciens fichiers)."""
+    etat = etat_vide()
+    etat.update({k: v for k, v in donnees.items() if k in ETAT_VIDE and v is not None})
+    if "cumuls" not in donnees:
+        # Fichier antérieur aux cumuls : missions non validées marquées, puis cumuls reconstruits
+        # une fois depuis l'historique chaud
+        marquer_non_validees(etat["taches_completees"], etat["config"]["parents"])
+        etat["cumuls"] = cumuls_depuis_historique(etat["taches_completees"])
+    if "noms" not in donnees:
+        etat["noms"] = noms_depuis_config(etat["config"])
+    if any("id" not in item for item in etat["attente_validation"]):
+        lier_attente(etat["attente_validation"], etat["taches_completees"])
+    return etat
+
+
+def marquer_non_validees(taches, parents):
+    """
+    Fichiers de la première version : une mission d'ado ou d'enfant n'y était marquée
+    (validated=True) qu'une fois validée le jour de son envoi ; en attente ou refusée, elle
+    n'avait pas de clé "validated". Ces lignes sont marquées validated=False : elles ne
+    rapportent pas de points (evenements.est_creditee), comme dans les fichiers récents.
+    """
+    for tache in taches:
+        if "validated" not in tache and tache["user"] not in parents:
+            tache["validated"] = False
+
+
+def noms_depuis_config(config):
+    """
+    Noms des membres d'un fichier antérieur aux ids : chaque membre garde son nom comme id,
+    si bien que l'historique, les archives, la file et le classement restent valables tels quels.
+    """
+    return {nom: nom for membres in config.values() for nom in membres}
+
+
+def lier_attente(attente, taches):
+    """
+    Donne un id aux missions en attente enregistrées avant les ids : l'horodatage d'une ligne
+    d'historique non créditée (ou sans clé "validated") du même membre et de la même mission,
+    pas encore liée. Les lignes les plus récentes vont aux missions restées dans la file, dans
+    l'ordre de la file ; chaque ligne liée est marquée en attente pour que la validation la crédite.
+    """
+    liees = {item["id"] for item in attente if "id" in item}
+    candidates = {}
+    for tache in taches:
+        if tache.get("validated", False) is False and tache["timestamp"] not in liees:
+            candidates.setdefault((tache["user"], tache["task"]), []).append(tache)
+    a_lier = {}
+    for position, item in enumerate(attente):
+        if "id" not in item:
+            a_lier.setdefault((item["user"], item["task"]), []).append((position, item))
+    for cle, items in a_lier.items():
+        restantes = candidates.get(cle, [])[-len(items):]
+        manquantes = len(items) - len(restantes)
+        for rang, (position, item) in enumerate(items):
+            if rang < manquantes:
+                # Sans ligne d'historique (fichier incohérent) : id local, la validation créditera quand même
+                item["id"] = f"attente-{position}"
+                continue
+            tache = restantes[rang - manquantes]
+            tache["validated"] = False
+            item["id"] = tache["timestamp"]
+
+
+def filtrer_historique(taches, user=None, task=None, debut=None, fin=None):
+    """Filtre une liste de tâches complétées par membre, tâche et intervalle de dates."""
+    return [t for t in taches
+            if (user is None or t["user"] == user)
+            and (task is None or t["task"] == task)
+            and (debut is None or t["date"] >= debut)
+            and (fin is None or t["date"] <= fin)]
+
+
+def _signature_fichiers(*chemins):
+    """
+    (inode, mtime, taille) de chaque fichier, None s'il n'existe pas.
+    L'inode change à chaque remplacement atomique, même si mtime et taille sont identiques.
+    """
+    signature = []
+    for chemin in chemins:
+        try:
+            st = os.stat(chemin)
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+@contextmanager
+def verrou_fichier(chemin):
+    """Verrou exclusif inter-processus (fichier .lock à côté des données)."""
+    if fcntl is None:
+        yield
+        return
+    with open(chemin, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _ecrire_atomique(chemin, donnees):
+    """Écrit un fichier JSON via un fichier temporaire renommé (jamais de fichier à moitié écrit)."""
+    tmp = f"{chemin}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(donnees, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, chemin)
+
+
+class StockageJSON:
+    """Un seul fichier JSON réécrit entièrement (et atomiquement) à chaque sauvegarde."""
+
+    mode = "json"
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.chemin_json = chemin
+        self.chemin_verrou = os.path.splitext(chemin)[0] + ".lock"
+        self.revision = None
+
+    def charger(self):
+        if os.path.exists(self.chemin):
+            with open(self.chemin, "r") as f:
+                donnees = json.load(f)
+            self.revision = donnees.get("revision", 0)
+            return completer_etat(donnees)
+        self.revision = 0
+        return etat_vide()
+
+    def sauvegarder(self, etat):
+        if self.revision is None:
+            self.charger()
+        self.revision += 1
+        _ecrire_atomique(self.chemin, {**etat, "revision": self.revision})
+
+    def enregistrer(self, evt, etat):
+        """Persiste l'état après application de l'événement `evt`."""
+        self.sauvegarder(etat)
+
+    def historique(self, user=None, task=None, debut=None, fin=None):
+        """Retourne les tâches complétées filtrées (bornes de dates incluses)."""
+        return filtrer_historique(self.charger()["taches_completees"], user, task, debut, fin)
+
+    def signature(self):
+        """Empreinte bon marché du contenu sur disque (change à chaque écriture)."""
+        return _signature_fichiers(self.chemin)
+
+    def fermer(self):
+        """Libère les ressources ; rien à vider, chaque sauvegarde écrit tout le fichier."""
+
+
+class StockageJournal(StockageJSON):
+    """
+    Instantané JSON + journal append-only d'événements (une ligne JSONL par action).
+    charger() relit l'instantané puis rejoue la fin du journal ; le numéro de
+    séquence de chaque ligne est la revision du foyer après cet événement.
+    """
+
+    mode = "journal"
+
+    def __init__(self, chemin, seuil_compaction=SEUIL_COMPACTION):
+        super().__init__(chemin)
+        self.chemin_journal = os.path.splitext(chemin)[0] + ".journal.jsonl"
+        self.seuil_compaction = seuil_compaction
+        self._nb_journal = 0
+
+    def _lire(self):
+        """Retourne (état, revision, nombre d'événements dans le journal)."""
+        revision = 0
+        etat = etat_vide()
+        if os.path.exists(self.chemin):
+            with open(self.chemin, "r") as f:
+                donnees = json.load(f)
+            # "journal_seq" : instantanés écrits avant l'introduction des revisions
+            revision = donnees.get("revision", donnees.get("journal_seq", 0))
+            etat = completer_etat(donnees)
+        nb = 0
+        if os.path.exists(self.chemin_journal):
+            with open(self.chemin_journal, "r") as f:
+                for ligne in f:
+                    try:
+                        evt = json.loads(ligne)
+                    except json.JSONDecodeError:
+                        # Dernière ligne tronquée par un arrêt brutal : ignorée
+                        break
+                    nb += 1
+                    # Événements déjà inclus dans l'instantané (compaction interrompue)
+                    if evt["seq"] <= revision:
+                        continue
+                    appliquer_evenement(etat, evt)
+                    revision = evt["seq"]
+        return etat, revision, nb
+
+    def charger(self):
+        etat, self.revision, self._nb_journal = self._lire()
+        return etat
+
+    def _ecrire_instantane(self, etat):
+        _ecrire_atomique(self.chemin, {**etat, "revision": self.revision})
+        open(self.chemin_journal, "w").close()
+        self._nb_journal = 0
+
+    def sauvegarder(self, etat):
+        """Écrit un instantané complet et vide le journal."""
+        if self.revision is None:
+            self.charger()
+        self.revision += 1
+        self._ecrire_instantane(etat)
+
+    def enregistrer(self, evt, etat):
+        if self.revision is None:
+            self.charger()
+        self.revision += 1
+        with open(self.chemin_journal, "a") as f:
+            f.write(json.dumps({"seq": self.revision, **evt}, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._nb_journal += 1
+        if self._nb_journal >= self.seuil_compaction:
+            # `etat` inclut déjà `evt` : l'instantané garde la même revision
+            self._ecrire_instantane(etat)
+
+    def compacter(self):
+        """Replie le journal dans l'instantané à partir du disque."""
+        etat, self.revision, _ = self._lire()
+        self._ecrire_instantane(etat)
+
+    def signature(self):
+        return _signature_fichiers(self.chemin, self.chemin_journal)
+
+    def fermer(self):
+        """Replie le journal dans l'instantané pour que le prochain chargement soit rapide."""
+        if os.path.exists(self.chemin_journal) and os.path.getsize(self.chemin_journal) > 0:
+            with verrou_fichier(self.chemin_verrou):
+                self.compacter()
+
+
+SCHEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS meta (cle TEXT PRIMARY KEY, valeur TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS classement (user TEXT PRIMARY KEY, points INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS completions (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    task TEXT NOT NULL,
+    date TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    validated INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_completions_user_task_date ON completions (user, task, date);
+CREATE INDEX IF NOT EXISTS idx_completions_date ON completions (date);
+CREATE INDEX IF NOT EXISTS idx_completions_timestamp ON completions (timestamp);
+CREATE TABLE IF NOT EXISTS attente_validation (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    task TEXT NOT NULL,
+    pts INTEGER NOT NULL,
+    ref TEXT
+);
+CREATE TABLE IF NOT EXISTS recompenses_achetees (
+    id INTEGER PRIMARY KEY,
+    recompense_id INTEGER NOT NULL,
+    nom TEXT NOT NULL,
+    date TEXT NOT NULL,
+    points_utilises INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS taches_personnalisees (id INTEGER PRIMARY KEY, donnees TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS cumuls (
+    periode TEXT NOT NULL,
+    cle TEXT NOT NULL,
+    user TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    PRIMARY KEY (periode, cle, user)
+);
+CREATE TABLE IF NOT EXISTS cles_recentes (id INTEGER PRIMARY KEY, cle TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS recompenses_personnalisees (
+    recompense_id INTEGER PRIMARY KEY,
+    ordre INTEGER NOT NULL,
+    donnees TEXT NOT NULL
+);
+"""
+
+
+class StockageSQLite:
+    """
+    Base SQLite (stdlib sqlite3, mode WAL) : une table par collection, chaque
+    événement devient quelques requêtes indexées au lieu d'une réécriture complète.
+    """
+
+    mode = "sqlite"
+
+    def __init__(self, chemin, chemin_base=None, migrer=True):
+        # `chemin` est le fichier JSON historique ; la base vit à côté par défaut
+        self.chemin_json = chemin
+        self.chemin = chemin_base or os.path.splitext(chemin)[0] + ".sqlite3"
+        self.chemin_verrou = os.path.splitext(self.chemin)[0] + ".lock"
+        self.revision = None
+        self._ecritures = 0
+        # Streamlit exécute les sessions dans des threads différents
+        self._verrou = threading.Lock()
+        self._connexion = None
+        if migrer and os.path.exists(self.chemin_json):
+            # Plusieurs processus peuvent ouvrir la base en même temps : un seul migre
+            with verrou_fichier(self.chemin_verrou):
+                if self._cnx.execute("SELECT COUNT(*) FROM meta").fetchone()[0] == 0:
+                    self.sauvegarder(StockageJSON(self.chemin_json).charger())
+        self._completer_cumuls()
+        self._completer_attente()
+
+    def _completer_cumuls(self):
+        """Remplit la table des cumuls d'une base créée avant elle (une seule fois)."""
+        cnx = self._cnx
+        if cnx.execute("SELECT 1 FROM meta WHERE cle = 'cumuls'").fetchone() is not None:
+            return
+        with verrou_fichier(self.chemin_verrou), self._verrou, cnx:
+            if cnx.execute("SELECT 1 FROM meta WHERE cle = 'revision'").fetchone() is None:
+                # Base neuve : les cumuls seront tenus à jour dès la première écriture
+                self._ecrire_meta(cnx, "cumuls", 1)
+            elif cnx.execute("SELECT 1 FROM meta WHERE cle = 'cumuls'").fetchone() is None:
+                # Même migration que completer_etat : missions d'ados et d'enfants non marquées
+                config = cnx.execute("SELECT valeur FROM meta WHERE cle = 'config'").fetchone()
+                parents = json.loads(config[0])["parents"] if config else CONFIG_DEFAUT["parents"]
+                cnx.execute(f"UPDATE completions SET validated = 0 WHERE validated IS NULL "
+                            f"AND user NOT IN ({', '.join('?' * len(parents))})", parents)
+                cnx.execute("DELETE FROM cumuls")
+                taches = [{"user": u, "date": d, "points": p} for u, d, p in
+                          cnx.execute("SELECT user, date, points FROM completions WHERE validated IS NULL OR validated = 1")]
+                self._inserer_cumuls(cnx, cumuls_depuis_historique(taches))
+                self._ecrire_meta(cnx, "cumuls", 1)
+
+    def _completer_attente(self):
+        """Ajoute la colonne ref (id de la mission en attente) à une base créée avant elle."""
+        cnx = self._cnx
+        if any(colonne[1] == "ref" for colonne in cnx.execute("PRAGMA table_info(attente_validation)")):
+            return
+        with verrou_fichier(self.chemin_verrou), self._verrou, cnx:
+            if any(colonne[1] == "ref" for colonne in cnx.execute("PRAGMA table_info(attente_validation)")):
+                return
+            cnx.execute("ALTER TABLE attente_validation ADD COLUMN ref TEXT")
+            lignes = cnx.execute("SELECT id, user, task FROM attente_validation ORDER BY id").fetchall()
+            attente = [{"user": user, "task": task} for _, user, task in lignes]
+            taches = [{"id": id_ligne, "user": u, "task": t, "timestamp": ts,
+                       **({} if validee is None else {"validated": False})}
+                      for id_ligne, u, t, ts, validee in
+                      cnx.execute("SELECT id, user, task, timestamp, validated FROM completions "
+                                  "WHERE validated IS NULL OR validated = 0 ORDER BY id")]
+            lier_attente(attente, taches)
+            cnx.executemany("UPDATE attente_validation SET ref = ? WHERE id = ?",
+                            [(item["id"], id_ligne) for item, (id_ligne, _, _) in zip(attente, lignes)])
+            cnx.executemany("UPDATE completions SET validated = 0 WHERE id = ?",
+                            [(tache["id"],) for tache in taches if "validated" in tache])
+
+    @property
+    def _cnx(self):
+        """Connexion ouverte à la demande (rouverte après fermer())."""
+        if self._connexion is None:
+            self._connexion = sqlite3.connect(self.chemin, check_same_thread=False)
+            self._connexion.execute("PRAGMA journal_mode=WAL")
+            self._connexion.execute("PRAGMA synchronous=NORMAL")
+            self._connexion.executescript(SCHEMA_SQLITE)
+        return self._connexion
+
+    def fermer(self):
+        """Reporte le WAL dans la base et ferme la connexion."""
+        with self._verrou:
+            if self._connexion is not None:
+                self._connexion.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self._connexion.close()
+                self._connexion = None
+
+    def signature(self):
+        # data_version change quand une autre connexion écrit ; nos propres écritures sont comptées à part
+        with self._verrou:
+            return self._cnx.execute("PRAGMA data_version").fetchone()[0], self._ecritures
+
+    # --- LECTURE ---
+    def charger(self):
+        with self._verrou:
+            cnx = self._cnx
+            meta = dict(cnx.execute("SELECT cle, valeur FROM meta"))
+            self.revision = json.loads(meta.get("revision", "0"))
+            etat = etat_vide()
+            if "points_foyer" in meta:
+                etat["points_foyer"] = json.loads(meta["points_foyer"])
+            if "config" in meta:
+                etat["config"] = json.loads(meta["config"])
+            etat["noms"] = json.loads(meta["noms"]) if "noms" in meta else noms_depuis_config(etat["config"])
+            if "archive_avant" in meta:
+                etat["archive_avant"] = json.loads(meta["archive_avant"])
+            etat["classement"] = dict(cnx.execute("SELECT user, points FROM classement ORDER BY rowid"))
+            for periode, cle, user, points in cnx.execute("SELECT periode, cle, user, points FROM cumuls"):
+                etat["cumuls"][periode].setdefault(cle, {})[user] = points
+            etat["taches_completees"] = [
+                _ligne_completion(*row) for row in
+                cnx.execute("SELECT task, user, date, points, timestamp, validated FROM completions ORDER BY id")
+            ]
+            etat["attente_validation"] = [
+                {"id": ref, "user": user, "task": task, "pts": pts} for ref, user, task, pts in
+                cnx.execute("SELECT ref, user, task, pts FROM attente_validation ORDER BY id")
+            ]
+            etat["recompenses_achetees"] = [
+                {"id": rid, "nom": nom, "date": date, "points_utilises": pts} for rid, nom, date, pts in
+                cnx.execute("SELECT recompense_id, nom, date, points_utilises FROM recompenses_achetees ORDER BY id")
+            ]
+            etat["taches_personnalisees"] = [
+                json.loads(d) for (d,) in cnx.execute("SELECT donnees FROM taches_personnalisees ORDER BY id")
+            ]
+            etat["cles_recentes"] = [cle for (cle,) in cnx.execute("SELECT cle FROM cles_recentes ORDER BY id")]
+            etat["recompenses_personnalisees"] = [
+                json.loads(d) for (d,) in cnx.execute("SELECT donnees FROM recompenses_personnalisees ORDER BY ordre")
+            ]
+        return etat
+
+    def historique(self, user=None, task=None, debut=None, fin=None):
+        clauses, params = [], []
+        for colonne, op, valeur in (("user", "=", user), ("task", "=", task), ("date", ">=", debut), ("date", "<=", fin)):
+            if valeur is not None:
+                clauses.append(f"{colonne} {op} ?")
+                params.append(valeur)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._verrou:
+            rows = self._cnx.execute(
+                f"SELECT task, user, date, points, timestamp, validated FROM completions{where} ORDER BY id", params
+            ).fetchall()
+        return [_ligne_completion(*row) for row in rows]
+
+    # --- ÉCRITURE ---
+    def sauvegarder(self, etat):
+        """Remplace tout le contenu de la base par `etat` (migration / import)."""
+        if self.revision is None:
+            self.charger()
+        with self._verrou, self._cnx as cnx:
+            self._ecritures += 1
+            self.revision += 1
+            for table in ("meta", "classement", "completions", "attente_validation", "recompenses_achetees",
+                          "taches_personnalisees", "recompenses_personnalisees", "cumuls", "cles_recentes"):
+                cnx.execute(f"DELETE FROM {table}")
+            self._ecrire_meta(cnx, "revision", self.revision)
+            self._ecrire_meta(cnx, "points_foyer", etat["points_foyer"])
+            self._ecrire_meta(cnx, "config", etat["config"])
+            self._ecrire_meta(cnx, "noms", etat["noms"])
+            self._ecrire_meta(cnx, "archive_avant", etat["archive_avant"])
+            self._ecrire_meta(cnx, "cumuls", 1)
+            self._inserer_cumuls(cnx, etat["cumuls"])
+            cnx.executemany("INSERT INTO classement (user, points) VALUES (?, ?)", etat["classement"].items())
+            cnx.executemany(
+                "INSERT INTO completions (user, task, date, points, timestamp, validated) VALUES (?, ?, ?, ?, ?, ?)",
+                [(t["user"], t["task"], t["date"], t["points"], t["timestamp"], _valide_sql(t)) for t in etat["taches_completees"]]
+            )
+            cnx.executemany("INSERT INTO attente_validation (ref, user, task, pts) VALUES (?, ?, ?, ?)",
+                            [(a["id"], a["user"], a["task"], a["pts"]) for a in etat["attente_validation"]])
+            cnx.executemany(
+                "INSERT INTO recompenses_achetees (recompense_id, nom, date, points_utilises) VALUES (?, ?, ?, ?)",
+                [(r["id"], r["nom"], r["date"], r["points_utilises"]) for r in etat["recompenses_achetees"]]
+            )
+            cnx.executemany("INSERT INTO taches_personnalisees (donnees) VALUES (?)",
+                            [(json.dumps(t),) for t in etat["taches_personnalisees"]])
+            cnx.executemany("INSERT INTO cles_recentes (cle) VALUES (?)", [(cle,) for cle in etat["cles_recentes"]])
+            cnx.executemany("INSERT INTO recompenses_personnalisees (recompense_id, ordre, donnees) VALUES (?, ?, ?)",
+                            [(r["id"], i, json.dumps(r)) for i, r in enumerate(etat["recompenses_personnalisees"])])
+
+    def enregistrer(self, evt, etat):
+        """
+        Traduit l'événement (déjà appliqué à `etat`) en quelques requêtes SQL ;
+        les petites valeurs recalculées (compteurs, configuration) sont lues dans `etat`.
+        """
+        if self.revision is None:
+            self.charger()
+        with self._verrou, self._cnx as cnx:
+            self._ecritures += 1
+            self.revision += 1
+            self._ecrire_meta(cnx, "revision", self.revision)
+            getattr(self, f"_sql_{evt['type']}")(cnx, evt, etat)
+            if "cle" in evt:
+                # Même transaction que l'action : la clé n'existe que si l'action a été écrite
+                cnx.execute("INSERT INTO cles_recentes (cle) VALUES (?)", (evt["cle"],))
+                cnx.execute("DELETE FROM cles_recentes WHERE id <= (SELECT MAX(id) FROM cles_recentes) - ?", (CLES_RETENUES,))
+
+    @staticmethod
+    def _ecrire_meta(cnx, cle, valeur):
+        cnx.execute("INSERT OR REPLACE INTO meta (cle, valeur) VALUES (?, ?)", (cle, json.dumps(valeur)))
+
+    @staticmethod
+    def _inserer_cumuls(cnx, cumuls):
+        cnx.executemany("INSERT INTO cumuls (periode, cle, user, points) VALUES (?, ?, ?, ?)",
+                        [(periode, cle, user, points) for periode, par_cle in cumuls.items()
+                         for cle, par_user in par_cle.items() for user, points in par_user.items()])
+
+    def _ecrire_solde(self, cnx, etat, user=None, jour=None):
+        self._ecrire_meta(cnx, "points_foyer", etat["points_foyer"])
+        if user is not None:
+            cnx.execute("INSERT OR REPLACE INTO classement (user, points) VALUES (?, ?)",
+                        (user, etat["classement"][user]))
+        if jour is not None:
+            # Trois lignes (jour, semaine, mois) recopiées depuis l'état déjà mis à jour
+            cnx.executemany("INSERT OR REPLACE INTO cumuls (periode, cle, user, points) VALUES (?, ?, ?, ?)",
+                            [(periode, cle, user, etat["cumuls"][periode][cle][user]) for periode, cle in cles_cumuls(jour)])
+
+    @staticmethod
+    def _id_attente(cnx, index):
+        row = cnx.execute("SELECT id, user, task FROM attente_validation ORDER BY id LIMIT 1 OFFSET ?", (index,)).fetchone()
+        if row is None:
+            raise IndexError(f"Aucune mission en attente à la position {index}")
+        return row
+
+    @staticmethod
+    def _retirer_attente(cnx, ids):
+        """Supprime les missions en attente d'ids donnés ; retourne [(ref, user)]."""
+        marques = ", ".join("?" * len(ids))
+        lignes = cnx.execute(f"SELECT ref, user FROM attente_validation WHERE ref IN ({marques})", ids).fetchall()
+        cnx.execute(f"DELETE FROM attente_validation WHERE ref IN ({marques})", ids)
+        return lignes
+
+    def _sql_tache_completee(self, cnx, evt, etat):
+        en_attente = bool(evt.get("en_attente"))
+        if en_attente:
+            cnx.execute("INSERT INTO attente_validation (ref, user, task, pts) VALUES (?, ?, ?, ?)",
+                        (evt["ts"], evt["user"], evt["task"], evt["points"]))
+        else:
+            self._ecrire_solde(cnx, etat, evt["user"], evt["date"])
+        cnx.execute(
+            "INSERT INTO completions (user, task, date, points, timestamp, validated) VALUES (?, ?, ?, ?, ?, ?)",
+            (evt["user"], evt["task"], evt["date"], evt["points"], evt["ts"], 0 if en_attente else None)
+        )
+
+    def _sql_validation(self, cnx, evt, etat):
+        if "ids" in evt:
+            # evt["ids"] ne contient plus que les missions effectivement retirées par le réducteur
+            lignes = self._retirer_attente(cnx, evt["ids"])
+            # Cumuls crédités au jour de la ligne d'historique de chaque mission, comme le réducteur
+            jours = set()
+            for ref, user in lignes:
+                ligne = cnx.execute("SELECT date FROM completions WHERE timestamp = ? AND user = ? AND validated = 0",
+                                    (ref, user)).fetchone()
+                jours.add((user, ligne[0] if ligne else evt["date"]))
+            for user, jour in jours:
+                self._ecrire_solde(cnx, etat, user, jour)
+            cnx.executemany("UPDATE completions SET validated = 1 WHERE timestamp = ? AND user = ? AND validated = 0",
+                            lignes)
+            return
+        id_attente, user, task = self._id_attente(cnx, evt["index"])
+        cnx.execute("DELETE FROM attente_validation WHERE id = ?", (id_attente,))
+        jour = evt["date"]
+        marquees = cnx.execute("UPDATE completions SET validated = 1 WHERE user = ? AND task = ? AND date = ?",
+                               (user, task, evt["date"])).rowcount
+        if not marquees:
+            # Même règle que evenements._validation : la plus récente encore en attente
+            ligne = cnx.execute("SELECT id, date FROM completions WHERE user = ? AND task = ? AND validated = 0 "
+                                "AND date < ? ORDER BY date DESC, id DESC LIMIT 1", (user, task, evt["date"])).fetchone()
+            if ligne is not None:
+                cnx.execute("UPDATE completions SET validated = 1 WHERE id = ?", (ligne[0],))
+                jour = ligne[1]
+        self._ecrire_solde(cnx, etat, user, jour)
+
+    def _sql_refus(self, cnx, evt, etat):
+        if "ids" in evt:
+            self._retirer_attente(cnx, evt["ids"])
+            return
+        id_attente = self._id_attente(cnx, evt["index"])[0]
+        cnx.execute("DELETE FROM attente_validation WHERE id = ?", (id_attente,))
+
+    def _sql_achat(self, cnx, evt, etat):
+        self._ecrire_solde(cnx, etat)
+        cnx.execute("INSERT INTO recompenses_achetees (recompense_id, nom, date, points_utilises) VALUES (?, ?, ?, ?)",
+                    (evt["id"], evt["nom"], evt["date"], evt["points"]))
+
+    def _sql_renommage(self, cnx, evt, etat):
+        self._ecrire_meta(cnx, "noms", etat["noms"])
+        if "id" in evt:
+            return
+        self._ecrire_meta(cnx, "config", etat["config"])
+        for table in ("classement", "attente_validation", "completions"):
+            cnx.execute(f"UPDATE {table} SET user = ? WHERE user = ?", (evt["nouveau"], evt["ancien"]))
+        cnx.execute("UPDATE OR REPLACE cumuls SET user = ? WHERE user = ?", (evt["nouveau"], evt["ancien"]))
+
+    def _sql_reconciliation(self, cnx, evt, etat):
+        self._ecrire_meta(cnx, "points_foyer", etat["points_foyer"])
+        cnx.execute("DELETE FROM classement")
+        cnx.executemany("INSERT INTO classement (user, points) VALUES (?, ?)", etat["classement"].items())
+        if "cumuls" in evt:
+            cnx.execute("DELETE FROM cumuls")
+            self._inserer_cumuls(cnx, etat["cumuls"])
+
+    def _sql_config(self, cnx, evt, etat):
+        self._ecrire_meta(cnx, "config", etat["config"])
+        if evt.get("retire") is not None:
+            cnx.execute("DELETE FROM classement WHERE user = ?", (evt["retire"],))
+
+    def _sql_membre_ajoute(self, cnx, evt, etat):
+        self._ecrire_meta(cnx, "config", etat["config"])
+        self._ecrire_meta(cnx, "noms", etat["noms"])
+
+    def _sql_membre_supprime(self, cnx, evt, etat):
+        self._ecrire_meta(cnx, "config", etat["config"])
+        cnx.execute("DELETE FROM classement WHERE user = ?", (evt.get("id", evt.get("nom")),))
+
+    def _sql_membre_change_role(self, cnx, evt, etat):
+        self._ecrire_meta(cnx, "config", etat["config"])
+
+    def _sql_tache_creee(self, cnx, evt, etat):
+        cnx.execute("INSERT INTO taches_personnalisees (donnees) VALUES (?)", (json.dumps(evt["tache"]),))
+
+    def _sql_tache_supprimee(self, cnx, evt, etat):
+        cnx.execute("DELETE FROM taches_personnalisees WHERE id = "
+                    "(SELECT id FROM taches_personnalisees ORDER BY id LIMIT 1 OFFSET ?)", (evt["index"],))
+
+    def _sql_recompense_enregistree(self, cnx, evt, etat):
+        recompense = evt["recompense"]
+        existante = cnx.execute("SELECT ordre FROM recompenses_personnalisees WHERE recompense_id = ?",
+                                (recompense["id"],)).fetchone()
+        if existante:
+            cnx.execute("UPDATE recompenses_personnalisees SET donnees = ? WHERE recompense_id = ?",
+                        (json.dumps(recompense), recompense["id"]))
+        else:
+            cnx.execute("INSERT INTO recompenses_personnalisees (recompense_id, ordre, donnees) VALUES "
+                        "(?, (SELECT COALESCE(MAX(ordre), -1) + 1 FROM recompenses_personnalisees), ?)",
+                        (recompense["id"], json.dumps(recompense)))
+
+    def _sql_recompense_supprimee(self, cnx, evt, etat):
+        cnx.execute("DELETE FROM recompenses_personnalisees WHERE recompense_id = ?", (evt["id"],))
+
+    def _sql_archivage(self, cnx, evt, etat):
+        if "lignes" in evt:
+            cnx.executemany("DELETE FROM completions WHERE timestamp = ? AND user = ? AND task = ?", evt["lignes"])
+        else:
+            # Même règle que evenements.est_archivable : les missions en attente restent
+            cnx.execute("DELETE FROM completions WHERE date < ? AND (validated IS NULL OR validated = 1)",
+                        (evt["avant"],))
+        self._ecrire_meta(cnx, "archive_avant", evt["avant"])
+
+
+def _valide_sql(tache):
+    """Encode le champ optionnel `validated` (NULL = absent, comme dans les anciens fichiers)."""
+    if "validated" not in tache:
+        return None
+    return 1 if tache["validated"] else 0
+
+
+def _ligne_completion(task, user, date, points, timestamp, validated):
+    ligne = {"task": task, "user": user, "date": date, "points": points, "timestamp": timestamp}
+    if validated is not None:
+        ligne["validated"] = bool(validated)
+    return ligne
+
+
+def migrer_json_vers_sqlite(chemin_json, chemin_sqlite=None):
+    """Copie intégralement data_foyer.json dans une base SQLite (écrase son contenu)."""
+    etat = StockageJSON(chemin_json).charger()
+    base = StockageSQLite(chemin_json, chemin_sqlite, migrer=False)
+    base.sauvegarder(etat)
+    base.fermer()
+    return len(etat["taches_completees"])
+
+
+class StockageEnCache:
+    """
+    Cache de processus et point d'écriture unique d'un foyer.
+
+    charger() ne relit le disque que si la signature a changé depuis le dernier
+    chargement ; l'état retourné est partagé entre toutes les sessions et ne doit
+    pas être modifié (passer par copie() pour une copie de session).
+
+    appliquer() est une écriture optimiste : la session fournit la revision de sa
+    copie ; si le foyer a changé entre-temps (autre appareil, autre processus),
+    l'événement est rejoué sur l'état le plus récent au lieu d'écraser le fichier.
+    Il n'expose pas sauvegarder() : toute écriture passe par appliquer().
+    """
+
+    def __init__(self, stockage):
+        self.stockage = stockage
+        self.mode = stockage.mode
+        self._verrou = threading.Lock()
+        self._etat = None
+        self._signature = None
+        self._index_jours = None
+
+    def _a_jour(self):
+        """Recharge l'état si le disque a changé. À appeler sous self._verrou."""
+        signature = self.stockage.signature()
+        if self._etat is None or signature != self._signature:
+            self._etat = self.stockage.charger()
+            self._signature = signature
+            self._index_jours = None
+        return self._etat
+
+    def _jours(self):
+        """Index jour -> complétions de l'état en cache, construit au premier besoin. Sous self._verrou."""
+        etat = self._a_jour()
+        if self._index_jours is None:
+            self._index_jours = IndexJours(etat["taches_completees"])
+        return self._index_jours
+
+    @profil.chronometre("stockage.charger (état partagé)")
+    def charger(self):
+        with self._verrou:
+            return self._a_jour()
+
+    @property
+    def revision(self):
+        """Revision courante du foyer sur disque (un simple stat si rien n'a changé)."""
+        with self._verrou:
+            self._a_jour()
+            return self.stockage.revision
+
+    @profil.chronometre("stockage.copie (copie de session)")
+    def copie(self, cles):
+        """Retourne (copie profonde des clés demandées, revision) pour une session."""
+        with self._verrou:
+            etat = self._a_jour()
+            return {cle: copy.deepcopy(etat[cle]) for cle in cles}, self.stockage.revision
+
+    @profil.chronometre("stockage.appliquer (écriture)")
+    def appliquer(self, evt, revision_attendue=None):
+        """
+        Applique et persiste `evt` sur l'état le plus récent du foyer.
+        Retourne (nouvelle revision, conflit) où conflit=True signifie que la copie
+        de la session était périmée : elle doit être rafraîchie plutôt que mise à jour.
+        Lève evenements.EvenementInvalide si l'événement ne s'applique plus.
+        """
+        # Verrou tenu le temps d'une écriture seulement, jamais pendant tout un rerun
+        with self._verrou, verrou_fichier(self.stockage.chemin_verrou):
+            etat = self._a_jour()
+            conflit = revision_attendue is not None and revision_attendue != self.stockage.revision
+            try:
+                appliquer_evenement(etat, evt)
+                self.stockage.enregistrer(evt, etat)
+                # Les autres événements modifient les lignes sur place, déjà indexées
+                if self._index_jours is not None and evt["type"] == "tache_completee":
+                    self._index_jours.ajouter(etat["taches_completees"][-1])
+                elif evt["type"] == "archivage":
+                    self._index_jours = None
+            except EvenementInvalide:
+                # Refusé avant toute modification (doublon, solde insuffisant...) : le cache reste valable
+                raise
+            except BaseException:
+                # Cache potentiellement différent du disque : relu au prochain accès
+                self._etat = None
+                raise
+            self._signature = self.stockage.signature()
+            return self.stockage.revision, conflit
+
+    def historique(self, user=None, task=None, debut=None, fin=None):
+        """Tâches complétées filtrées ; une période ne lit que ses propres jours (index SQL ou IndexJours)."""
+        if self.mode == "sqlite":
+            return self.stockage.historique(user, task, debut, fin)
+        with self._verrou:
+            if debut is None and fin is None:
+                return filtrer_historique(self._a_jour()["taches_completees"], user, task)
+            return filtrer_historique(self._jours().lignes(debut or "", fin or "9999-12-31"), user, task)
+
+    def signature(self):
+        return self.stockage.signature()
+
+    @property
+    def chemin_donnees(self):
+        """Fichier JSON de référence du foyer (les archives et sidecars vivent à côté)."""
+        return self.stockage.chemin_json
+
+    def octets(self):
+        """Taille du foyer sur disque : instantané JSON, journal ou base SQLite (archives non comprises)."""
+        chemins = {self.stockage.chemin, self.stockage.chemin_json, getattr(self.stockage, "chemin_journal", None)}
+        if self.mode == "sqlite":
+            chemins.add(self.stockage.chemin + "-wal")
+        return sum(os.path.getsize(chemin) for chemin in chemins if chemin and os.path.exists(chemin))
+
+    def fermer(self):
+        """Vide le stockage sur disque et libère l'état en mémoire."""
+        with self._verrou:
+            self.stockage.fermer()
+            self._etat = None
+            self._signature = None
+            self._index_jours = None
+
+
+MODES = {
+    "json": StockageJSON,
+    "journal": StockageJournal,
+    "sqlite": StockageSQLite,
+}
+
+
+def ouvrir_stockage(chemin, mode=None, cache=True):
+    """Ouvre le stockage selon le mode demandé (ou FOYER_STOCKAGE), avec cache de processus par défaut."""
+    mode = mode or os.environ.get("FOYER_STOCKAGE", "json")
+    try:
+        classe = MODES[mode]
+    except KeyError:
+        raise ValueError(f"Mode de stockage inconnu : {mode!r} (attendu : {', '.join(MODES)})")
+    stockage = classe(chemin)
+    return StockageEnCache(stockage) if cache else stockage
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "migrer":
+        nb = migrer_json_vers_sqlite(*sys.argv[2:4])
+        print(f"Migration terminée : {nb} tâches complétées copiées.")
+    else:
+        print("Usage : python stockage.py migrer data_foyer.json [data_foyer.sqlite3]")
+        sys.exit(1)
@@ -0,0 +1,82 @@
+"""
+Foyers de test : un fichier data_foyer.json neuf par test, ouvert dans chaque
+mode de stockage (json, journal, sqlite) comme le fait l'application.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evenements import nouvel_evenement  # noqa: E402
+from stockage import MODES, StockageJSON, etat_vide, ouvrir_stockage  # noqa: E402
+
+PARENT, ADO, ENFANT = "p0000001", "a0000001", "e0000001"
+
+
+def etat_depart(points=0):
+    """Foyer d'un parent, d'un ado et d'un enfant, avec `points` dans le trésor."""
+    etat = etat_vide()
+    etat["config"] = {"parents": [PARENT], "ados": [ADO], "enfants": [ENFANT]}
+    etat["noms"] = {PARENT: "Parent", ADO: "Ado", ENFANT: "Enfant"}
+    etat["points_foyer"] = points
+    return etat
+
+
+def completion(user, jour, task="🍽️ Mettre la table", points=10, en_attente=False, **donnees):
+    """Événement « mission terminée » daté de `jour`, horodaté dans ce même jour."""
+    evt = nouvel_evenement("tache_completee", task=task, user=user, points=points, date=jour,
+                           en_attente=en_attente, **donnees)
+    evt["ts"] = jour + evt["ts"][10:]
+    return evt
+
+
+@pytest.fixture(params=list(MODES))
+def mode(request):
+    return request.param
+
+
+@pytest.fixture
+def chemin(tmp_path):
+    chemin = str(tmp_path / "data_foyer.json")
+    StockageJSON(chemin).sauvegarder(etat_depart())
+    return chemin
+
+
+@pytest.fixture
+def foyer(chemin, mode):
+    """Stockage en cache du foyer de test, fermé en fin de test."""
+    stockage = ouvrir_stockage(chemin, mode)
+    yield stockage
+    stockage.fermer()
+
+
+def relire(chemin, mode):
+    """État du foyer relu sur disque, sans cache."""
+    stockage = ouvrir_stockage(chemin, mode, cache=False)
+    try:
+        return stockage.charger()
+    finally:
+        stockage.fermer()
+
+
+def fichier_premiere_version(chemin, taches, attente=(), points=0, classement=None, **champs):
+    """
+    Écrit un data_foyer.json de la première version : membres désignés par leur nom, ni cumuls
+    ni ids de file, missions d'ados et d'enfants sans clé "validated" tant qu'elles attendent.
+    `champs` ajoute des clés de versions plus récentes (cumuls, noms...).
+    """
+    donnees = {**champs, "points_foyer": points, "classement": classement or {}, "attente_validation": list(attente),
+               "taches_completees": taches, "taches_personnalisees": [],
+               "config": {"parents": ["Papa"], "ados": [], "enfants": ["Léo"]},
+               "recompenses_achetees": [], "recompenses_personnalisees": []}
+    with open(chemin, "w") as f:
+        json.dump(donnees, f)
+
+
+def ligne(user, jour, task, points, **cles):
+    """Ligne d'historique telle que l'écrivait la première version."""
+    return {"task": task, "user": user, "date": jour, "points": points, "timestamp": f"{jour}T18:00:00.{points:06d}",
+            **cles}
@@ -0,0 +1,87 @@
+"""Archives mensuelles : l'historique relu (chaud + archives) est celui d'avant l'archivage."""
+import os
+import threading
+
+import archives
+from archives import archiver, dossier_archives, lire_historique, mois_archives
+from conftest import ENFANT, PARENT, completion, relire
+from evenements import nouvel_evenement
+
+JOURS = ["2025-11-03", "2025-11-28", "2025-12-15", "2026-01-02", "2026-02-10", "2026-03-01"]
+
+
+def test_aller_retour_archives(foyer, chemin, mode):
+    for i, jour in enumerate(JOURS):
+        foyer.appliquer(completion(PARENT, jour, points=10 + i))
+    # Toujours en attente : reste dans le stockage chaud quel que soit son mois
+    foyer.appliquer(completion(ENFANT, "2025-12-20", en_attente=True))
+    avant = foyer.historique()
+
+    assert archiver(foyer, limite="2026-02-01") == 4
+    assert mois_archives(dossier_archives(chemin)) == ["2025-11", "2025-12", "2026-01"]
+
+    etat = relire(chemin, mode)
+    assert etat["archive_avant"] == "2026-02-01"
+    assert sorted(t["date"] for t in etat["taches_completees"]) == ["2025-12-20", "2026-02-10", "2026-03-01"]
+    relu = lire_historique(etat["taches_completees"], foyer.chemin_donnees, etat["archive_avant"],
+                           "2025-01-01", "2026-12-31")
+    cle = lambda t: (t["date"], t["timestamp"])  # noqa: E731
+    assert sorted(relu, key=cle) == sorted(avant, key=cle)
+
+
+def test_archivage_rejoue_sans_doublon(foyer, chemin, mode):
+    for jour in JOURS:
+        foyer.appliquer(completion(PARENT, jour))
+    archiver(foyer, limite="2026-02-01")
+    taille = os.path.getsize(os.path.join(dossier_archives(chemin), "2025-11.jsonl.gz"))
+    # Arrêt entre l'écriture des archives et l'événement : le second passage ne duplique rien
+    assert archiver(foyer, limite="2026-02-01") == 0
+    relu = lire_historique(relire(chemin, mode)["taches_completees"], chemin, "2026-02-01", "2025-01-01", "2026-12-31")
+    assert len(relu) == len(JOURS)
+    assert os.path.getsize(os.path.join(dossier_archives(chemin), "2025-11.jsonl.gz")) == taille
+
+
+def test_validation_pendant_archivage(foyer, chemin, mode, monkeypatch):
+    foyer.appliquer(completion(PARENT, "2025-12-01"))
+    attente = completion(ENFANT, "2025-12-20", points=15, en_attente=True)
+    foyer.appliquer(attente)
+    ecrire_mois = archives._ecrire_mois
+
+    def ecrire_puis_valider(*args):
+        # Validée après la lecture de l'état, avant l'événement d'archivage
+        ecrire_mois(*args)
+        if foyer.charger()["attente_validation"]:
+            foyer.appliquer(nouvel_evenement("validation", ids=[attente["ts"]], date="2026-03-02"))
+
+    monkeypatch.setattr(archives, "_ecrire_mois", ecrire_puis_valider)
+    assert archiver(foyer, limite="2026-02-01") == 1
+    etat = relire(chemin, mode)
+    assert [(t["user"], t["validated"]) for t in etat["taches_completees"]] == [(ENFANT, True)]
+    relu = lire_historique(etat["taches_completees"], chemin, etat["archive_avant"], "2025-01-01", "2026-12-31")
+    assert sorted(t["points"] for t in relu) == [10, 15]
+
+
+def test_archivages_concurrents(foyer, chemin, mode):
+    # Sessions Streamlit simultanées : un seul archivage copie les lignes, sans fichier temporaire partagé
+    for i, jour in enumerate(JOURS):
+        foyer.appliquer(completion(PARENT, jour, points=10 + i))
+    archivees, erreurs = [], []
+
+    def lancer():
+        try:
+            archivees.append(archiver(foyer, limite="2026-02-01"))
+        except Exception as erreur:  # noqa: BLE001
+            erreurs.append(erreur)
+
+    fils = [threading.Thread(target=lancer) for _ in range(6)]
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+    assert not erreurs
+    assert sorted(archivees) == [0] * 5 + [4]
+    dossier = dossier_archives(chemin)
+    assert not [nom for nom in os.listdir(dossier) if nom.endswith(".tmp")]
+    etat = relire(chemin, mode)
+    assert len(lire_historique(etat["taches_completees"], chemin, etat["archive_avant"],
+                               "2025-01-01", "2026-12-31")) == len(JOURS)
@@ -0,0 +1,55 @@
+"""Cumuls par jour, semaine et mois tenus par les réducteurs : égaux à leur reconstruction depuis l'historique."""
+from conftest import ADO, ENFANT, PARENT, completion, fichier_premiere_version, ligne, relire
+from evenements import cumuls_depuis_historique, nouvel_evenement
+
+
+def test_cumuls_egaux_a_la_reconstruction(foyer, chemin, mode):
+    foyer.appliquer(completion(PARENT, "2026-03-01", points=20))
+    foyer.appliquer(completion(ADO, "2026-03-02", points=15))
+    attente = [completion(ENFANT, "2026-03-02", task=f"Mission {i}", en_attente=True) for i in range(3)]
+    for evt in attente:
+        foyer.appliquer(evt)
+    foyer.appliquer(nouvel_evenement("validation", ids=[attente[0]["ts"], attente[1]["ts"]], date="2026-03-02"))
+    foyer.appliquer(nouvel_evenement("refus", ids=[attente[2]["ts"]]))
+
+    etat = foyer.charger()
+    assert etat["cumuls"] == cumuls_depuis_historique(etat["taches_completees"])
+    relu = relire(chemin, mode)
+    assert relu["cumuls"] == cumuls_depuis_historique(relu["taches_completees"])
+    assert relu["cumuls"]["jour"]["2026-03-02"] == {ADO: 15, ENFANT: 20}
+
+
+def test_validation_le_lendemain(foyer, chemin, mode):
+    # Envoyée à 23 h 59, validée après minuit : les points restent au jour, à la semaine et au mois de l'envoi
+    attente = completion(ENFANT, "2026-03-31", points=10, en_attente=True)
+    foyer.appliquer(attente)
+    foyer.appliquer(nouvel_evenement("validation", ids=[attente["ts"]], date="2026-04-01"))
+
+    for etat in (foyer.charger(), relire(chemin, mode)):
+        assert etat["cumuls"] == cumuls_depuis_historique(etat["taches_completees"])
+        assert etat["cumuls"]["mois"] == {"2026-03": {ENFANT: 10}}
+
+
+def test_validation_par_position_le_lendemain(foyer, chemin, mode):
+    # Anciens journaux : la validation cite la position dans la file, le membre et la mission
+    for jour in ("2026-03-29", "2026-03-31"):
+        foyer.appliquer(completion(ENFANT, jour, points=10, en_attente=True))
+    for _ in range(2):
+        foyer.appliquer(nouvel_evenement("validation", index=0, user=ENFANT, task="🍽️ Mettre la table",
+                                         date="2026-04-01"))
+
+    for etat in (foyer.charger(), relire(chemin, mode)):
+        assert etat["cumuls"] == cumuls_depuis_historique(etat["taches_completees"])
+        assert etat["cumuls"]["jour"] == {"2026-03-29": {ENFANT: 10}, "2026-03-31": {ENFANT: 10}}
+
+
+def test_cumuls_fichier_premiere_version(chemin, mode):
+    # Cumuls construits au premier chargement : ni la mission en attente ni la refusée n'y comptent
+    fichier_premiere_version(chemin, [ligne("Papa", "2026-03-02", "Courses", 20),
+                                      ligne("Léo", "2026-03-02", "Ranger", 50),
+                                      ligne("Léo", "2026-03-03", "Vaisselle", 10),
+                                      ligne("Léo", "2026-03-03", "Lit", 5, validated=True)],
+                             attente=[{"user": "Léo", "task": "Vaisselle", "pts": 10}])
+    etat = relire(chemin, mode)
+    assert etat["cumuls"]["semaine"] == {"2026-S10": {"Papa": 20, "Léo": 5}}
+    assert etat["cumuls"]["mois"] == {"2026-03": {"Papa": 20, "Léo": 5}}
@@ -0,0 +1,49 @@
+"""Foyers hébergés : seuls les foyers créés s'ouvrent, chacun avec son propre code parent."""
+import os
+
+import pytest
+
+from foyers import (FOYER_DEFAUT, FoyerInconnu, RegistreFoyers, chemin_acces, chemin_foyer, creer_foyer,
+                    definir_code_parent, verifier_code_parent)
+
+
+def test_foyer_inconnu_refuse_sans_rien_creer(tmp_path):
+    registre = RegistreFoyers(str(tmp_path))
+    with pytest.raises(FoyerInconnu):
+        registre.ouvrir("dupont")
+    assert os.listdir(tmp_path) == []
+    with pytest.raises(ValueError):
+        registre.ouvrir("../dupont")
+
+
+def test_foyer_cree_puis_ouvert(tmp_path):
+    creer_foyer("dupont", "4821", str(tmp_path))
+    registre = RegistreFoyers(str(tmp_path))
+    assert registre.ouvrir("dupont").charger()["points_foyer"] == 0
+    registre.fermer_tout()
+    with pytest.raises(ValueError):
+        creer_foyer("dupont", "0000", str(tmp_path))
+
+
+def test_code_parent_par_foyer(tmp_path):
+    dupont = creer_foyer("dupont", "4821", str(tmp_path))
+    martin = creer_foyer("martin", "7390", str(tmp_path))
+    assert verifier_code_parent(dupont, "4821")
+    assert not verifier_code_parent(dupont, "7390")
+    assert not verifier_code_parent(martin, "4821")
+    assert not verifier_code_parent(dupont, "1234")
+    with open(chemin_acces(dupont)) as f:
+        assert "4821" not in f.read()
+
+
+def test_foyer_sans_code_enregistre(tmp_path):
+    # Dossier créé par une version antérieure : aucun code n'ouvre l'Espace Parents
+    chemin = chemin_foyer("ancien", str(tmp_path))
+    os.makedirs(os.path.dirname(chemin))
+    assert not verifier_code_parent(chemin, "1234")
+    # Le foyer par défaut garde l'ancien code commun jusqu'à ce qu'on lui en donne un
+    defaut = str(tmp_path / chemin_foyer(FOYER_DEFAUT))
+    assert verifier_code_parent(defaut, "1234", defaut=True)
+    definir_code_parent(defaut, "5555")
+    assert not verifier_code_parent(defaut, "1234", defaut=True)
+    assert verifier_code_parent(defaut, "5555", defaut=True)
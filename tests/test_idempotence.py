@@ -0,0 +1,56 @@
+"""Double appui : une action rejouée avec la même clé d'idempotence ne compte qu'une fois."""
+import threading
+
+import pytest
+
+from conftest import ENFANT, PARENT, completion, relire
+from evenements import EvenementDuplique, EvenementInvalide, nouvel_evenement
+
+PETIT_CADEAU = {"id": 4, "nom": "🎁 Petit Cadeau", "points": 100}
+
+
+def achat(cle, date="2026-03-02"):
+    return nouvel_evenement("achat", **PETIT_CADEAU, date=date, unique=True, delai_jours=0, cle=cle)
+
+
+def test_double_appui_mission(foyer, chemin, mode):
+    evt = completion(ENFANT, "2026-03-02", en_attente=True, cle="cle-mission")
+    foyer.appliquer(dict(evt))
+    with pytest.raises(EvenementDuplique):
+        foyer.appliquer(dict(evt))
+    etat = relire(chemin, mode)
+    assert len(etat["taches_completees"]) == 1
+    assert len(etat["attente_validation"]) == 1
+
+
+def test_double_appui_achat(foyer, chemin, mode):
+    foyer.appliquer(completion(PARENT, "2026-03-01", points=150))
+    foyer.appliquer(achat("cle-achat"))
+    with pytest.raises(EvenementDuplique):
+        foyer.appliquer(achat("cle-achat"))
+    etat = relire(chemin, mode)
+    assert etat["points_foyer"] == 50
+    assert len(etat["recompenses_achetees"]) == 1
+
+
+def test_achats_concurrents_recompense_unique(foyer, chemin, mode):
+    # Clés différentes (deux appareils) : la récompense unique n'est obtenue qu'une fois
+    foyer.appliquer(completion(PARENT, "2026-03-01", points=300))
+    issues = []
+
+    def acheter(cle):
+        try:
+            foyer.appliquer(achat(cle))
+            issues.append("ok")
+        except EvenementInvalide:
+            issues.append("refus")
+
+    fils = [threading.Thread(target=acheter, args=(f"cle-{i}",)) for i in range(8)]
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+    assert sorted(issues) == ["ok"] + ["refus"] * 7
+    etat = relire(chemin, mode)
+    assert etat["points_foyer"] == 200
+    assert len(etat["recompenses_achetees"]) == 1
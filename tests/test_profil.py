@@ -0,0 +1,20 @@
+"""Profil des reruns (FOYER_PROFIL=1) : une version de Streamlit sans le point d'accroche des deltas le coupe."""
+import pytest
+
+import profil
+
+
+class ContexteSansEnqueue:
+    """Contexte de script d'une version de Streamlit qui n'a plus ScriptRunContext._enqueue."""
+
+
+def test_profil_coupe_sans_enqueue(monkeypatch):
+    monkeypatch.setattr(profil, "ACTIF", True)
+    with pytest.warns(RuntimeWarning, match="_enqueue"):
+        profil.debut(ContexteSansEnqueue(), lambda: {"octets": 0})
+    assert not profil.ACTIF
+    with profil.mesure("page"):
+        pass
+    assert profil.unite_relancee(ContexteSansEnqueue(), 1, dict) is False
+    assert profil.terminer("session") is None
+    assert profil.mesures("session") == []
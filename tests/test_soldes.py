@@ -0,0 +1,97 @@
+"""Réconciliation des soldes (soldes.reconcilier) : écarts signalés puis corrigés d'après l'historique."""
+from archives import archiver, lire_historique
+from conftest import ADO, ENFANT, PARENT, completion, fichier_premiere_version, ligne, relire
+from evenements import cumuls_depuis_historique, nouvel_evenement
+from soldes import reconcilier
+from stockage import ouvrir_stockage
+
+
+def remplir(foyer):
+    foyer.appliquer(completion(PARENT, "2025-12-01", points=40))
+    foyer.appliquer(completion(ADO, "2026-01-15", points=25))
+    attente = completion(ENFANT, "2026-03-01", points=10, en_attente=True)
+    foyer.appliquer(attente)
+    foyer.appliquer(nouvel_evenement("validation", ids=[attente["ts"]], date="2026-03-02"))
+    foyer.appliquer(nouvel_evenement("achat", id=1, nom="🍕 Soirée Pizza", points=30, date="2026-03-02"))
+
+
+def test_soldes_coherents(foyer):
+    remplir(foyer)
+    archiver(foyer, limite="2026-02-01")
+    rapport = reconcilier(foyer, appliquer=True)
+    assert rapport["points_foyer"] == (45, 45)
+    assert rapport["classement"] == {}
+    assert not rapport["corrige"]
+
+
+def test_ecart_corrige(foyer, chemin, mode):
+    remplir(foyer)
+    archiver(foyer, limite="2026-02-01")
+    # Compteurs faussés (ancienne version, fichier modifié à la main...)
+    foyer.appliquer(nouvel_evenement("reconciliation", points_foyer=999, classement={PARENT: 1}))
+
+    rapport = reconcilier(foyer)
+    assert rapport["points_foyer"] == (999, 45)
+    assert rapport["classement"] == {PARENT: (1, 40), ADO: (0, 25), ENFANT: (0, 10)}
+    assert not rapport["corrige"]
+
+    assert reconcilier(foyer, appliquer=True)["corrige"]
+    etat = relire(chemin, mode)
+    assert etat["points_foyer"] == 45
+    assert etat["classement"] == {PARENT: 40, ADO: 25, ENFANT: 10}
+    assert not reconcilier(foyer, appliquer=True)["corrige"]
+
+
+def test_cumuls_reconstruits_avec_les_archives(foyer, chemin, mode):
+    remplir(foyer)
+    archiver(foyer, limite="2026-02-01")
+    attendus = cumuls_depuis_historique(lire_historique(foyer.charger()["taches_completees"], chemin, "2026-02-01",
+                                                        "2025-01-01", "2026-12-31"))
+    # Cumuls perdus (fichier antérieur aux cumuls, reconstruits depuis l'historique chaud seulement)
+    foyer.appliquer(nouvel_evenement("reconciliation", points_foyer=45, classement={PARENT: 40, ADO: 25, ENFANT: 10},
+                                     cumuls={"jour": {}, "semaine": {}, "mois": {}}))
+
+    rapport = reconcilier(foyer, appliquer=True)
+    assert rapport["cumuls"] == 9
+    assert rapport["corrige"]
+    assert relire(chemin, mode)["cumuls"] == attendus
+    assert reconcilier(foyer)["cumuls"] == 0
+
+
+def test_fichier_premiere_version(chemin, mode):
+    # Une mission de Léo en attente (10 pts), une refusée (50 pts) : aucune n'est créditée
+    fichier_premiere_version(chemin, [ligne("Papa", "2026-03-01", "Courses", 20),
+                                      ligne("Léo", "2026-03-01", "Ranger", 50),
+                                      ligne("Léo", "2026-03-02", "Vaisselle", 10)],
+                             attente=[{"user": "Léo", "task": "Vaisselle", "pts": 10}],
+                             points=20, classement={"Papa": 20})
+    foyer = ouvrir_stockage(chemin, mode)
+    try:
+        rapport = reconcilier(foyer, appliquer=True)
+        assert rapport["points_foyer"] == (20, 20)
+        assert rapport["classement"] == {}
+        assert not rapport["corrige"]
+        assert foyer.charger()["points_foyer"] == 20
+    finally:
+        foyer.fermer()
+
+
+def test_attente_sans_id_validee_une_fois(chemin, mode):
+    # Fichier déjà doté de cumuls (pas de migration) : la ligne en attente sans clé "validated"
+    # est liée à la mission de la file, validée par son id et comptée une seule fois
+    fichier_premiere_version(chemin, [ligne("Papa", "2026-03-01", "Courses", 20),
+                                      ligne("Léo", "2026-03-02", "Vaisselle", 10)],
+                             attente=[{"user": "Léo", "task": "Vaisselle", "pts": 10}],
+                             points=20, classement={"Papa": 20},
+                             cumuls=cumuls_depuis_historique([ligne("Papa", "2026-03-01", "Courses", 20)]))
+    foyer = ouvrir_stockage(chemin, mode)
+    try:
+        item = foyer.charger()["attente_validation"][0]
+        assert item["id"] == "2026-03-02T18:00:00.000010"
+        foyer.appliquer(nouvel_evenement("validation", ids=[item["id"]], date="2026-03-03"))
+        rapport = reconcilier(foyer, appliquer=True)
+        assert rapport["points_foyer"] == (30, 30)
+        assert not rapport["corrige"] and not rapport["cumuls"]
+        assert foyer.charger()["classement"] == {"Papa": 20, "Léo": 10}
+    finally:
+        foyer.fermer()
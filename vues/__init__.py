@@ -0,0 +1,23 @@
+"""
+Pages de l'application, une par module, importées à la demande par le routeur (main.py).
+
+Chaque module expose afficher(). Seul le module de la page choisie est importé,
+une fois par processus : le code des autres pages n'est ni lu ni exécuté, et
+leurs dépendances lourdes (pandas pour le Classement et l'Espace Parents) ne
+sont chargées qu'au premier affichage de la page qui en a besoin.
+"""
+import importlib
+
+# Libellé du menu -> module de la page, dans l'ordre du menu
+PAGES = {
+    "🚀 Missions": "vues.missions",
+    "🎁 Récompenses": "vues.recompenses",
+    "📅 Calendrier": "vues.calendrier",
+    "🏆 Classement": "vues.classement",
+    "⚙️ Espace Parents": "vues.parents",
+}
+
+
+def page(libelle):
+    """Module de la page `libelle`, importé à son premier affichage."""
+    return importlib.import_module(PAGES[libelle])
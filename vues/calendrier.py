@@ -0,0 +1,154 @@
+"""
+Page Calendrier : missions complétées par jour, semaine, mois ou période libre.
+
+Seuls les jours de la période sont lus dans l'historique (index par jour,
+archives des mois concernés) ; les totaux viennent des cumuls de points.
+"""
+import html
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from evenements import cles_cumuls
+from session import RENDU_COMPACT, nom_membre, points_cumules
+
+JOURS_PAR_PAGE = 7
+
+
+def bornes_periode(ref, vue):
+    """Retourne (début, fin) du jour, de la semaine ISO ou du mois contenant la date `ref`."""
+    if vue == "Jour":
+        return ref, ref
+    if vue == "Semaine":
+        lundi = ref - timedelta(days=ref.weekday())
+        return lundi, lundi + timedelta(days=6)
+    debut = ref.replace(day=1)
+    suivant = (debut + timedelta(days=32)).replace(day=1)
+    return debut, suivant - timedelta(days=1)
+
+
+def decaler_periode(ref, vue, sens):
+    """Date de référence du jour, de la semaine ou du mois précédent (sens=-1) ou suivant (sens=1)."""
+    if vue == "Jour":
+        return ref + timedelta(days=sens)
+    if vue == "Semaine":
+        return ref + timedelta(days=7 * sens)
+    debut = ref.replace(day=1)
+    return (debut - timedelta(days=1)).replace(day=1) if sens < 0 else (debut + timedelta(days=32)).replace(day=1)
+
+
+def bloc_jour(date_display, taches_jour, points_jour):
+    """HTML d'une journée du calendrier : titre, puis les missions de chaque membre avec ses points."""
+    tasks_by_user = {}
+    for task in taches_jour:
+        tasks_by_user.setdefault(task['user'], []).append(task)
+    lignes = [f"<h3>📆 {date_display}</h3>"]
+    for user, user_tasks in tasks_by_user.items():
+        lignes.append(f"<p><b>{html.escape(nom_membre(user))}</b> ({points_jour.get(user, 0)} pts)</p><ul>")
+        for task in user_tasks:
+            status = "✅" if task.get('validated', True) else "⏳"
+            lignes.append(f"<li>{status} {html.escape(task['task'])} (+{task['points']} pts)</li>")
+        lignes.append("</ul><hr>")
+    return "".join(lignes)
+
+
+# --- PAGE ---
+def afficher():
+    """Page « 📅 Calendrier »."""
+    st.title("📅 Calendrier des Missions")
+    
+    # Sélection de la période : jour, semaine ou mois autour d'une date de référence, ou période libre
+    view_mode = st.radio("Vue", ["Jour", "Semaine", "Mois", "Période"], horizontal=True)
+    
+    today = datetime.now().date()
+    if "calendrier_ref" not in st.session_state:
+        st.session_state.calendrier_ref = today
+    ref = st.session_state.calendrier_ref
+    
+    if view_mode == "Période":
+        periode = st.date_input("Du ... au ...", value=(today - timedelta(days=6), today), max_value=today, format="DD/MM/YYYY")
+        # Pendant la sélection, une seule date est choisie
+        debut, fin = (periode[0], periode[-1]) if periode else (today, today)
+    else:
+        col_prec, col_auj, col_suiv = st.columns([1, 2, 1])
+        if col_auj.button("📍 Aujourd'hui", use_container_width=True, key="cal_aujourdhui"):
+            ref = today
+        if col_prec.button("◀️", use_container_width=True, key="cal_precedent"):
+            ref = decaler_periode(ref, view_mode, -1)
+        if col_suiv.button("▶️", use_container_width=True, key="cal_suivant"):
+            ref = decaler_periode(ref, view_mode, 1)
+        st.session_state.calendrier_ref = ref
+        debut, fin = bornes_periode(ref, view_mode)
+    
+    if view_mode == "Jour":
+        date_label = "Aujourd'hui" if debut == today else debut.strftime("%A %d %B %Y")
+    elif view_mode == "Semaine":
+        date_label = f"Semaine du {debut.strftime('%d/%m')} au {fin.strftime('%d/%m/%Y')}"
+    elif view_mode == "Mois":
+        date_label = debut.strftime("%B %Y")
+    else:
+        date_label = f"Du {debut.strftime('%d/%m')} au {fin.strftime('%d/%m/%Y')}"
+    
+    # Seuls les jours de la période sont lus (index par jour, archives des mois concernés)
+    jours_periode = st.session_state.taches_completees.par_jour(debut.isoformat(), fin.isoformat())
+    date_tasks = [t for _, taches_jour in jours_periode for t in taches_jour]
+    
+    st.subheader(f"📅 {date_label}")
+    
+    if not date_tasks:
+        st.info("Aucune tâche complétée pour cette période.")
+    else:
+        # Afficher par date, la plus récente d'abord
+        jours_affiches = list(reversed(jours_periode))
+        if RENDU_COMPACT and len(jours_affiches) > JOURS_PAR_PAGE:
+            # Longues périodes : une page de jours à la fois
+            nb_pages = -(-len(jours_affiches) // JOURS_PAR_PAGE)
+            page = st.selectbox("Page", range(nb_pages), key=f"cal_page_{debut}_{fin}",
+                                format_func=lambda i: f"Page {i + 1}/{nb_pages}")
+            jours_affiches = jours_affiches[page * JOURS_PAR_PAGE:(page + 1) * JOURS_PAR_PAGE]
+        for date, taches_jour in jours_affiches:
+            date_obj = datetime.strptime(date, "%Y-%m-%d")
+            if view_mode == "Jour":
+                date_display = date_label
+            elif view_mode == "Semaine":
+                date_display = date_obj.strftime("%A %d/%m")
+            else:
+                date_display = date_obj.strftime("%A %d %B")
+            
+            if RENDU_COMPACT:
+                # Toute la journée en un seul bloc
+                st.markdown(bloc_jour(date_display, taches_jour, points_cumules("jour", date)), unsafe_allow_html=True)
+                continue
+            
+            st.markdown(f"### 📆 {date_display}")
+            
+            # Grouper par utilisateur
+            tasks_by_user = {}
+            for task in taches_jour:
+                user = task['user']
+                if user not in tasks_by_user:
+                    tasks_by_user[user] = []
+                tasks_by_user[user].append(task)
+            
+            points_jour = points_cumules("jour", date)
+            for user, user_tasks in tasks_by_user.items():
+                total_points = points_jour.get(user, 0)
+                st.markdown(f"**{nom_membre(user)}** ({total_points} pts)")
+                for task in user_tasks:
+                    status = "✅" if task.get('validated', True) else "⏳"
+                    st.write(f"  {status} {task['task']} (+{task['points']} pts)")
+                st.markdown("---")
+        
+        # Statistiques, lues dans les cumuls de points (points crédités uniquement)
+        if view_mode == "Semaine":
+            total_points_period = sum(points_cumules("semaine", cles_cumuls(debut.isoformat())[1][1]).values())
+        elif view_mode == "Mois":
+            total_points_period = sum(points_cumules("mois", debut.strftime("%Y-%m")).values())
+        else:
+            total_points_period = sum(sum(points_cumules("jour", (debut + timedelta(days=i)).isoformat()).values())
+                                      for i in range((fin - debut).days + 1))
+        st.metric("Total points sur la période", f"{total_points_period} pts")
+        if view_mode == "Mois":
+            # Cumuls par semaine ISO tenus par l'index du mois
+            cumuls = st.session_state.taches_completees.mois(debut.strftime("%Y-%m")).par_semaine
+            st.caption(" • ".join(f"Semaine {semaine} : {nb} mission(s)" for (_, semaine), nb in sorted(cumuls.items())))
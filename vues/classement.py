@@ -0,0 +1,64 @@
+"""
+Page Classement : points par membre sur la semaine, le mois ou depuis le début.
+
+pandas, importé avec ce module, n'est chargé qu'au premier affichage de la page.
+"""
+import time
+
+import pandas as pd
+import streamlit as st
+
+import gabarits
+from evenements import cles_cumuls
+from session import ANIMATIONS_BLOQUANTES, get_today_str, logout_parent, nom_membre, points_cumules, require_parent_auth
+
+
+# --- PAGE ---
+def afficher():
+    """Page « 🏆 Classement » (code parent requis)."""
+    st.title("🏆 Tableau d'Honneur")
+    
+    # Animation sablier
+    def animate_hourglass():
+        if not ANIMATIONS_BLOQUANTES:
+            st.markdown(gabarits.SABLIER_CLASSEMENT, unsafe_allow_html=True)
+            return
+        hourglass_frames = [
+            "⏳",
+            "⏳",
+            "⌛",
+            "⌛",
+            "⏳"
+        ]
+        placeholder = st.empty()
+        for frame in hourglass_frames:
+            placeholder.markdown(f"<h1 style='font-size: 72px; text-align:center;'>{frame}</h1>", unsafe_allow_html=True)
+            time.sleep(0.2)
+        placeholder.empty()
+
+    # Sécurité pour accès au classement
+    if not require_parent_auth(show_form=True):
+        st.stop()
+    
+    # Bouton de déconnexion
+    if st.button("🔒 Se déconnecter", use_container_width=True):
+        logout_parent()
+    
+    # Période du classement : cumuls de la semaine ou du mois, ou total depuis le début
+    fenetre = st.radio("Période", ["Cette semaine", "Ce mois", "Depuis le début"], horizontal=True, index=2)
+    if fenetre == "Depuis le début":
+        scores = st.session_state.classement
+    else:
+        periode, cle = cles_cumuls(get_today_str())[1 if fenetre == "Cette semaine" else 2]
+        # Les membres supprimés depuis ne figurent plus au classement
+        membres = set(st.session_state.config["parents"] + st.session_state.config["ados"] + st.session_state.config["enfants"])
+        scores = {user: pts for user, pts in points_cumules(periode, cle).items() if user in membres}
+    
+    # Affichage du classement
+    if scores:
+        st.success("🔓 Accès sécurisé activé !")
+        animate_hourglass()
+        df = pd.DataFrame([(nom_membre(user), pts) for user, pts in scores.items()], columns=['Héros', 'Points']).sort_values(by='Points', ascending=False)
+        st.table(df)
+    else:
+        st.info("Aucun point enregistré pour cette période.")
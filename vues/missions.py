@@ -0,0 +1,149 @@
+"""
+Page Missions : chaque membre voit ses missions par catégorie et les déclare terminées.
+
+Une catégorie (rendu compact) ou une carte (rendu détaillé) est une unité
+réexécutable : un envoi ne relance que la sienne, avec le trésor pour un parent
+ou le sablier du membre pour une mission en attente de validation. Dans les deux
+rendus, chaque mission garde son bouton « Terminé ! 🚀 » sous sa carte ; le rendu
+compact n'envoie qu'un bloc HTML par mission (en-tête, carte et statut).
+"""
+import time
+
+import streamlit as st
+
+import gabarits
+from evenements import nouvel_evenement
+from session import (ANIMATIONS_BLOQUANTES, RENDU_COMPACT, action, eligibilite_missions, file_attente, get_today_str,
+                     index_missions, logout_parent, require_parent_auth, unite, update_and_save)
+
+
+def animate_hourglass_submission():
+    """Animation sablier après la soumission d'une tâche en attente (jouée par l'unité « attente »)."""
+    if not ANIMATIONS_BLOQUANTES:
+        st.markdown(gabarits.SABLIER_ENVOI, unsafe_allow_html=True)
+        return
+    hourglass_frames = ["⏳", "⏳", "⌛", "⌛"]
+    placeholder = st.empty()
+    for frame in hourglass_frames:
+        placeholder.markdown(f"""
+        <div style='text-align: center; padding: 20px;'>
+            <h1 style='font-size: 64px; margin: 0;'>{frame}</h1>
+            <p style='font-size: 1.2em; color: #FFA000; font-weight: bold;'>Mission envoyée !</p>
+            <p style='color: var(--text-secondary);'>En attente de validation...</p>
+        </div>
+        """, unsafe_allow_html=True)
+        time.sleep(0.3)
+    placeholder.empty()
+
+
+def add_completed_task(task_name, user, points, en_attente=False, unites=(), **effets):
+    """
+    Ajoute une tâche complétée à l'historique puis relance les `unites` (voir update_and_save).
+    Si en_attente=True, la mission part en validation parentale au lieu de créditer les points.
+    """
+    update_and_save(nouvel_evenement("tache_completee", task=task_name, user=user, points=points,
+                                     date=get_today_str(), en_attente=en_attente), unites, **effets)
+
+
+def valider_mission(user, role, cle_unite, t):
+    """
+    Callback de « Terminé ! 🚀 » : mission créditée directement pour un parent (l'unité et le
+    trésor sont relancés), en attente sinon (l'unité et le sablier du membre).
+    """
+    if not eligibilite_missions(index_missions().missions(role), user).get(t['n'], {"peut_valider": True})["peut_valider"]:
+        st.session_state.message_flash = "⚠️ Cette tâche a déjà été complétée selon sa fréquence aujourd'hui/cette semaine."
+        update_and_save()
+    if role == "Parent":
+        add_completed_task(t['n'], user, t['p'], unites=[cle_unite, "tresor"], ballons=True)
+    else:
+        # Enregistrer même en attente ; sablier et toast joués par l'unité « attente »
+        add_completed_task(t['n'], user, t['p'], en_attente=True, unites=[cle_unite, "attente"], animation_envoi=True)
+
+
+def bandeau_attente(user):
+    """Sablier global du membre : ses missions en attente, puis l'animation qui suit un envoi."""
+    nb_en_attente = file_attente().nb(user)
+    if nb_en_attente:
+        st.markdown(f"<div class='waiting-msg'>⏳ Sablier magique activé... Papa ou Maman vérifient tes {nb_en_attente} mission(s) !</div>", unsafe_allow_html=True)
+    if st.session_state.pop("animation_envoi", False):
+        animate_hourglass_submission()
+        st.toast(f"Mission envoyée ! ⏳", icon="⌛")
+
+
+def bouton_mission(cle, t, user, role, regle):
+    """Bouton « Terminé ! 🚀 » d'une mission, désactivé si sa fréquence ne le permet pas."""
+    can_validate = regle is None or regle["peut_valider"]
+    st.button(f"Terminé ! 🚀", disabled=not can_validate,
+              **action(f"btn_{t['n']}_{user}", valider_mission, user, role, cle, t))
+
+
+def categorie_missions(cle, cat, user, role):
+    """Rendu compact : un bloc HTML par mission (l'en-tête de la catégorie avec la première), suivi de son bouton."""
+    index = index_missions()
+    eligibilite = eligibilite_missions(index.missions(role), user)
+    entete = f"<div class='category-header'>{cat}</div>"
+    for t in index.missions(role, cat):
+        regle = eligibilite.get(t['n'])
+        carte, status_info = gabarits.carte_mission(t, regle)
+        statut = f"<div class='statut-mission'>ℹ️ {status_info}</div>" if status_info else ""
+        st.markdown(entete + carte + statut, unsafe_allow_html=True)
+        entete = ""
+        bouton_mission(cle, t, user, role, regle)
+
+
+def ligne_mission(cle, t, user, role):
+    """Rendu détaillé : la carte d'une mission, son statut et son bouton."""
+    regle = eligibilite_missions(index_missions().missions(role), user).get(t['n'])
+    carte, status_info = gabarits.carte_mission(t, regle)
+    st.markdown(carte, unsafe_allow_html=True)
+    if status_info:
+        st.caption(f"ℹ️ {status_info}")
+    bouton_mission(cle, t, user, role, regle)
+
+
+# --- PAGE ---
+def afficher():
+    """Page « 🚀 Missions »."""
+    st.title("🚀 Missions Magiques")
+    
+    # Légende du code couleur
+    for col, legende in zip(st.columns(3), gabarits.LEGENDE):
+        col.markdown(legende, unsafe_allow_html=True)
+    st.markdown("---")
+    
+    all_users = st.session_state.config["parents"] + st.session_state.config["ados"] + st.session_state.config["enfants"]
+    # Les options sont les ids des membres ; format_func ne lit que le dict des noms
+    noms = st.session_state.noms
+    current_user = st.selectbox("Qui es-tu ?", all_users, format_func=lambda membre: noms.get(membre, membre))
+    role = "Parent" if current_user in st.session_state.config["parents"] else "Ado" if current_user in st.session_state.config["ados"] else "Enfant"
+
+    # Authentification obligatoire pour les profils parents
+    parent_authenticated_for_missions = True
+    if role == "Parent":
+        if not require_parent_auth(show_form=True):
+            parent_authenticated_for_missions = False
+            # Arrêter l'affichage des missions si le parent n'est pas authentifié
+            st.stop()
+        else:
+            # Afficher le bouton de déconnexion si authentifié
+            st.success("✅ Authentifié en tant que parent - Vous pouvez valider les missions")
+            if st.button("🔒 Se déconnecter (Profil Parent)", use_container_width=False):
+                logout_parent()
+
+    # Sablier du membre : relancé avec la carte d'une mission envoyée
+    unite("attente")(bandeau_attente)(current_user)
+
+    # Ne pas afficher les missions si le parent n'est pas authentifié
+    if role == "Parent" and not parent_authenticated_for_missions:
+        st.stop()
+
+    # Une unité par catégorie (rendu compact) ou par carte : un envoi ne relance que la sienne.
+    # Catégories et missions du rôle lues dans l'index, y compris les catégories des missions personnalisées
+    index = index_missions()
+    for cat in index.categories(role):
+        if RENDU_COMPACT:
+            unite(f"missions_{cat}")(categorie_missions)(f"missions_{cat}", cat, current_user, role)
+            continue
+        st.markdown(f"<div class='category-header'>{cat}</div>", unsafe_allow_html=True)
+        for t in index.missions(role, cat):
+            unite(f"mission_{t['n']}")(ligne_mission)(f"mission_{t['n']}", t, current_user, role)
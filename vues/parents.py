@@ -0,0 +1,378 @@
+"""
+Espace Parents : validation des missions, famille, missions et récompenses personnalisées,
+grille « qui peut faire quoi », et diagnostic des reruns quand le profil est actif (FOYER_PROFIL=1).
+
+pandas n'est importé qu'ici et dans le Classement : les autres pages ne le chargent pas.
+"""
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import catalogue
+import gabarits
+import profil
+from boutique import CATEGORIES_RECOMPENSES
+from evenements import nouvel_evenement
+from frequences import NOMS_JOURS, etendue_regles, matrice_eligibilite
+from session import (RECOMPENSES_PAR_PAGE, action, cle_widget, effacer_profil, file_attente, get_today_str,
+                     historique_periode, index_missions, logout_parent, mesures_profil, nom_membre, require_parent_auth,
+                     unite, update_and_save)
+
+ATTENTE_PAR_PAGE = 10
+
+
+def traiter_attente(type_evenement, ids, selection=False):
+    """
+    Callback des boutons de la file de validation : valide ou refuse `ids` (seulement les cases
+    cochées si `selection`), puis relance la file et, pour une validation, le trésor.
+    """
+    if selection:
+        ids = [id_attente for id_attente in ids if st.session_state.get(cle_widget(f"sel_{id_attente}"))]
+    if type_evenement == "validation":
+        update_and_save(nouvel_evenement("validation", ids=ids, date=get_today_str()), ["validations", "tresor"])
+    update_and_save(nouvel_evenement("refus", ids=ids), ["validations"])
+
+
+def panneau_validations():
+    """File de validation : tout valider, tout valider pour un membre, ou la sélection de la page affichée."""
+    index_attente = file_attente()
+    if not index_attente.nb():
+        st.info("Tout est à jour !")
+        return
+    # Un seul événement (une transaction, une sauvegarde) par action, quel que soit le nombre de missions
+    st.button(f"✅ Tout valider ({index_attente.nb()})", use_container_width=True,
+              **action("valider_tout", traiter_attente, "validation", [item["id"] for item in st.session_state.attente_validation]))
+
+    # File groupée par membre, une page de missions à la fois
+    membre = st.radio("Membre", index_attente.membres(), horizontal=True, key="validation_membre",
+                      format_func=lambda user, noms=st.session_state.noms: f"{noms.get(user, user)} ({index_attente.nb(user)})")
+    missions = index_attente.missions(membre)
+    st.button(f"✅ Tout valider pour {nom_membre(membre)}", use_container_width=True,
+              **action(f"valider_{membre}", traiter_attente, "validation", [item["id"] for item in missions]))
+    if len(missions) > ATTENTE_PAR_PAGE:
+        nb_pages = -(-len(missions) // ATTENTE_PAR_PAGE)
+        page = st.selectbox("Page", range(nb_pages), key=f"validation_page_{membre}",
+                            format_func=lambda i: f"Page {i + 1}/{nb_pages}")
+        missions = missions[page * ATTENTE_PAR_PAGE:(page + 1) * ATTENTE_PAR_PAGE]
+
+    selection = []
+    for item in missions:
+        # L'id est l'horodatage de l'envoi (sauf anciennes missions sans ligne d'historique)
+        envoi = datetime.fromisoformat(item["id"]).strftime("%d/%m") if item["id"][:4].isdigit() else ""
+        if st.checkbox(f"{item['task']} (+{item['pts']}) {envoi}", key=cle_widget(f"sel_{item['id']}")):
+            selection.append(item["id"])
+    ids_page = [item["id"] for item in missions]
+    col_v, col_x = st.columns(2)
+    col_v.button(f"Valider la sélection ({len(selection)})", disabled=not selection,
+                 **action("valider_selection", traiter_attente, "validation", ids_page, True))
+    col_x.button(f"Refuser la sélection ({len(selection)})", disabled=not selection,
+                 **action("refuser_selection", traiter_attente, "refus", ids_page, True))
+
+
+def panneau_diagnostic():
+    """Derniers reruns de la session mesurés par le profil, puis les sections qui leur ont coûté le plus."""
+    mesures = mesures_profil()
+    if not mesures:
+        st.info("Aucun rerun mesuré pour l'instant.")
+        return
+    derniere = mesures[-1]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Dernier rerun", f"{derniere['ms']:.0f} ms", f"{derniere['cpu_ms']:.0f} ms CPU", delta_color="off")
+    col2.metric("Deltas envoyés", derniere["deltas"])
+    col3.metric("Foyer sur disque", f"{derniere['octets'] / 1024:.0f} Ko")
+    col4.metric("Historique chaud", f"{derniere['historique']} lignes")
+
+    st.markdown(f"#### 🕒 {len(mesures)} derniers reruns")
+    st.dataframe(pd.DataFrame([{
+        "heure": m["heure"][11:], "page ou unité": m["page"], "fragments": "✅" if m["fragments"] else "",
+        "ms": m["ms"], "ms CPU": m["cpu_ms"], "deltas": m["deltas"],
+        "relances": " ; ".join(r if isinstance(r, str) else ", ".join(r) for r in m["relances"]),
+        "foyer (Ko)": round(m["octets"] / 1024, 1), "historique": m["historique"],
+    } for m in reversed(mesures)]), hide_index=True, use_container_width=True)
+
+    # Les sections s'emboîtent (une unité est comptée aussi dans sa page) : ne pas les additionner
+    st.markdown("#### 🔍 Sections")
+    sections = pd.DataFrame([{"section": nom, **valeurs} for m in mesures for nom, valeurs in m["sections"].items()])
+    sections = sections.groupby("section").sum()
+    sections["ms par appel"] = (sections["ms"] / sections["appels"]).round(2)
+    st.dataframe(sections.sort_values("ms", ascending=False), use_container_width=True)
+    if profil.TRACE:
+        st.caption(f"Trace JSONL : {profil.TRACE} (nouveau fichier au-delà de {profil.TRACE_OCTETS // 1024} Ko, "
+                   f"{profil.TRACE_FICHIERS} fichiers gardés)")
+    st.button("🧹 Effacer les mesures", on_click=effacer_profil)
+
+
+# --- PAGE ---
+def afficher():
+    """Page « ⚙️ Espace Parents » (code parent requis)."""
+    if not require_parent_auth(show_form=True):
+        st.stop()
+    
+    st.title("🛡️ Zone de Validation")
+    
+    # Bouton de déconnexion
+    if st.button("🔒 Se déconnecter", use_container_width=True):
+        logout_parent()
+
+    # Onglets dans l'espace parents
+    # Onglet de diagnostic seulement avec le profil des reruns
+    onglets = ["✅ Validations", "👨‍👩‍👧‍👦 Gestion Famille", "➕ Créer une Tâche", "🎁 Gérer Récompenses", "📊 Qui peut faire quoi"]
+    tab1, tab2, tab3, tab4, tab5, *tab_diagnostic = st.tabs(onglets + ["🩺 Diagnostic"] * profil.ACTIF)
+    
+    with tab1, profil.mesure("onglet Validations"):
+        st.subheader("✅ Missions à confirmer")
+        # Cocher une case ou valider ne relance que la file (et le trésor)
+        unite("validations")(panneau_validations)()
+    
+    with tab2, profil.mesure("onglet Gestion Famille"):
+        st.subheader("👨‍👩‍👧‍👦 Gestion de la Famille")
+        
+        # Gestion des enfants
+        st.markdown("### 👶 Gestion des Enfants")
+        if st.session_state.config["enfants"]:
+            for idx, enfant in enumerate(st.session_state.config["enfants"]):
+                col_name, col_role, col_del = st.columns([3, 2, 1])
+                
+                with col_name:
+                    new_name = st.text_input(f"Nom", value=nom_membre(enfant), key=f"enfant_name_{enfant}")
+                    if new_name != nom_membre(enfant):
+                        # Seul le nom affiché change : historique, file et classement citent l'id
+                        update_and_save(nouvel_evenement("renommage", id=enfant, nom=new_name))
+                
+                with col_role:
+                    if st.button(f"➡️ Devenir Ado", key=f"enfant_to_ado_{idx}"):
+                        # Passer de la liste des enfants à celle des ados
+                        update_and_save(nouvel_evenement("membre_change_role", id=enfant, de="enfants", vers="ados"))
+                
+                with col_del:
+                    if st.button("🗑️", key=f"del_enfant_{idx}"):
+                        # Retiré de la configuration et du classement
+                        update_and_save(nouvel_evenement("membre_supprime", role="enfants", id=enfant))
+        else:
+            st.info("Aucun enfant enregistré.")
+        
+        # Bouton pour ajouter un nouvel enfant
+        if st.button("➕ Ajouter un Enfant"):
+            nouveau = f"Enfant {len(st.session_state.config['enfants']) + 1}"
+            # Id immuable du membre, indépendant de son nom
+            update_and_save(nouvel_evenement("membre_ajoute", role="enfants", id=uuid.uuid4().hex[:8], nom=nouveau))
+        
+        st.markdown("---")
+        
+        # Gestion des ados
+        st.markdown("### 🧑 Gestion des Ados")
+        if st.session_state.config["ados"]:
+            for idx, ado in enumerate(st.session_state.config["ados"]):
+                col_name, col_del = st.columns([4, 1])
+                
+                with col_name:
+                    new_name = st.text_input(f"Nom", value=nom_membre(ado), key=f"ado_name_{ado}")
+                    if new_name != nom_membre(ado):
+                        # Seul le nom affiché change : historique, file et classement citent l'id
+                        update_and_save(nouvel_evenement("renommage", id=ado, nom=new_name))
+                
+                with col_del:
+                    if st.button("🗑️", key=f"del_ado_{idx}"):
+                        # Retiré de la configuration et du classement
+                        update_and_save(nouvel_evenement("membre_supprime", role="ados", id=ado))
+        else:
+            st.info("Aucun ado enregistré.")
+        
+        # Bouton pour ajouter un nouvel ado
+        if st.button("➕ Ajouter un Ado"):
+            nouveau = f"Ado {len(st.session_state.config['ados']) + 1}"
+            update_and_save(nouvel_evenement("membre_ajoute", role="ados", id=uuid.uuid4().hex[:8], nom=nouveau))
+    
+    with tab3, profil.mesure("onglet Créer une Tâche"):
+        st.subheader("➕ Créer une Nouvelle Tâche")
+        
+        with st.form("nouvelle_tache", clear_on_submit=True):
+            nom_tache = st.text_input("Nom de la tâche (avec emoji)", placeholder="🧹 Exemple : Nettoyer la salle de bain")
+            description = st.text_area("Description", placeholder="Description détaillée de la tâche")
+            
+            col_points, col_cat = st.columns(2)
+            with col_points:
+                points = st.number_input("Points", min_value=1, max_value=100, value=10)
+            with col_cat:
+                categorie = st.selectbox("Catégorie", catalogue.CATEGORIES)
+            
+            roles = st.multiselect("Rôles autorisés", ["Parent", "Ado", "Enfant"], default=["Enfant", "Ado"])
+            
+            frequence = st.selectbox("Fréquence", ["Aucune", "Quotidien", "Hebdomadaire", "Ponctuel"])
+            
+            # Règle de fréquence optionnelle (s'ajoute à celle de la fréquence choisie)
+            col_max, col_delai = st.columns(2)
+            with col_max:
+                max_semaine = st.number_input("Maximum par semaine (0 = selon la fréquence)", min_value=0, max_value=14, value=0)
+            with col_delai:
+                delai_jours = st.number_input("Jours minimum entre deux fois (0 = aucun)", min_value=0, max_value=60, value=0)
+            jours_autorises = st.multiselect("Jours autorisés (vide = tous)", NOMS_JOURS)
+            
+            if st.form_submit_button("✅ Créer la Tâche"):
+                if nom_tache and description:
+                    nouvelle_tache = {
+                        "n": nom_tache,
+                        "p": int(points),
+                        "c": categorie,
+                        "r": roles,
+                        "d": description,
+                        "f": frequence if frequence != "Aucune" else None
+                    }
+                    regle = {}
+                    if max_semaine:
+                        regle["max_semaine"] = int(max_semaine)
+                    if delai_jours:
+                        regle["delai_jours"] = int(delai_jours)
+                    if jours_autorises:
+                        regle["jours"] = [NOMS_JOURS.index(j) for j in jours_autorises]
+                    if regle:
+                        nouvelle_tache["regle"] = regle
+                    
+                    st.success(f"✅ Tâche '{nom_tache}' créée avec succès !")
+                    update_and_save(nouvel_evenement("tache_creee", tache=nouvelle_tache))
+                else:
+                    st.error("⚠️ Veuillez remplir le nom et la description de la tâche.")
+        
+        # Afficher les tâches personnalisées existantes
+        if st.session_state.get("taches_personnalisees"):
+            st.markdown("---")
+            st.subheader("📋 Tâches Personnalisées")
+            for idx, tache in enumerate(st.session_state.taches_personnalisees):
+                with st.expander(f"{tache['n']} (+{tache['p']} pts)"):
+                    col_info, col_del = st.columns([4, 1])
+                    with col_info:
+                        st.write(f"**Description:** {tache['d']}")
+                        st.write(f"**Catégorie:** {tache['c']} | **Rôles:** {', '.join(tache['r'])} | **Fréquence:** {tache.get('f', 'Aucune')}")
+                    with col_del:
+                        if st.button("🗑️ Supprimer", key=f"del_tache_{idx}"):
+                            update_and_save(nouvel_evenement("tache_supprimee", index=idx, n=tache['n']))
+    
+    with tab4, profil.mesure("onglet Gérer Récompenses"):
+        st.subheader("🎁 Gestion des Récompenses")
+        
+        # Formulaire pour créer/modifier une récompense
+        st.markdown("### ➕ Créer ou Modifier une Récompense")
+        
+        # Sélectionner une récompense existante à modifier ou créer nouvelle
+        if 'recompenses_personnalisees' not in st.session_state:
+            st.session_state.recompenses_personnalisees = []
+        
+        # Trouver le prochain ID disponible
+        next_id = 6  # Commence après les 5 récompenses par défaut
+        if st.session_state.recompenses_personnalisees:
+            max_id = max(r.get('id', 0) for r in st.session_state.recompenses_personnalisees)
+            next_id = max_id + 1
+        
+        recompense_to_edit = st.selectbox(
+            "Modifier une récompense existante ou créer une nouvelle",
+            ["➕ Créer une nouvelle récompense"] + [f"{r['emoji']} {r['nom']}" for r in st.session_state.recompenses_personnalisees],
+            key="select_recompense_edit"
+        )
+        
+        # Récupérer les données de la récompense à modifier
+        recompense_data = None
+        if recompense_to_edit != "➕ Créer une nouvelle récompense":
+            idx_edit = [f"{r['emoji']} {r['nom']}" for r in st.session_state.recompenses_personnalisees].index(recompense_to_edit)
+            recompense_data = st.session_state.recompenses_personnalisees[idx_edit]
+        
+        with st.form("form_recompense", clear_on_submit=False):
+            emoji = st.text_input("Emoji", value=recompense_data['emoji'] if recompense_data else "🎁", max_chars=2)
+            nom = st.text_input("Nom de la récompense", value=recompense_data['nom'].replace(recompense_data['emoji'], '').strip() if recompense_data else "", placeholder="Exemple : Soirée Cinéma")
+            description = st.text_area("Description", value=recompense_data['description'] if recompense_data else "", placeholder="Description détaillée de la récompense")
+            points = st.number_input("Points requis", min_value=1, max_value=500, value=recompense_data['points'] if recompense_data else 50)
+            categorie_actuelle = (recompense_data or {}).get("categorie") or "Autre"
+            categorie = st.selectbox("Catégorie", CATEGORIES_RECOMPENSES,
+                                     index=CATEGORIES_RECOMPENSES.index(categorie_actuelle) if categorie_actuelle in CATEGORIES_RECOMPENSES else len(CATEGORIES_RECOMPENSES) - 1)
+            repetable = st.checkbox("🔁 Peut être obtenue plusieurs fois", value=bool((recompense_data or {}).get("repetable")))
+            delai_jours = st.number_input("Délai entre deux achats (jours, 0 = aucun)", min_value=0, max_value=365,
+                                          value=(recompense_data or {}).get("delai_jours") or 0,
+                                          help="Pour une récompense répétable : nombre de jours avant de pouvoir l'obtenir à nouveau.")
+            
+            # Sélection de la couleur
+            couleurs_predefinies = gabarits.DEGRADES
+            couleur_idx = couleurs_predefinies.index(recompense_data['couleur']) if recompense_data and recompense_data['couleur'] in couleurs_predefinies else 0
+            couleur_selectionnee = st.selectbox("Couleur du dégradé", couleurs_predefinies, index=couleur_idx, format_func=lambda x: "Dégradé " + str(couleurs_predefinies.index(x) + 1))
+            
+            col_submit, col_delete = st.columns([3, 1])
+            
+            with col_submit:
+                if recompense_data:
+                    submit_text = "💾 Modifier la Récompense"
+                else:
+                    submit_text = "✅ Créer la Récompense"
+                
+                submitted = st.form_submit_button(submit_text, use_container_width=True)
+            
+            with col_delete:
+                if recompense_data:
+                    delete_clicked = st.form_submit_button("🗑️ Supprimer", use_container_width=True)
+                else:
+                    delete_clicked = False
+            
+            if submitted:
+                if nom and description and emoji:
+                    nouvelle_recompense = {
+                        "id": recompense_data['id'] if recompense_data else next_id,
+                        "nom": f"{emoji} {nom}",
+                        "description": description,
+                        "points": int(points),
+                        "emoji": emoji,
+                        "couleur": couleur_selectionnee,
+                        "categorie": categorie,
+                        "repetable": repetable,
+                        "delai_jours": int(delai_jours) if repetable else 0
+                    }
+                    
+                    # Modifie la récompense existante (même id) ou en crée une nouvelle
+                    if recompense_data:
+                        st.success(f"✅ Récompense '{nouvelle_recompense['nom']}' modifiée avec succès !")
+                    else:
+                        st.success(f"✅ Récompense '{nouvelle_recompense['nom']}' créée avec succès !")
+                    
+                    update_and_save(nouvel_evenement("recompense_enregistree", recompense=nouvelle_recompense))
+                else:
+                    st.error("⚠️ Veuillez remplir tous les champs.")
+            
+            if delete_clicked and recompense_data:
+                st.success(f"✅ Récompense '{recompense_data['nom']}' supprimée !")
+                update_and_save(nouvel_evenement("recompense_supprimee", id=recompense_data['id']))
+        
+        # Afficher les récompenses personnalisées existantes
+        if st.session_state.recompenses_personnalisees:
+            st.markdown("---")
+            st.subheader("📋 Récompenses Personnalisées")
+            personnalisees = st.session_state.recompenses_personnalisees
+            if len(personnalisees) > RECOMPENSES_PAR_PAGE:
+                nb_pages = -(-len(personnalisees) // RECOMPENSES_PAR_PAGE)
+                page = st.selectbox("Page", range(nb_pages), key="recompenses_perso_page",
+                                    format_func=lambda i: f"Page {i + 1}/{nb_pages}")
+                personnalisees = personnalisees[page * RECOMPENSES_PAR_PAGE:(page + 1) * RECOMPENSES_PAR_PAGE]
+            for rec in personnalisees:
+                with st.expander(f"{rec['emoji']} {rec['nom']} ({rec['points']} pts)"):
+                    st.write(f"**Description:** {rec['description']}")
+                    st.write(f"**Points:** {rec['points']} pts")
+                    st.write(f"**Catégorie:** {rec.get('categorie') or 'Autre'}")
+                    if rec.get("repetable"):
+                        delai = f", au plus une fois tous les {rec['delai_jours']} jours" if rec.get("delai_jours") else ""
+                        st.write(f"**Répétable**{delai}")
+                    st.markdown(gabarits.apercu_degrade(rec['couleur']), unsafe_allow_html=True)
+    
+    with tab5, profil.mesure("onglet Qui peut faire quoi"):
+        st.subheader("📊 Qui peut encore faire quoi ?")
+        config = st.session_state.config
+        membres = {**{membre: "Parent" for membre in config["parents"]},
+                   **{membre: "Ado" for membre in config["ados"]},
+                   **{membre: "Enfant" for membre in config["enfants"]}}
+        toutes_taches = index_missions().toutes
+        aujourd_hui = datetime.now().date()
+        # Toute la famille en un seul calcul, sur la seule période utile aux règles
+        historique = historique_periode(etendue_regles(toutes_taches, aujourd_hui), get_today_str())
+        grille = matrice_eligibilite(toutes_taches, membres, historique, aujourd_hui).rename(index=nom_membre)
+        st.caption("✅ encore possible • ⛔ limite atteinte (jour, semaine, délai ou jour non autorisé) • vide : hors rôle")
+        st.dataframe(grille.T.map(lambda v: "" if pd.isna(v) else "✅" if v else "⛔"), use_container_width=True)
+
+    if tab_diagnostic:
+        with tab_diagnostic[0]:
+            panneau_diagnostic()
@@ -0,0 +1,119 @@
+"""
+Page Récompenses : la boutique du foyer, filtrée par catégorie et paginée.
+
+Chaque carte est une unité réexécutable : un achat relance la carte achetée,
+celles que le nouveau solde rend inaccessibles, le trésor et les récompenses
+obtenues.
+"""
+from datetime import datetime
+
+import streamlit as st
+
+import gabarits
+from evenements import nouvel_evenement
+from session import RECOMPENSES_PAR_PAGE, action, boutique, get_today_str, unite, update_and_save
+
+
+def solde_boutique():
+    """Trésor disponible en tête de la boutique."""
+    col_balance1, col_balance2, col_balance3 = st.columns([1, 2, 1])
+    with col_balance2:
+        st.markdown(gabarits.solde_boutique(st.session_state.points_foyer), unsafe_allow_html=True)
+
+
+def acheter_recompense(id_recompense, affichees):
+    """
+    Callback de « ✨ Obtenir cette récompense » : relance la carte achetée, le trésor, le solde,
+    les récompenses obtenues et les cartes affichées (`affichees`, ids) que le nouveau solde ne
+    permet plus d'acheter ou dont le montant manquant change.
+    """
+    index_boutique = boutique()
+    recompense = index_boutique.recompense(id_recompense)
+    solde = st.session_state.points_foyer - recompense['points']
+    cartes = [f"recompense_{i}" for i in affichees if i == id_recompense or index_boutique.recompense(i)['points'] > solde]
+    update_and_save(nouvel_evenement("achat", id=recompense['id'], nom=recompense['nom'],
+                                     points=recompense['points'], date=get_today_str(),
+                                     unique=not recompense.get("repetable"),
+                                     delai_jours=recompense.get("delai_jours") or 0),
+                    cartes + ["tresor", "solde_boutique", "obtenues"], ballons=True, felicitations=id_recompense)
+
+
+def carte_recompense(id_recompense, affichees):
+    """Carte d'une récompense : statut selon le trésor et les achats, puis le bouton d'achat ou ce qui manque."""
+    index_boutique = boutique()
+    recompense = index_boutique.recompense(id_recompense)
+    statut = index_boutique.statut(recompense, st.session_state.points_foyer, get_today_str())
+    est_achetee = statut["obtenue"]
+
+    # Carte compacte, mémorisée par (récompense, statut)
+    st.markdown(gabarits.carte_recompense(recompense, statut), unsafe_allow_html=True)
+
+    if st.session_state.get("felicitations") == id_recompense:
+        del st.session_state.felicitations
+        st.success(f"🎉 Félicitations ! Vous avez obtenu : {recompense['nom']}")
+    if est_achetee:
+        st.info(f"✅ Déjà obtenue !")
+    elif statut["disponible_le"]:
+        disponible_le = datetime.strptime(statut["disponible_le"], "%Y-%m-%d").strftime("%d/%m/%Y")
+        st.info(f"⏳ De nouveau disponible le {disponible_le}")
+    elif statut["peut_acheter"]:
+        st.button(f"✨ Obtenir cette récompense", use_container_width=True,
+                  **action(f"buy_{id_recompense}", acheter_recompense, id_recompense, affichees))
+    else:
+        st.warning(f"💡 Il manque {statut['manque']} pts")
+
+
+def recompenses_obtenues():
+    """Récompenses obtenues : une ligne par récompense (nombre, dernier achat, points utilisés)."""
+    index_boutique = boutique()
+    obtenues = [(index_boutique.recompense(id_recompense), stats) for id_recompense, stats in index_boutique.achats()]
+    obtenues = [(rec_info, stats) for rec_info, stats in obtenues if rec_info]
+    if not obtenues:
+        return
+    st.markdown("---")
+    st.subheader("🏆 Mes Récompenses Obtenues")
+
+    blocs = []
+    for rec_info, stats in obtenues:
+        date_display = datetime.strptime(stats['dernier'], "%Y-%m-%d").strftime("%d/%m/%Y")
+        blocs.append(gabarits.recompense_obtenue(rec_info['emoji'], stats['nom'], stats['nb'], date_display, stats['points']))
+    st.markdown("".join(blocs), unsafe_allow_html=True)
+
+
+# --- PAGE ---
+def afficher():
+    """Page « 🎁 Récompenses »."""
+    st.title("🎁 Boutique des Récompenses")
+    
+    # Initialiser les récompenses si nécessaire
+    if 'recompenses_achetees' not in st.session_state:
+        st.session_state.recompenses_achetees = []
+    
+    # Catalogue (défaut + personnalisées) et achats indexés par id de récompense
+    index_boutique = boutique()
+    
+    # Affichage du solde
+    unite("solde_boutique")(solde_boutique)()
+    
+    st.markdown("---")
+    st.subheader("✨ Récompenses disponibles")
+    
+    # Filtre par catégorie puis pagination
+    categorie = st.radio("Catégorie", ["Toutes"] + index_boutique.categories(), horizontal=True, key="boutique_categorie")
+    recompenses = index_boutique.recompenses(None if categorie == "Toutes" else categorie)
+    if len(recompenses) > RECOMPENSES_PAR_PAGE:
+        nb_pages = -(-len(recompenses) // RECOMPENSES_PAR_PAGE)
+        page = st.selectbox("Page", range(nb_pages), key=f"boutique_page_{categorie}",
+                            format_func=lambda i: f"Page {i + 1}/{nb_pages}")
+        recompenses = recompenses[page * RECOMPENSES_PAR_PAGE:(page + 1) * RECOMPENSES_PAR_PAGE]
+    
+    # Affichage des récompenses en colonnes responsive : une unité par carte
+    affichees = [recompense['id'] for recompense in recompenses]
+    for i in range(0, len(affichees), 2):
+        cols = st.columns(2)
+        for j, id_recompense in enumerate(affichees[i:i+2]):
+            with cols[j]:
+                unite(f"recompense_{id_recompense}")(carte_recompense)(id_recompense, affichees)
+    
+    # Afficher les récompenses obtenues : relancées avec la carte achetée
+    unite("obtenues")(recompenses_obtenues)()